@@ -1,347 +1,63 @@
 import streamlit as st
 import io
-import tempfile
+import logging
 import os
-from typing import Optional, Dict, Any
-import PyPDF2
-import docx
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
-from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
-
-# Page configuration
-st.set_page_config(
-    page_title="ResumeAI - Resume Analysis Tool",
-    page_icon="📄",
-    layout="wide",
-    initial_sidebar_state="expanded"
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, BinaryIO, Iterator, List, Tuple, Union
+from clients import REQUEST_TIMEOUT_SECONDS, get_client_registry, get_document_intelligence_client, get_openai_client
+from pdf_extraction import PARALLEL_PAGE_THRESHOLD, extract_pages_parallel, resolve_page_range
+from prompting import JOB_TOKEN_BUDGET, RESUME_TOKEN_BUDGET, clean_extracted_text, fit_to_budget
+from jobs import Job, get_extraction_queue, report_partial_text, report_progress
+from metrics import get_metrics, record_event, start_metrics_server, trace_stage, traced
+from revisions import ResumeRevision, SectionDiff, diff_sections, split_sections
+from routing import LOCAL_EXTRACTOR, get_routing_policy, get_routing_stats, route_document
+from completion_flow import (
+    JSON_RESPONSE_FORMAT,
+    CompletionRequest,
+    condense_flow,
+    parse_reply_flow,
+    run_flow,
+    structured_flow,
+)
+from cache import (
+    WaitTimeout,
+    extraction_cache_key,
+    get_extraction_cache,
+    get_response_cache,
+    get_single_flight,
+    response_cache_key,
+)
+from schemas import (
+    COMBINED_SCHEMA_HINT,
+    COMPARISON_SCHEMA_HINT,
+    FEEDBACK_SCHEMA_HINT,
+    get_parse_stats,
+    parse_combined_result,
+    parse_feedback_result,
+    parse_job_comparison,
+    partial_comparison,
+    partial_suggestions,
 )
 
-# Custom CSS for modern design
-st.markdown("""
-<style>
-/* Modern CSS Reset and Base Styles */
-* {
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}
-
-/* Custom CSS Variables */
-:root {
-    --primary-color: #6366f1;
-    --primary-hover: #4f46e5;
-    --secondary-color: #f8fafc;
-    --accent-color: #10b981;
-    --text-primary: #1e293b;
-    --text-secondary: #64748b;
-    --border-color: #e2e8f0;
-    --shadow-sm: 0 1px 2px 0 rgb(0 0 0 / 0.05);
-    --shadow-md: 0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1);
-    --shadow-lg: 0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1);
-    --radius: 12px;
-    --radius-sm: 8px;
-}
-
-/* Global Styles */
-.main {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    min-height: 100vh;
-    padding: 0;
-}
-
-/* Header Styles */
-.header-container {
-    background: rgba(255, 255, 255, 0.95);
-    backdrop-filter: blur(10px);
-    border-bottom: 1px solid var(--border-color);
-    padding: 1.5rem 0;
-    margin-bottom: 2rem;
-    box-shadow: var(--shadow-sm);
-}
-
-.header-content {
-    text-align: center;
-    max-width: 800px;
-    margin: 0 auto;
-}
-
-.header-title {
-    font-size: 3rem;
-    font-weight: 800;
-    background: linear-gradient(135deg, var(--primary-color), #8b5cf6);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-    margin-bottom: 0.5rem;
-}
-
-.header-subtitle {
-    font-size: 1.25rem;
-    color: var(--text-secondary);
-    font-weight: 500;
-}
-
-/* Card Styles */
-.card {
-    background: white;
-    border-radius: var(--radius);
-    box-shadow: var(--shadow-md);
-    padding: 2rem;
-    margin-bottom: 1.5rem;
-    border: 1px solid var(--border-color);
-    transition: all 0.3s ease;
-}
-
-.card:hover {
-    box-shadow: var(--shadow-lg);
-    transform: translateY(-2px);
-}
-
-.card-header {
-    display: flex;
-    align-items: center;
-    margin-bottom: 1.5rem;
-    padding-bottom: 1rem;
-    border-bottom: 2px solid var(--secondary-color);
-}
-
-.card-icon {
-    font-size: 2rem;
-    margin-right: 1rem;
-    background: linear-gradient(135deg, var(--primary-color), #8b5cf6);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-}
-
-.card-title {
-    font-size: 1.5rem;
-    font-weight: 700;
-    color: var(--text-primary);
-    margin: 0;
-}
-
-/* Button Styles */
-.btn-primary {
-    background: linear-gradient(135deg, var(--primary-color), #8b5cf6);
-    color: white;
-    border: none;
-    padding: 0.75rem 2rem;
-    border-radius: var(--radius-sm);
-    font-weight: 600;
-    font-size: 1rem;
-    cursor: pointer;
-    transition: all 0.3s ease;
-    box-shadow: var(--shadow-sm);
-    width: 100%;
-    margin-top: 1rem;
-}
-
-.btn-primary:hover {
-    background: linear-gradient(135deg, var(--primary-hover), #7c3aed);
-    transform: translateY(-1px);
-    box-shadow: var(--shadow-md);
-}
-
-/* Input Styles */
-.input-group {
-    margin-bottom: 1.5rem;
-}
-
-.input-label {
-    display: block;
-    font-weight: 600;
-    color: var(--text-primary);
-    margin-bottom: 0.5rem;
-    font-size: 0.9rem;
-}
-
-.input-field {
-    width: 100%;
-    padding: 0.75rem 1rem;
-    border: 2px solid var(--border-color);
-    border-radius: var(--radius-sm);
-    font-size: 1rem;
-    transition: all 0.3s ease;
-    background: white;
-}
-
-.input-field:focus {
-    outline: none;
-    border-color: var(--primary-color);
-    box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1);
-}
-
-/* Status Indicators */
-.status-container {
-    display: flex;
-    align-items: center;
-    margin-bottom: 0.5rem;
-}
-
-.status-indicator {
-    width: 12px;
-    height: 12px;
-    border-radius: 50%;
-    margin-right: 0.5rem;
-}
-
-.status-success {
-    background: var(--accent-color);
-}
-
-.status-error {
-    background: #ef4444;
-}
-
-.status-text {
-    font-size: 0.9rem;
-    font-weight: 500;
-}
-
-/* File Upload Area */
-.upload-area {
-    border: 2px dashed var(--border-color);
-    border-radius: var(--radius);
-    padding: 2rem;
-    text-align: center;
-    background: var(--secondary-color);
-    transition: all 0.3s ease;
-    cursor: pointer;
-}
-
-.upload-area:hover {
-    border-color: var(--primary-color);
-    background: rgba(99, 102, 241, 0.05);
-}
-
-.upload-icon {
-    font-size: 3rem;
-    color: var(--text-secondary);
-    margin-bottom: 1rem;
-}
-
-/* Results Section */
-.results-container {
-    background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-    border-radius: var(--radius);
-    padding: 1.5rem;
-    margin-top: 1rem;
-}
-
-.suggestion-card {
-    background: white;
-    border-radius: var(--radius-sm);
-    padding: 1.5rem;
-    margin-bottom: 1rem;
-    border-left: 4px solid var(--primary-color);
-    box-shadow: var(--shadow-sm);
-}
-
-.suggestion-number {
-    display: inline-block;
-    background: var(--primary-color);
-    color: white;
-    width: 24px;
-    height: 24px;
-    border-radius: 50%;
-    text-align: center;
-    line-height: 24px;
-    font-size: 0.8rem;
-    font-weight: 600;
-    margin-right: 0.75rem;
-}
-
-/* Sidebar Styles */
-.sidebar-container {
-    background: white;
-    border-right: 1px solid var(--border-color);
-    padding: 1.5rem;
-}
-
-.sidebar-header {
-    font-size: 1.25rem;
-    font-weight: 700;
-    color: var(--text-primary);
-    margin-bottom: 1.5rem;
-    padding-bottom: 1rem;
-    border-bottom: 2px solid var(--secondary-color);
-}
-
-.sidebar-section {
-    margin-bottom: 2rem;
-}
-
-.sidebar-section-title {
-    font-size: 1rem;
-    font-weight: 600;
-    color: var(--text-primary);
-    margin-bottom: 1rem;
-    display: flex;
-    align-items: center;
-}
-
-.sidebar-section-icon {
-    margin-right: 0.5rem;
-    font-size: 1.1rem;
-}
-
-/* Loading Animation */
-.loading-spinner {
-    display: inline-block;
-    width: 20px;
-    height: 20px;
-    border: 3px solid rgba(255, 255, 255, 0.3);
-    border-radius: 50%;
-    border-top-color: white;
-    animation: spin 1s ease-in-out infinite;
-}
-
-@keyframes spin {
-    to { transform: rotate(360deg); }
-}
-
-/* Responsive Design */
-@media (max-width: 768px) {
-    .header-title {
-        font-size: 2rem;
-    }
-    
-    .card {
-        padding: 1.5rem;
-    }
-    
-    .upload-area {
-        padding: 1.5rem;
-    }
-}
-
-/* Hide Streamlit default elements */
-#MainMenu {visibility: hidden;}
-footer {visibility: hidden;}
-header {visibility: hidden;}
+# PyPDF2, python-docx, the Azure SDKs and the NumPy-backed prescoring and vector_index modules are
+# imported on first use, so a cold start and each rerun only pay for what the interaction needs
+if TYPE_CHECKING:
+    from openai import AzureOpenAI
 
-/* Custom scrollbar */
-::-webkit-scrollbar {
-    width: 8px;
-}
+STYLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "styles.css")
 
-::-webkit-scrollbar-track {
-    background: var(--secondary-color);
-}
+logger = logging.getLogger("resumeai")
 
-::-webkit-scrollbar-thumb {
-    background: var(--border-color);
-    border-radius: 4px;
-}
-
-::-webkit-scrollbar-thumb:hover {
-    background: var(--text-secondary);
-}
-</style>
-""", unsafe_allow_html=True)
+def report_error(message: str):
+    """Show an error in the page and log it, since st.error is dropped in headless runs and worker threads"""
+    logger.error(message)
+    st.error(message)
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -363,210 +79,1263 @@ def initialize_session_state():
         st.session_state.job_comparison = None
     if 'job_description' not in st.session_state:
         st.session_state.job_description = ""
+    if 'bypass_response_cache' not in st.session_state:
+        st.session_state.bypass_response_cache = False
+    if 'extraction_job_id' not in st.session_state:
+        st.session_state.extraction_job_id = None
+    if 'analysis_status' not in st.session_state:
+        st.session_state.analysis_status = None
+    if 'feedback_pending' not in st.session_state:
+        st.session_state.feedback_pending = False
+    if 'comparison_pending' not in st.session_state:
+        st.session_state.comparison_pending = False
+    if 'stream_results' not in st.session_state:
+        st.session_state.stream_results = True
+    if 'min_prescore' not in st.session_state:
+        st.session_state.min_prescore = 0.0
+    if 'candidate_matches' not in st.session_state:
+        st.session_state.candidate_matches = []
+    if 'job_descriptions_text' not in st.session_state:
+        st.session_state.job_descriptions_text = ""
+    if 'multi_job_results' not in st.session_state:
+        st.session_state.multi_job_results = []
+    if 'combined_analysis' not in st.session_state:
+        st.session_state.combined_analysis = True
+    if 'combined_pending' not in st.session_state:
+        st.session_state.combined_pending = False
+    if 'resume_revisions' not in st.session_state:
+        st.session_state.resume_revisions = {}
+    if 'resume_file' not in st.session_state:
+        st.session_state.resume_file = ""
+    if 'results_store_dir' not in st.session_state:
+        st.session_state.results_store_dir = os.environ.get("RESUMEAI_RESULTS_DIR", "")
+    if 'index_resumes' not in st.session_state:
+        st.session_state.index_resumes = False
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
+OPENAI_API_VERSION = "2024-02-01"
+FEEDBACK_MAX_TOKENS = 1000
+FEEDBACK_TEMPERATURE = 0.7
+COMPARISON_MAX_TOKENS = 800
+COMPARISON_TEMPERATURE = 0.5
+COMBINED_MAX_TOKENS = 1500
+JOB_POLL_INTERVAL = 0.5
+SHORTLIST_WORKERS = 4
+MULTI_JOB_WORKERS = 4
+MAX_JOB_DESCRIPTIONS = int(os.environ.get("RESUMEAI_MAX_JOB_DESCRIPTIONS", "20"))
+JOB_TITLE_CHARS = 60
+JOB_SEPARATOR_PATTERN = re.compile(r"^\s*(?:-{3,}|={3,})\s*$", re.MULTILINE)
+DOCX_CHUNK_CHARS = 4096
+RESULTS_PAGE_SIZE = 50
+CLIENT_KIND_LABELS = {"openai": "Azure OpenAI", "document_intelligence": "Document Intelligence"}
+# Re-uploads with more than this share of their text edited get a full analysis instead of a revision pass
+REVISION_MAX_CHANGED_RATIO = float(os.environ.get("RESUMEAI_REVISION_MAX_CHANGED_RATIO", "0.5"))
+EXTRACTION_PREVIEW_CHARS = 5000
+UPLOAD_SPOOL_THRESHOLD = int(os.environ.get("RESUMEAI_UPLOAD_SPOOL_MB", "32")) * 1024 * 1024
+# Stage metrics, routing history and screening results cover every session in the process, so only operators see them
+SHOW_ADMIN_PANELS = os.environ.get("RESUMEAI_ADMIN_PANELS", "0") == "1"
+
+# Bump a version whenever an extractor's output changes so stale cache entries are ignored
+EXTRACTOR_VERSIONS = {
+    "document_intelligence": "prebuilt-read-1",
+    "pypdf2": "1",
+    "python_docx": "1",
+}
+
+def iter_pdf_pages(pdf_reader, pages: range) -> Iterator[str]:
+    """Yield the text of each PDF page as soon as it is parsed"""
+    for index in pages:
+        yield pdf_reader.pages[index].extract_text() or ""
+
+def iter_docx_chunks(file_content: bytes, chunk_chars: int = DOCX_CHUNK_CHARS) -> Iterator[str]:
+    """Yield DOCX paragraphs in chunks of roughly chunk_chars characters"""
+    import docx
+    doc = docx.Document(io.BytesIO(file_content))
+    chunk = []
+    chunk_size = 0
+    for paragraph in doc.paragraphs:
+        chunk.append(paragraph.text)
+        chunk_size += len(paragraph.text) + 1
+        if chunk_size >= chunk_chars:
+            yield "\n".join(chunk)
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield "\n".join(chunk)
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF using PyPDF2 as fallback"""
+def join_chunks(chunks: Iterator[str]) -> str:
+    """Join streamed chunks once, publishing each to the running job as a preview"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        report_partial_text(chunk)
+    return "\n".join(parts).strip()
+
+def extract_text_from_pdf(file_content: bytes, page_range: Optional[Tuple[int, int]] = None) -> str:
+    """Extract text from PDF using PyPDF2 as fallback, optionally in parallel for long documents"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        with trace_stage("extract.pypdf2", bytes=len(file_content)):
+            import PyPDF2
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+            pages = resolve_page_range(len(pdf_reader.pages), page_range)
+            
+            if PARALLEL_PAGE_THRESHOLD and len(pages) >= PARALLEL_PAGE_THRESHOLD:
+                # Join once rather than growing the string page by page
+                return "\n".join(extract_pages_parallel(file_content, pages)).strip()
+            return join_chunks(iter_pdf_pages(pdf_reader, pages))
     except Exception as e:
-        st.error(f"Error extracting text from PDF: {str(e)}")
+        report_error(f"Error extracting text from PDF: {str(e)}")
         return ""
 
 def extract_text_from_docx(file_content: bytes) -> str:
     """Extract text from DOCX file"""
     try:
-        doc = docx.Document(io.BytesIO(file_content))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        with trace_stage("extract.python_docx", bytes=len(file_content)):
+            return join_chunks(iter_docx_chunks(file_content))
     except Exception as e:
-        st.error(f"Error extracting text from DOCX: {str(e)}")
+        report_error(f"Error extracting text from DOCX: {str(e)}")
         return ""
 
+def open_upload_stream(source: Union[bytes, BinaryIO], spool_threshold: int = UPLOAD_SPOOL_THRESHOLD) -> BinaryIO:
+    """Wrap upload content in a readable stream without writing it to disk"""
+    if isinstance(source, bytes):
+        # BytesIO shares the bytes buffer until it is written to, so this does not copy
+        return io.BytesIO(source)
+    
+    if source.seekable():
+        source.seek(0)
+        return source
+    
+    # Unseekable streams are buffered in memory and only spill to disk above the threshold
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    shutil.copyfileobj(source, spooled)
+    spooled.seek(0)
+    return spooled
+
 def extract_text_with_document_intelligence(
-    file_content: bytes, 
+    file_content: Union[bytes, BinaryIO], 
     filename: str,
     endpoint: str, 
     api_key: str
 ) -> Optional[str]:
     """Extract text using Azure Document Intelligence"""
     try:
-        # Create client
-        client = DocumentIntelligenceClient(
-            endpoint=endpoint,
-            credential=AzureKeyCredential(api_key)
-        )
-        
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # Shared client, so the connection pool survives reruns
+        client = get_document_intelligence_client(endpoint, api_key)
         
-        try:
-            # Analyze document
-            with open(temp_file_path, 'rb') as f:
-                poller = client.begin_analyze_document(
-                    "prebuilt-read",
-                    f,
-                    content_type="application/octet-stream"
-                )
-            
-            result = poller.result()
-            
-            # Extract text
-            extracted_text = ""
-            if result.content:
-                extracted_text = result.content
+        # Marked in use so idle eviction cannot close the client during a long upload or poll
+        with get_client_registry().in_use(client):
+            # Analyze document, streaming the upload straight from memory
+            stream = open_upload_stream(file_content)
+            upload_bytes = len(file_content) if isinstance(file_content, bytes) else None
+            try:
+                with trace_stage("extract.document_intelligence.upload", bytes=upload_bytes):
+                    started = time.perf_counter()
+                    poller = client.begin_analyze_document(
+                        "prebuilt-read",
+                        stream,
+                        content_type="application/octet-stream"
+                    )
+                    get_client_registry().record_latency(client, time.perf_counter() - started)
+            finally:
+                # Only close buffers created here, never the caller's stream
+                if stream is not file_content:
+                    stream.close()
             
-            return extracted_text
+            report_progress("Waiting for Document Intelligence")
+            with trace_stage("extract.document_intelligence.poll"):
+                result = poller.result()
+        
+        # Extract text
+        extracted_text = ""
+        if result.content:
+            extracted_text = result.content
         
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        return extracted_text
     
     except Exception as e:
-        st.error(f"Error with Azure Document Intelligence: {str(e)}")
+        report_error(f"Error with Azure Document Intelligence: {str(e)}")
         return None
 
+def cached_extraction(extractor_name: str, file_content: bytes, extract_fn, *args) -> Optional[str]:
+    """Run an extractor through the content-addressed extraction cache"""
+    cache = get_extraction_cache()
+    key = extraction_cache_key(extractor_name, EXTRACTOR_VERSIONS[extractor_name], file_content)
+    
+    cached_text = cache.get(key)
+    if cached_text is not None:
+        record_event("cache_hit", f"extract.{extractor_name}")
+        return cached_text
+    record_event("cache_miss", f"extract.{extractor_name}")
+    
+    def extract() -> Optional[str]:
+        extracted_text = extract_fn(file_content, *args)
+        # Failed extractions are not cached so a later retry can still succeed
+        if extracted_text:
+            cache.set(key, extracted_text)
+        return extracted_text
+    
+    # Sessions uploading the same file at the same time wait for one extraction instead of each paying for it;
+    # a stuck leader only holds them for the request timeout, after which each extracts on its own
+    extracted_text, shared = get_single_flight().do(key, extract, timeout=REQUEST_TIMEOUT_SECONDS)
+    if shared:
+        record_event("coalesced", f"extract.{extractor_name}")
+    return extracted_text
+
+def extract_text_locally(file_content: bytes, file_extension: str) -> str:
+    """Extract a PDF with PyPDF2 or a DOCX with python-docx"""
+    report_progress("Extracting text locally")
+    if file_extension == 'pdf':
+        return cached_extraction("pypdf2", file_content, extract_text_from_pdf)
+    return cached_extraction("python_docx", file_content, extract_text_from_docx)
+
+def extract_resume_text(
+    file_content: bytes,
+    filename: str,
+    doc_endpoint: str = "",
+    doc_key: str = ""
+) -> str:
+    """Extract resume text, routing PDF and DOCX files to Document Intelligence only when they need it"""
+    file_extension = filename.lower().split('.')[-1]
+    
+    extracted_text = ""
+    
+    if file_extension == 'txt':
+        # Direct text reading for TXT files
+        with trace_stage("extract.txt", bytes=len(file_content)):
+            extracted_text = file_content.decode('utf-8')
+    
+    elif file_extension in ['pdf', 'docx']:
+        local_text = None
+        if doc_endpoint and doc_key:
+            # Born-digital files with a usable text layer skip the remote OCR round trip
+            decision = route_document(file_content, file_extension)
+            report_progress(f"Routed to {decision.extractor}: {decision.reason}")
+            routing_stats = get_routing_stats()
+            if decision.extractor == LOCAL_EXTRACTOR:
+                local_text = extract_text_locally(file_content, file_extension)
+                # A forced local policy keeps thin text, but empty text still falls back to Document Intelligence
+                if routing_stats.record_outcome(decision, local_text) or (decision.policy_override and local_text.strip()):
+                    return local_text
+            
+            # Scanned and layout-heavy files, and local text that came back too thin
+            extracted_text = cached_extraction(
+                "document_intelligence",
+                file_content,
+                extract_text_with_document_intelligence,
+                filename,
+                doc_endpoint,
+                doc_key
+            )
+            if extracted_text and decision.extractor != LOCAL_EXTRACTOR:
+                routing_stats.record_outcome(decision, extracted_text)
+        
+        # Fallback to local extraction if Document Intelligence fails or not configured
+        if not extracted_text:
+            if doc_endpoint and doc_key:
+                record_event("fallback", "extract.document_intelligence")
+            extracted_text = local_text if local_text is not None else extract_text_locally(file_content, file_extension)
+    
+    return extracted_text or ""
+
+def chat_completion(
+    client: "AzureOpenAI",
+    deployment_name: str,
+    messages: list,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Run a chat completion, serving repeat requests from the response cache"""
+    cache = get_response_cache()
+    key = response_cache_key(deployment_name, messages, temperature, max_tokens, response_format)
+    
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            record_event("cache_hit", "completion")
+            return cached["content"]
+        record_event("cache_miss", "completion")
+    
+    def complete() -> str:
+        request_options = {"response_format": response_format} if response_format else {}
+        with get_client_registry().in_use(client), trace_stage("completion") as stage:
+            started = time.perf_counter()
+            response = client.chat.completions.create(
+                model=deployment_name,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **request_options
+            )
+            latency = time.perf_counter() - started
+            if response.usage:
+                stage.record(
+                    prompt_tokens=response.usage.prompt_tokens,
+                    completion_tokens=response.usage.completion_tokens
+                )
+        get_client_registry().record_latency(client, latency)
+        
+        content = response.choices[0].message.content
+        total_tokens = response.usage.total_tokens if response.usage else 0
+        cache.set(key, content, total_tokens, latency)
+        return content
+    
+    # A bypassed cache asks for a fresh reply, so only cacheable requests share an in-flight one
+    if not use_cache:
+        return complete()
+    content, shared = get_single_flight().do(key, complete, timeout=REQUEST_TIMEOUT_SECONDS)
+    if shared:
+        record_event("coalesced", "completion")
+    return content
+
+def complete_request(client: "AzureOpenAI", deployment_name: str, request: CompletionRequest) -> str:
+    """Answer one request from a completion flow with chat_completion"""
+    return chat_completion(
+        client,
+        deployment_name,
+        request.messages,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        use_cache=request.use_cache,
+        response_format=request.response_format
+    )
+
+def condense_resume(
+    resume_text: str,
+    client: "AzureOpenAI",
+    deployment_name: str,
+    use_cache: bool = True
+) -> str:
+    """Clean the resume and, when it is over the token budget, condense it chunk by chunk"""
+    return run_flow(
+        condense_flow(resume_text, use_cache),
+        lambda request: complete_request(client, deployment_name, request)
+    )
+
+@lru_cache(maxsize=16)
+def prepare_resume_for_prompt(resume_text: str) -> str:
+    """Clean and budget resume text once, so every prompt built from it reuses the identical string"""
+    return fit_to_budget(clean_extracted_text(resume_text), RESUME_TOKEN_BUDGET)
+
+@traced("prompt.feedback")
+def build_feedback_messages(resume_text: str) -> list:
+    """Build the chat messages asking for resume feedback"""
+    resume_text = prepare_resume_for_prompt(resume_text)
+    prompt = f"""
+    Please analyze the following resume and provide exactly 3 specific, actionable feedback suggestions to improve it. 
+    Focus on content, structure, and presentation. Be constructive and specific.
+    
+    Resume text:
+    {resume_text}
+    
+    Respond with only a JSON object of this form:
+    {FEEDBACK_SCHEMA_HINT}
+    """
+    return [
+        {"role": "system", "content": "You are a professional resume reviewer and career advisor. You reply in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+@traced("prompt.revision")
+def build_revision_feedback_messages(diff: SectionDiff, previous_suggestions: list) -> list:
+    """Build the chat messages updating earlier feedback from only the sections that changed"""
+    previous_feedback = "\n".join(f"{number}. {suggestion}" for number, suggestion in enumerate(previous_suggestions, 1))
+    changed_sections = fit_to_budget(
+        "\n\n".join(f"### {section.title}\n{section.text}" for section in diff.changed),
+        RESUME_TOKEN_BUDGET
+    )
+    unchanged_titles = ", ".join(section.title for section in diff.unchanged) or "none"
+    removed_titles = ", ".join(diff.removed) or "none"
+    prompt = f"""
+    The candidate revised their resume after receiving the feedback below. Only the sections shown
+    under "Changed sections" were edited or added; the other sections are exactly as before.
+    
+    Previous feedback:
+    {previous_feedback}
+    
+    Unchanged sections: {unchanged_titles}
+    Removed sections: {removed_titles}
+    
+    Changed sections:
+    {changed_sections}
+    
+    Return exactly 3 specific, actionable suggestions for the whole resume. Keep each previous suggestion
+    that still applies word for word, and replace any that the revision addressed or made obsolete with a
+    new suggestion about the changed sections.
+    
+    Respond with only a JSON object of this form:
+    {FEEDBACK_SCHEMA_HINT}
+    """
+    return [
+        {"role": "system", "content": "You are a professional resume reviewer and career advisor. You reply in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_feedback(feedback_text: str) -> list:
+    """Validate a JSON feedback reply and return its suggestions (raises ParseError)"""
+    return parse_feedback_result(feedback_text).suggestions
+
+@traced("prompt.comparison")
+def build_comparison_messages(resume_text: str, job_description: str) -> list:
+    """Build the chat messages asking for a resume/job match analysis"""
+    # The job description comes last so the prompt prefix up to the end of the resume is identical
+    # for every job, letting Azure OpenAI prompt caching reuse it across comparisons
+    resume_text = prepare_resume_for_prompt(resume_text)
+    job_description = fit_to_budget(clean_extracted_text(job_description), JOB_TOKEN_BUDGET)
+    prompt = f"""
+    Please analyze how well the following resume matches the job description and provide:
+    1. A match score out of 100 (be realistic and fair)
+    2. A brief explanation (2-3 sentences) of why this score was given
+    3. Key strengths that align with the job requirements
+    4. Areas that could be improved to better match the job
+    
+    Respond with only a JSON object of this form, with the score first:
+    {COMPARISON_SCHEMA_HINT}
+    
+    Resume:
+    {resume_text}
+    
+    Job Description:
+    {job_description}
+    """
+    return [
+        {"role": "system", "content": "You are a professional recruiter and career advisor with expertise in resume-job matching. You reply in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_comparison(analysis_text: str) -> dict:
+    """Validate a JSON comparison reply and return it as a dict (raises ParseError)"""
+    return parse_job_comparison(analysis_text).to_dict()
+
+def parse_structured_reply(
+    client: "AzureOpenAI",
+    deployment_name: str,
+    messages: list,
+    reply: str,
+    parse_fn,
+    schema_hint: str,
+    max_tokens: int,
+    temperature: float
+):
+    """Validate a JSON reply, asking the model once to repair it when it does not match the schema"""
+    return run_flow(
+        parse_reply_flow(deployment_name, messages, reply, parse_fn, schema_hint, max_tokens, temperature),
+        lambda request: complete_request(client, deployment_name, request)
+    )
+
+def structured_completion(
+    client: "AzureOpenAI",
+    deployment_name: str,
+    messages: list,
+    parse_fn,
+    schema_hint: str,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True
+):
+    """Run a JSON-mode chat completion and return the validated, typed result"""
+    return run_flow(
+        structured_flow(deployment_name, messages, parse_fn, schema_hint, max_tokens, temperature, use_cache),
+        lambda request: complete_request(client, deployment_name, request)
+    )
+
+def request_resume_feedback(
+    resume_text: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> list:
+    """Get resume feedback from Azure OpenAI (raises on failure)"""
+    client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+    
+    resume_text = condense_resume(resume_text, client, deployment_name, use_cache)
+    feedback = structured_completion(
+        client,
+        deployment_name,
+        build_feedback_messages(resume_text),
+        parse_feedback_result,
+        FEEDBACK_SCHEMA_HINT,
+        max_tokens=FEEDBACK_MAX_TOKENS,
+        temperature=FEEDBACK_TEMPERATURE,
+        use_cache=use_cache
+    )
+    return feedback.suggestions
+
 def get_resume_feedback(
     resume_text: str,
     endpoint: str,
     api_key: str,
-    deployment_name: str
+    deployment_name: str,
+    use_cache: bool = True
 ) -> Optional[list]:
     """Get resume feedback from Azure OpenAI"""
     try:
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version="2024-02-01"
-        )
-        
-        prompt = f"""
-        Please analyze the following resume and provide exactly 3 specific, actionable feedback suggestions to improve it. 
-        Focus on content, structure, and presentation. Be constructive and specific.
-        
-        Resume text:
-        {resume_text}
-        
-        Please format your response as a numbered list with exactly 3 suggestions.
-        """
-        
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": "You are a professional resume reviewer and career advisor."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.7
+        return request_resume_feedback(resume_text, endpoint, api_key, deployment_name, use_cache)
+    
+    except Exception as e:
+        report_error(f"Error getting feedback from Azure OpenAI: {str(e)}")
+        return None
+
+def get_revision_feedback(
+    diff: SectionDiff,
+    previous_suggestions: list,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Optional[list]:
+    """Update earlier feedback by sending only the changed sections of a re-uploaded resume"""
+    try:
+        client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+        feedback = structured_completion(
+            client,
+            deployment_name,
+            build_revision_feedback_messages(diff, previous_suggestions),
+            parse_feedback_result,
+            FEEDBACK_SCHEMA_HINT,
+            max_tokens=FEEDBACK_MAX_TOKENS,
+            temperature=FEEDBACK_TEMPERATURE,
+            use_cache=use_cache
         )
         
-        feedback_text = response.choices[0].message.content
-        
-        # Parse the response into individual suggestions
-        suggestions = []
-        lines = feedback_text.strip().split('\n')
-        current_suggestion = ""
-        
-        for line in lines:
-            line = line.strip()
-            if line and (line[0].isdigit() or line.startswith('•') or line.startswith('-')):
-                if current_suggestion:
-                    suggestions.append(current_suggestion.strip())
-                current_suggestion = line
-            elif line and current_suggestion:
-                current_suggestion += " " + line
-        
-        if current_suggestion:
-            suggestions.append(current_suggestion.strip())
-        
-        return suggestions[:3]  # Ensure we only return 3 suggestions
+        return feedback.suggestions
     
     except Exception as e:
-        st.error(f"Error getting feedback from Azure OpenAI: {str(e)}")
+        report_error(f"Error getting feedback from Azure OpenAI: {str(e)}")
         return None
 
+def request_job_comparison(
+    resume_text: str,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> dict:
+    """Compare resume with job description and provide match score (raises on failure)"""
+    client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+    
+    resume_text = condense_resume(resume_text, client, deployment_name, use_cache)
+    comparison = structured_completion(
+        client,
+        deployment_name,
+        build_comparison_messages(resume_text, job_description),
+        parse_job_comparison,
+        COMPARISON_SCHEMA_HINT,
+        max_tokens=COMPARISON_MAX_TOKENS,
+        temperature=COMPARISON_TEMPERATURE,
+        use_cache=use_cache
+    )
+    return comparison.to_dict()
+
 def compare_resume_with_job(
     resume_text: str,
     job_description: str,
     endpoint: str,
     api_key: str,
-    deployment_name: str
+    deployment_name: str,
+    use_cache: bool = True
 ) -> Optional[dict]:
     """Compare resume with job description and provide match score"""
     try:
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version="2024-02-01"
-        )
+        return request_job_comparison(resume_text, job_description, endpoint, api_key, deployment_name, use_cache)
+    
+    except Exception as e:
+        report_error(f"Error comparing resume with job description: {str(e)}")
+        return None
+
+def split_job_descriptions(text: str) -> List[str]:
+    """Split pasted text into job descriptions separated by lines of --- or ==="""
+    return [part.strip() for part in JOB_SEPARATOR_PATTERN.split(text) if part.strip()]
+
+def read_job_description_files(files: list) -> List[str]:
+    """Read job descriptions from uploaded files; .txt files may hold several separated by ---"""
+    job_descriptions = []
+    for uploaded in files:
+        file_content = uploaded.getvalue()
+        file_extension = uploaded.name.lower().split('.')[-1]
+        if file_extension == 'pdf':
+            job_descriptions.append(extract_text_from_pdf(file_content).strip())
+        elif file_extension == 'docx':
+            job_descriptions.append(extract_text_from_docx(file_content).strip())
+        else:
+            job_descriptions.extend(split_job_descriptions(file_content.decode('utf-8', errors='replace')))
+    return [job_description for job_description in job_descriptions if job_description]
+
+def job_title(job_description: str) -> str:
+    """Short label for a job description: its first non-empty line"""
+    first_line = next((line.strip() for line in job_description.splitlines() if line.strip()), "")
+    return first_line[:JOB_TITLE_CHARS]
+
+def compare_resume_with_jobs(
+    resume_text: str,
+    job_descriptions: List[str],
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True,
+    min_prescore: float = 0.0
+) -> Optional[List[Dict[str, Any]]]:
+    """Score one resume against many job descriptions concurrently"""
+    from prescoring import prescore
+    
+    try:
+        client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+        # Condensed and prepared once; every comparison then shares the same resume prefix
+        condensed_text = condense_resume(resume_text, client, deployment_name, use_cache)
+        prepare_resume_for_prompt(condensed_text)
+    
+    except Exception as e:
+        report_error(f"Error comparing resume with job descriptions: {str(e)}")
+        return None
+    
+    def compare_job(job_description: str) -> Dict[str, Any]:
+        local_score = prescore(resume_text, job_description)
+        row = {
+            "job": job_title(job_description),
+            "prescore": local_score.score,
+            "score": None,
+            "comparison": None,
+            "error": None,
+        }
+        if local_score.score < min_prescore:
+            row["error"] = "Below minimum pre-score"
+            return row
+        try:
+            comparison = structured_completion(
+                client,
+                deployment_name,
+                build_comparison_messages(condensed_text, job_description),
+                parse_job_comparison,
+                COMPARISON_SCHEMA_HINT,
+                max_tokens=COMPARISON_MAX_TOKENS,
+                temperature=COMPARISON_TEMPERATURE,
+                use_cache=use_cache
+            )
+        except Exception as e:
+            row["error"] = str(e)
+            return row
+        row["score"] = comparison.score
+        row["comparison"] = comparison.to_dict()
+        return row
+    
+    # The first request populates the service-side prompt cache for the resume prefix,
+    # so the remaining jobs run concurrently against a warm prefix
+    rows = [compare_job(job_descriptions[0])]
+    with ThreadPoolExecutor(max_workers=MULTI_JOB_WORKERS) as executor:
+        rows.extend(executor.map(compare_job, job_descriptions[1:]))
+    return rows
+
+@traced("prompt.combined")
+def build_combined_messages(resume_text: str, job_description: str) -> list:
+    """Build the chat messages asking for feedback and a job match analysis in one JSON reply"""
+    resume_text = prepare_resume_for_prompt(resume_text)
+    job_description = fit_to_budget(clean_extracted_text(job_description), JOB_TOKEN_BUDGET)
+    prompt = f"""
+    Please review the following resume and analyze how well it matches the job description.
+    
+    Resume:
+    {resume_text}
+    
+    Job Description:
+    {job_description}
+    
+    Provide exactly 3 specific, actionable suggestions to improve the resume (content, structure
+    and presentation), a realistic and fair match score out of 100, a brief explanation of the score,
+    the key strengths that align with the job requirements and the areas to improve to better match it.
+    
+    Respond with only a JSON object of this form:
+    {COMBINED_SCHEMA_HINT}
+    """
+    return [
+        {"role": "system", "content": "You are a professional recruiter, resume reviewer and career advisor. You reply in JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_combined_analysis(analysis_text: str) -> Tuple[list, dict]:
+    """Split a combined JSON reply into feedback suggestions and a comparison dict (raises ParseError)"""
+    analysis = parse_combined_result(analysis_text)
+    return analysis.feedback.suggestions, analysis.comparison.to_dict()
+
+def analyze_resume_and_job(
+    resume_text: str,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Optional[Tuple[list, dict]]:
+    """Get feedback suggestions and a job match analysis from a single Azure OpenAI call"""
+    try:
+        client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
         
-        prompt = f"""
-        Please analyze how well the following resume matches the job description and provide:
-        1. A match score out of 100 (be realistic and fair)
-        2. A brief explanation (2-3 sentences) of why this score was given
-        3. Key strengths that align with the job requirements
-        4. Areas that could be improved to better match the job
-        
-        Resume:
-        {resume_text}
-        
-        Job Description:
-        {job_description}
-        
-        Please format your response as:
-        SCORE: [number]/100
-        EXPLANATION: [brief explanation]
-        STRENGTHS: [key strengths]
-        IMPROVEMENTS: [areas to improve]
-        """
-        
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": "You are a professional recruiter and career advisor with expertise in resume-job matching."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=800,
-            temperature=0.5
+        resume_text = condense_resume(resume_text, client, deployment_name, use_cache)
+        analysis = structured_completion(
+            client,
+            deployment_name,
+            build_combined_messages(resume_text, job_description),
+            parse_combined_result,
+            COMBINED_SCHEMA_HINT,
+            max_tokens=COMBINED_MAX_TOKENS,
+            temperature=COMPARISON_TEMPERATURE,
+            use_cache=use_cache
         )
         
-        analysis_text = response.choices[0].message.content
+        return analysis.feedback.suggestions, analysis.comparison.to_dict()
+    
+    except Exception as e:
+        report_error(f"Error analyzing resume against the job description: {str(e)}")
+        return None
+
+def stream_chat_completion(
+    client: "AzureOpenAI",
+    deployment_name: str,
+    messages: list,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """Yield completion text as it is generated, caching the full reply"""
+    cache = get_response_cache()
+    key = response_cache_key(deployment_name, messages, temperature, max_tokens, response_format)
+    flight = get_single_flight()
+    call = None
+    
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            record_event("cache_hit", "completion.stream")
+            yield cached["content"]
+            return
+        record_event("cache_miss", "completion.stream")
         
-        # Parse the response
-        result = {}
-        lines = analysis_text.strip().split('\n')
+        # An identical request already in flight is waited for and its reply shown in one piece
+        call, leader = flight.join(key)
+        if not leader:
+            record_event("coalesced", "completion.stream")
+            try:
+                shared_content = flight.wait(call, REQUEST_TIMEOUT_SECONDS)
+            except WaitTimeout:
+                # The leader is stuck, so this caller streams its own reply without taking over the leader's call
+                record_event("coalesce_timeout", "completion.stream")
+                call = None
+            else:
+                yield shared_content
+                return
+    
+    try:
+        request_options = {"response_format": response_format} if response_format else {}
+        started = time.perf_counter()
+        with get_client_registry().in_use(client):
+            response = client.chat.completions.create(
+                model=deployment_name,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                **request_options
+            )
+            
+            # Observed directly rather than with trace_stage, which would also time the consumer between chunks
+            metrics = get_metrics()
+            parts = []
+            for chunk in response:
+                # Azure sends content filter results in chunks without choices
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not parts:
+                        metrics.observe("completion.stream.first_token", time.perf_counter() - started)
+                    parts.append(delta)
+                    yield delta
+        latency = time.perf_counter() - started
+        metrics.observe("completion.stream", latency)
+        get_client_registry().record_latency(client, latency)
         
-        for line in lines:
-            line = line.strip()
-            if line.startswith('SCORE:'):
-                score_text = line.replace('SCORE:', '').strip()
-                try:
-                    result['score'] = int(score_text.split('/')[0])
-                except:
-                    result['score'] = 0
-            elif line.startswith('EXPLANATION:'):
-                result['explanation'] = line.replace('EXPLANATION:', '').strip()
-            elif line.startswith('STRENGTHS:'):
-                result['strengths'] = line.replace('STRENGTHS:', '').strip()
-            elif line.startswith('IMPROVEMENTS:'):
-                result['improvements'] = line.replace('IMPROVEMENTS:', '').strip()
-        
-        return result
+        # Streamed responses carry no usage block, so tokens are estimated at ~4 characters each
+        content = "".join(parts)
+        estimated_tokens = (sum(len(message["content"]) for message in messages) + len(content)) // 4
+        cache.set(key, content, estimated_tokens, latency)
+    except GeneratorExit:
+        # The consumer stopped reading (e.g. a Streamlit rerun), so waiters have no complete reply to share
+        if call is not None:
+            flight.complete(key, call, error=RuntimeError("The shared completion was cancelled before it finished"))
+        raise
+    except Exception as e:
+        if call is not None:
+            flight.complete(key, call, error=e)
+        raise
+    if call is not None:
+        flight.complete(key, call, content)
+
+def stream_resume_feedback(
+    resume_text: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Iterator[list]:
+    """Yield the feedback suggestions completed so far as the reply streams in, then the validated list"""
+    try:
+        client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+        
+        resume_text = condense_resume(resume_text, client, deployment_name, use_cache)
+        messages = build_feedback_messages(resume_text)
+        feedback_text = ""
+        for delta in stream_chat_completion(
+            client,
+            deployment_name,
+            messages,
+            max_tokens=FEEDBACK_MAX_TOKENS,
+            temperature=FEEDBACK_TEMPERATURE,
+            use_cache=use_cache,
+            response_format=JSON_RESPONSE_FORMAT
+        ):
+            feedback_text += delta
+            yield partial_suggestions(feedback_text)
+        
+        feedback = parse_structured_reply(
+            client, deployment_name, messages, feedback_text, parse_feedback_result,
+            FEEDBACK_SCHEMA_HINT, FEEDBACK_MAX_TOKENS, FEEDBACK_TEMPERATURE
+        )
+        yield feedback.suggestions
     
     except Exception as e:
-        st.error(f"Error comparing resume with job description: {str(e)}")
+        report_error(f"Error getting feedback from Azure OpenAI: {str(e)}")
+        # An empty final value tells the caller the streamed partial result was not accepted
+        yield []
+
+def stream_job_comparison(
+    resume_text: str,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Iterator[dict]:
+    """Yield the comparison fields completed so far, starting with the score, then the validated result"""
+    try:
+        client = get_openai_client(endpoint, api_key, OPENAI_API_VERSION)
+        
+        resume_text = condense_resume(resume_text, client, deployment_name, use_cache)
+        messages = build_comparison_messages(resume_text, job_description)
+        analysis_text = ""
+        for delta in stream_chat_completion(
+            client,
+            deployment_name,
+            messages,
+            max_tokens=COMPARISON_MAX_TOKENS,
+            temperature=COMPARISON_TEMPERATURE,
+            use_cache=use_cache,
+            response_format=JSON_RESPONSE_FORMAT
+        ):
+            analysis_text += delta
+            # Only fields whose JSON value is complete are shown, so a partial score never appears
+            yield partial_comparison(analysis_text)
+        
+        comparison = parse_structured_reply(
+            client, deployment_name, messages, analysis_text, parse_job_comparison,
+            COMPARISON_SCHEMA_HINT, COMPARISON_MAX_TOKENS, COMPARISON_TEMPERATURE
+        )
+        yield comparison.to_dict()
+    
+    except Exception as e:
+        report_error(f"Error comparing resume with job description: {str(e)}")
+        yield {}
+
+def render_feedback_suggestions(suggestions: list):
+    """Render feedback suggestions as suggestion cards"""
+    st.markdown("""
+    <div class="results-container">
+        <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
+            💡 AI Feedback Suggestions
+        </h3>
+        <p style="color: var(--text-secondary); margin-bottom: 1.5rem;">
+            Here are 3 specific recommendations to improve your resume:
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    for i, suggestion in enumerate(suggestions, 1):
+        st.markdown(f"""
+        <div class="suggestion-card">
+            <div style="display: flex; align-items: flex-start;">
+                <span class="suggestion-number">{i}</span>
+                <div style="flex: 1;">
+                    <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
+                        {suggestion}
+                    </p>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+def render_job_comparison(comparison: dict, partial: bool = False):
+    """Render the match score and analysis cards for a job comparison"""
+    st.markdown("""
+    <div class="results-container">
+        <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
+            🎯 Job Match Analysis
+        </h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Score display with visual indicator (skipped while the score line is still streaming)
+    if 'score' in comparison or not partial:
+        score = comparison.get('score', 0)
+        score_color = "#10b981" if score >= 80 else "#f59e0b" if score >= 60 else "#ef4444"
+        
+        st.markdown(f"""
+        <div style="text-align: center; margin-bottom: 2rem;">
+            <div style="font-size: 3rem; font-weight: 800; color: {score_color}; margin-bottom: 0.5rem;">
+                {score}/100
+            </div>
+            <div style="font-size: 1.2rem; color: var(--text-secondary); font-weight: 600;">
+                Match Score
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Explanation
+    if comparison.get('explanation'):
+        st.markdown("""
+        <div class="suggestion-card">
+            <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
+                📝 Analysis
+            </h4>
+            <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
+                """ + comparison['explanation'] + """
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Strengths
+    if comparison.get('strengths'):
+        st.markdown("""
+        <div class="suggestion-card">
+            <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
+                ✅ Key Strengths
+            </h4>
+            <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
+                """ + comparison['strengths'] + """
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Areas for improvement
+    if comparison.get('improvements'):
+        st.markdown("""
+        <div class="suggestion-card">
+            <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
+                🔧 Areas to Improve
+            </h4>
+            <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
+                """ + comparison['improvements'] + """
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def render_screening_results(directory: str):
+    """Filter, sort and page through a batch results store, reading text only for the page shown"""
+    from results_store import RESULTS_ROOTS, SORT_COLUMNS, get_results_store, resolve_results_dir
+    
+    resolved = resolve_results_dir(directory)
+    if resolved is None:
+        st.warning(f"Results stores can only be opened from {' or '.join(RESULTS_ROOTS)}.")
+        return
+    store = get_results_store(resolved)
+    if store is None:
+        st.info(f"No results store found in {directory}. Create one with `batch_screening.py --store {directory}`.")
+        return
+    
+    filter_columns = st.columns(4)
+    statuses = filter_columns[0].multiselect("Status", store.statuses, default=store.statuses)
+    min_score = filter_columns[1].slider("Minimum match score", 0, 100, 0)
+    sort_by = filter_columns[2].selectbox("Sort by", SORT_COLUMNS)
+    name_contains = filter_columns[3].text_input("File name contains")
+    
+    # Filtering and sorting run on the memory-mapped columns; unscored rows only pass a zero minimum
+    rows = store.select(statuses=statuses, min_score=min_score or None, name_contains=name_contains.strip())
+    rows = store.sort(rows, by=sort_by, descending=sort_by != "row")
+    page_count = max(1, -(-len(rows) // RESULTS_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    st.caption(f"{len(rows)} of {len(store)} results, page {page} of {page_count}")
+    
+    page_rows = store.page(rows, page - 1, RESULTS_PAGE_SIZE)
+    st.dataframe(
+        [
+            {
+                "Row": row["row"],
+                "Resume": row["file"],
+                "Status": row["status"],
+                "Match Score": row["score"],
+                "Pre-score": row["prescore"],
+            }
+            for row in page_rows
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+    scored_rows = [row for row in page_rows if row["score"] is not None]
+    if scored_rows:
+        selected = st.selectbox(
+            "Show analysis for",
+            range(len(scored_rows)),
+            format_func=lambda index: f"{scored_rows[index]['file']} ({scored_rows[index]['score']}/100)",
+            key="screening_result_selected"
+        )
+        render_job_comparison(scored_rows[selected])
+
+def run_feedback_analysis(results_area):
+    """Generate feedback for the extracted text, streaming it into results_area when enabled"""
+    use_cache = not st.session_state.bypass_response_cache
+    feedback = None
+    
+    # Compare with the previous upload of the same file so unchanged sections keep their feedback
+    sections = split_sections(st.session_state.extracted_text)
+    revision = st.session_state.resume_revisions.get(st.session_state.resume_file)
+    # Bypassing the cache always asks for a fresh full analysis, so earlier feedback is not built on either
+    diff = diff_sections(revision.sections, sections) if revision is not None and use_cache else None
+    
+    if diff is not None and diff.is_unchanged:
+        record_event("revision_reused", "feedback")
+        feedback = revision.suggestions
+        with results_area.container():
+            st.info("ℹ️ No section changed since the last analysis, so its feedback was reused.")
+            render_feedback_suggestions(feedback)
+    elif diff is not None and diff.changed_ratio <= REVISION_MAX_CHANGED_RATIO:
+        record_event("revision_partial", "feedback")
+        with st.spinner(f"Re-analyzing {len(diff.changed)} changed sections..."):
+            feedback = get_revision_feedback(
+                diff,
+                revision.suggestions,
+                st.session_state.azure_openai_endpoint,
+                st.session_state.azure_openai_key,
+                st.session_state.azure_openai_deployment,
+                use_cache=use_cache
+            )
+        if feedback:
+            with results_area.container():
+                st.info(
+                    f"ℹ️ Re-analyzed {len(diff.changed)} changed of {len(sections)} sections: "
+                    f"{', '.join(section.title for section in diff.changed)}."
+                )
+                render_feedback_suggestions(feedback)
+    elif st.session_state.stream_results:
+        for feedback in stream_resume_feedback(
+            st.session_state.extracted_text,
+            st.session_state.azure_openai_endpoint,
+            st.session_state.azure_openai_key,
+            st.session_state.azure_openai_deployment,
+            use_cache=use_cache
+        ):
+            with results_area.container():
+                render_feedback_suggestions(feedback)
+    else:
+        with st.spinner("Analyzing your resume..."):
+            feedback = get_resume_feedback(
+                st.session_state.extracted_text,
+                st.session_state.azure_openai_endpoint,
+                st.session_state.azure_openai_key,
+                st.session_state.azure_openai_deployment,
+                use_cache=use_cache
+            )
+        if feedback:
+            with results_area.container():
+                render_feedback_suggestions(feedback)
+    
+    if feedback:
+        st.session_state.feedback_suggestions = feedback
+        st.session_state.resume_revisions[st.session_state.resume_file] = ResumeRevision(sections, feedback)
+        st.success("✅ Resume analysis completed!")
+    else:
+        st.error("❌ Failed to get feedback from Azure OpenAI.")
+
+def passes_prescore_gate() -> bool:
+    """Show the local pre-score and whether it clears the minimum needed for an AI job comparison"""
+    # Cheap local estimate first; clearly unsuitable candidates never reach the LLM
+    from prescoring import prescore
+    local_score = prescore(st.session_state.extracted_text, st.session_state.job_description)
+    st.caption(
+        f"Local pre-score: {local_score.score:.0f}/100 · matched skills: "
+        f"{', '.join(local_score.matched_skills) or 'none'}"
+    )
+    if local_score.score < st.session_state.min_prescore:
+        st.warning(
+            f"⚠️ Local pre-score is below {st.session_state.min_prescore:.0f}, so the AI comparison was skipped. "
+            f"Missing skills: {', '.join(local_score.missing_skills) or 'none'}"
+        )
+        return False
+    return True
+
+def run_job_comparison(results_area):
+    """Compare the extracted text with the job description, streaming into results_area when enabled"""
+    use_cache = not st.session_state.bypass_response_cache
+    comparison_result = None
+    
+    if not passes_prescore_gate():
+        return
+    
+    if st.session_state.stream_results:
+        for comparison_result in stream_job_comparison(
+            st.session_state.extracted_text,
+            st.session_state.job_description,
+            st.session_state.azure_openai_endpoint,
+            st.session_state.azure_openai_key,
+            st.session_state.azure_openai_deployment,
+            use_cache=use_cache
+        ):
+            with results_area.container():
+                render_job_comparison(comparison_result, partial=True)
+    else:
+        with st.spinner("Comparing resume with job description..."):
+            comparison_result = compare_resume_with_job(
+                st.session_state.extracted_text,
+                st.session_state.job_description,
+                st.session_state.azure_openai_endpoint,
+                st.session_state.azure_openai_key,
+                st.session_state.azure_openai_deployment,
+                use_cache=use_cache
+            )
+    
+    if comparison_result:
+        st.session_state.job_comparison = comparison_result
+        with results_area.container():
+            render_job_comparison(comparison_result)
+        st.success("✅ Job comparison completed!")
+    else:
+        st.error("❌ Failed to compare resume with job description.")
+
+def run_combined_analysis(feedback_area, comparison_area):
+    """Fill both the feedback and the job match panels from one combined request"""
+    # Below the minimum pre-score only the feedback half is requested
+    if not passes_prescore_gate():
+        run_feedback_analysis(feedback_area)
+        return
+    
+    with st.spinner("Analyzing your resume against the job description..."):
+        analysis = analyze_resume_and_job(
+            st.session_state.extracted_text,
+            st.session_state.job_description,
+            st.session_state.azure_openai_endpoint,
+            st.session_state.azure_openai_key,
+            st.session_state.azure_openai_deployment,
+            use_cache=not st.session_state.bypass_response_cache
+        )
+    
+    if analysis is None:
+        st.error("❌ Failed to get feedback from Azure OpenAI.")
+        return
+    
+    suggestions, comparison = analysis
+    st.session_state.feedback_suggestions = suggestions
+    st.session_state.resume_revisions[st.session_state.resume_file] = ResumeRevision(
+        split_sections(st.session_state.extracted_text), suggestions
+    )
+    st.session_state.job_comparison = comparison
+    with feedback_area.container():
+        render_feedback_suggestions(suggestions)
+    with comparison_area.container():
+        render_job_comparison(comparison)
+    st.success("✅ Resume analysis and job comparison completed!")
+
+def get_session_resume_index(create: bool = False):
+    """Return the candidate index this session may search: its tenant's, or else its own
+
+    Nothing is written to disk until a resume is added, so without create=True a missing index is None.
+    """
+    from vector_index import get_resume_index, index_namespace
+    return get_resume_index(index_namespace(st.session_state.session_id), create=create)
+
+def run_shortlist_comparison(
+    matches: list,
+    resume_index,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> list:
+    """Run the AI comparison for each retrieved candidate concurrently"""
+    # Session state is only readable on the script thread, so every setting is passed in
+    def compare_candidate(match: dict) -> dict:
+        comparison = compare_resume_with_job(
+            resume_index.get_text(match["id"]),
+            job_description,
+            endpoint,
+            api_key,
+            deployment_name,
+            use_cache=use_cache
+        )
+        return {**match, "score": comparison.get('score') if comparison else None}
+    
+    with ThreadPoolExecutor(max_workers=SHORTLIST_WORKERS) as executor:
+        return list(executor.map(compare_candidate, matches))
+
+def poll_extraction_job() -> Optional[Job]:
+    """Check the session's extraction job, returning it while still running"""
+    job_id = st.session_state.extraction_job_id
+    if not job_id:
+        return None
+    
+    job = get_extraction_queue().get(job_id)
+    if job is None:
+        st.session_state.extraction_job_id = None
+        return None
+    if not job.done:
+        return job
+    
+    st.session_state.extraction_job_id = None
+    extracted_text = job.result if job.status == "done" else ""
+    if not extracted_text:
+        reason = f" ({job.error})" if job.error else ""
+        st.session_state.analysis_status = ("error", f"❌ Failed to extract text from the uploaded file{reason}.")
         return None
+    
+    # Resumes only join the candidate index when the user opted in
+    if st.session_state.index_resumes:
+        try:
+            get_session_resume_index(create=True).add_resume(job.description, extracted_text)
+        except Exception as e:
+            st.warning(f"⚠️ Could not add the resume to the candidate index: {str(e)}")
+    
+    # Feedback is generated while rendering the results column so it can stream in
+    st.session_state.extracted_text = extracted_text
+    # Revisions are matched by file name, so another candidate's resume is never diffed against this one
+    st.session_state.resume_file = job.description.lower()
+    st.session_state.feedback_suggestions = []
+    if st.session_state.combined_analysis and st.session_state.job_description.strip():
+        # One request covers both panels when a job description is already present
+        st.session_state.job_comparison = None
+        st.session_state.combined_pending = True
+    else:
+        st.session_state.feedback_pending = True
+    return None
+
+@st.cache_resource
+def load_styles() -> str:
+    """Read the stylesheet once per process instead of rebuilding it on every rerun"""
+    with open(STYLES_PATH, encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
 
 def main():
+    # Page configuration; must be the first Streamlit call of every run
+    st.set_page_config(
+        page_title="ResumeAI - Resume Analysis Tool",
+        page_icon="📄",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(load_styles(), unsafe_allow_html=True)
+    
     initialize_session_state()
+    metrics_url = start_metrics_server()
     
     # Modern Header
     st.markdown("""
@@ -606,6 +1375,7 @@ def main():
             "API Key",
             value=st.session_state.azure_doc_key,
             type="password",
+            key="azure_doc_key_input",
             placeholder="Enter your API key"
         )
         
@@ -629,6 +1399,7 @@ def main():
             "API Key",
             value=st.session_state.azure_openai_key,
             type="password",
+            key="azure_openai_key_input",
             placeholder="Enter your API key"
         )
         st.session_state.azure_openai_deployment = st.text_input(
@@ -660,6 +1431,120 @@ def main():
             <span class="status-text">Azure OpenAI</span>
         </div>
         """, unsafe_allow_html=True)
+        
+        st.session_state.stream_results = st.checkbox(
+            "Stream results",
+            value=st.session_state.stream_results,
+            help="Show feedback and the match score as they are generated"
+        )
+        
+        st.session_state.combined_analysis = st.checkbox(
+            "Combine feedback and job match",
+            value=st.session_state.combined_analysis,
+            help="When a job description is present, get feedback and the match score from a single request"
+        )
+        st.session_state.min_prescore = st.number_input(
+            "Minimum pre-score for AI comparison",
+            min_value=0.0,
+            max_value=100.0,
+            value=st.session_state.min_prescore,
+            step=5.0,
+            help="Skip the Azure OpenAI comparison when the local keyword match score is lower than this"
+        )
+        
+        # Cache controls and counters
+        st.session_state.bypass_response_cache = st.checkbox(
+            "Bypass response cache",
+            value=st.session_state.bypass_response_cache,
+            help="Always request a fresh analysis from Azure OpenAI"
+        )
+        extraction_stats = get_extraction_cache().stats()
+        response_stats = get_response_cache().stats()
+        st.caption(
+            f"Extraction cache: {extraction_stats['hits']} hits / {extraction_stats['misses']} misses"
+        )
+        st.caption(
+            f"Response cache: {response_stats['hits']} hits, "
+            f"{response_stats['saved_tokens']} tokens and {response_stats['saved_latency']:.1f}s saved"
+        )
+        flight_stats = get_single_flight().stats()
+        st.caption(
+            f"Coalesced requests: {flight_stats['shared']} shared an in-flight call, "
+            f"{flight_stats['expired']} gave up waiting ({flight_stats['in_flight']} in flight now)"
+        )
+        parse_stats = get_parse_stats().stats()
+        st.caption(
+            f"Structured replies: {parse_stats['parsed']} parsed, "
+            f"{parse_stats['failure_rate']:.0%} needed repair ({parse_stats['repaired']} repaired)"
+        )
+        routing_stats = get_routing_stats().stats()
+        st.caption(
+            f"Extraction routing ({get_routing_policy().mode}): {routing_stats['local']} local / "
+            f"{routing_stats['document_intelligence']} Document Intelligence, {routing_stats['accuracy']:.0%} accurate"
+        )
+        extraction_queue = get_extraction_queue()
+        if extraction_queue.mode == "remote":
+            st.caption(f"Jobs: worker service at {extraction_queue.url}")
+        else:
+            queue_stats = extraction_queue.stats()
+            st.caption(
+                f"Jobs: {queue_stats['workers']} {queue_stats['mode']}, "
+                f"{queue_stats['running']} running / {queue_stats['queued']} queued"
+            )
+        client_stats = get_client_registry().stats()
+        st.caption(f"Client reuse: {client_stats['reused']} reuses")
+        for kind, latency in client_stats["kinds"].items():
+            st.caption(
+                f"{CLIENT_KIND_LABELS.get(kind, kind)} warm connections save "
+                f"{latency['saved_p50'] * 1000:.0f} ms p50 / {latency['saved_p99'] * 1000:.0f} ms p99"
+            )
+        
+        if SHOW_ADMIN_PANELS:
+            # Live per-stage timings for operators
+            with st.expander("📈 Stage Metrics", expanded=False):
+                if metrics_url:
+                    st.caption(f"Prometheus endpoint: {metrics_url}")
+                stage_summaries = get_metrics().stage_summaries()
+                if stage_summaries:
+                    st.dataframe(
+                        [
+                            {
+                                "Stage": stage,
+                                "Count": summary["count"],
+                                "p50 ms": round(summary["p50"] * 1000, 1),
+                                "p95 ms": round(summary["p95"] * 1000, 1),
+                                "p99 ms": round(summary["p99"] * 1000, 1),
+                            }
+                            for stage, summary in stage_summaries.items()
+                        ],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    st.dataframe(
+                        [
+                            {"Metric": name, **labels, "Value": value}
+                            for name, labels, value in get_metrics().counters()
+                        ],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.caption("No stages recorded yet.")
+        
+            # Recent routing decisions, so admins can tune the RESUMEAI_ROUTING_* policy
+            with st.expander("🧭 Extraction Routing", expanded=False):
+                recent_decisions = get_routing_stats().recent()
+                if recent_decisions:
+                    st.caption(
+                        f"{routing_stats['misroutes']} local misroutes and {routing_stats['avoidable']} avoidable "
+                        f"Document Intelligence calls out of {routing_stats['checked']} checked"
+                    )
+                    st.dataframe(recent_decisions, use_container_width=True, hide_index=True)
+                else:
+                    st.caption("No documents routed yet.")
+    
+    # Pick up the result of a background extraction started on an earlier run
+    extraction_job = poll_extraction_job()
     
     # Main content area
     col1, col2 = st.columns([1, 2])
@@ -690,58 +1575,46 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            st.session_state.index_resumes = st.checkbox(
+                "Add to candidate search",
+                value=st.session_state.index_resumes,
+                help="Keep this resume's text in the candidate index so job descriptions can be matched against it"
+            )
+            
             # Analyze button
             if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
                 if not openai_configured:
                     st.error("❌ Please configure Azure OpenAI credentials in the sidebar first.")
                     return
                 
-                with st.spinner("Analyzing your resume..."):
-                    # Extract text based on file type
-                    file_content = uploaded_file.read()
-                    file_extension = uploaded_file.name.lower().split('.')[-1]
-                    
-                    extracted_text = ""
-                    
-                    if file_extension == 'txt':
-                        # Direct text reading for TXT files
-                        extracted_text = file_content.decode('utf-8')
-                    
-                    elif file_extension in ['pdf', 'docx']:
-                        # Try Azure Document Intelligence first if configured
-                        if doc_intel_configured:
-                            extracted_text = extract_text_with_document_intelligence(
-                                file_content,
-                                uploaded_file.name,
-                                st.session_state.azure_doc_endpoint,
-                                st.session_state.azure_doc_key
-                            )
-                        
-                        # Fallback to local extraction if Document Intelligence fails or not configured
-                        if not extracted_text:
-                            if file_extension == 'pdf':
-                                extracted_text = extract_text_from_pdf(file_content)
-                            elif file_extension == 'docx':
-                                extracted_text = extract_text_from_docx(file_content)
-                    
-                    if extracted_text:
-                        st.session_state.extracted_text = extracted_text
-                        
-                        # Get feedback from Azure OpenAI
-                        feedback = get_resume_feedback(
-                            extracted_text,
-                            st.session_state.azure_openai_endpoint,
-                            st.session_state.azure_openai_key,
-                            st.session_state.azure_openai_deployment
-                        )
-                        
-                        if feedback:
-                            st.session_state.feedback_suggestions = feedback
-                            st.success("✅ Resume analysis completed!")
-                        else:
-                            st.error("❌ Failed to get feedback from Azure OpenAI.")
-                    else:
-                        st.error("❌ Failed to extract text from the uploaded file.")
+                # Extraction runs on the shared job queue (or the worker service) so this session never blocks
+                try:
+                    st.session_state.extraction_job_id = get_extraction_queue().submit(
+                        uploaded_file.name,
+                        extract_resume_text,
+                        uploaded_file.getvalue(),
+                        uploaded_file.name,
+                        st.session_state.azure_doc_endpoint if doc_intel_configured else "",
+                        st.session_state.azure_doc_key if doc_intel_configured else ""
+                    )
+                except Exception as e:
+                    st.error(f"❌ Could not submit the extraction job: {str(e)}")
+                    return
+                extraction_job = get_extraction_queue().get(st.session_state.extraction_job_id)
+        
+        if extraction_job is not None:
+            st.info(f"⏳ Extracting text from {extraction_job.description}: {extraction_job.progress}")
+            partial_text = extraction_job.partial_text()
+            if partial_text:
+                with st.expander("📄 Extracted so far", expanded=False):
+                    st.text(partial_text[-EXTRACTION_PREVIEW_CHARS:])
+        elif st.session_state.analysis_status:
+            status_type, status_message = st.session_state.analysis_status
+            st.session_state.analysis_status = None
+            if status_type == "success":
+                st.success(status_message)
+            else:
+                st.error(status_message)
         
         # Job Description Comparison Section
         st.markdown("""
@@ -767,24 +1640,91 @@ def main():
                     st.error("❌ Please configure Azure OpenAI credentials in the sidebar first.")
                     return
                 
-                with st.spinner("Comparing resume with job description..."):
-                    comparison_result = compare_resume_with_job(
-                        st.session_state.extracted_text,
-                        st.session_state.job_description,
-                        st.session_state.azure_openai_endpoint,
-                        st.session_state.azure_openai_key,
-                        st.session_state.azure_openai_deployment
-                    )
-                    
-                    if comparison_result:
-                        st.session_state.job_comparison = comparison_result
-                        st.success("✅ Job comparison completed!")
-                    else:
-                        st.error("❌ Failed to compare resume with job description.")
+                # The comparison runs in the results column so the score can stream in first
+                st.session_state.comparison_pending = True
         elif st.session_state.job_description.strip() and not st.session_state.extracted_text:
             st.warning("⚠️ Please upload and analyze a resume first to enable comparison.")
         elif not st.session_state.job_description.strip():
             st.info("💡 Paste a job description above to compare with your resume.")
+        
+        # Retrieve the best matching candidates from the resumes added to this session's (or tenant's)
+        # index; the index (and NumPy) is only loaded once there is a job description to search with
+        resume_index = None
+        if st.session_state.job_description.strip():
+            resume_index = get_session_resume_index()
+        if resume_index is not None and len(resume_index) > 0:
+            top_k = st.number_input(
+                "Candidates to retrieve",
+                min_value=1,
+                max_value=100,
+                value=5,
+                help=f"Search the {len(resume_index)} indexed resumes for the best matches"
+            )
+            if st.button("🔎 Find Top Candidates", use_container_width=True):
+                st.session_state.candidate_matches = resume_index.search(
+                    st.session_state.job_description, int(top_k)
+                )
+            if st.session_state.candidate_matches and st.button("🤖 Compare Shortlist with AI", use_container_width=True):
+                if not openai_configured:
+                    st.error("❌ Please configure Azure OpenAI credentials in the sidebar first.")
+                    return
+                with st.spinner("Comparing shortlisted candidates..."):
+                    st.session_state.candidate_matches = run_shortlist_comparison(
+                        st.session_state.candidate_matches,
+                        resume_index,
+                        st.session_state.job_description,
+                        st.session_state.azure_openai_endpoint,
+                        st.session_state.azure_openai_key,
+                        st.session_state.azure_openai_deployment,
+                        use_cache=not st.session_state.bypass_response_cache
+                    )
+        
+        # Score the analyzed resume against several job descriptions at once
+        with st.expander("📋 Compare Multiple Jobs", expanded=bool(st.session_state.multi_job_results)):
+            st.session_state.job_descriptions_text = st.text_area(
+                "Paste Job Descriptions",
+                value=st.session_state.job_descriptions_text,
+                height=200,
+                placeholder="Paste several job descriptions, separated by a line containing only ---",
+                help="Each job description is compared with your resume and ranked by match score"
+            )
+            job_files = st.file_uploader(
+                "Or upload job descriptions",
+                type=['txt', 'pdf', 'docx'],
+                accept_multiple_files=True,
+                help="One job description per PDF/DOCX file; TXT files may hold several separated by ---"
+            )
+            
+            if st.button(
+                "🎯 Compare All Jobs",
+                use_container_width=True,
+                disabled=not st.session_state.extracted_text
+            ):
+                job_descriptions = (
+                    split_job_descriptions(st.session_state.job_descriptions_text)
+                    + read_job_description_files(job_files or [])
+                )
+                if not openai_configured:
+                    st.error("❌ Please configure Azure OpenAI credentials in the sidebar first.")
+                    return
+                if not job_descriptions:
+                    st.warning("⚠️ Paste or upload at least one job description.")
+                else:
+                    if len(job_descriptions) > MAX_JOB_DESCRIPTIONS:
+                        st.warning(f"⚠️ Only the first {MAX_JOB_DESCRIPTIONS} job descriptions are compared.")
+                        job_descriptions = job_descriptions[:MAX_JOB_DESCRIPTIONS]
+                    with st.spinner(f"Comparing your resume with {len(job_descriptions)} job descriptions..."):
+                        results = compare_resume_with_jobs(
+                            st.session_state.extracted_text,
+                            job_descriptions,
+                            st.session_state.azure_openai_endpoint,
+                            st.session_state.azure_openai_key,
+                            st.session_state.azure_openai_deployment,
+                            use_cache=not st.session_state.bypass_response_cache,
+                            min_prescore=st.session_state.min_prescore
+                        )
+                    if results is not None:
+                        st.session_state.multi_job_results = results
     
     with col2:
         st.markdown("""
@@ -807,95 +1747,26 @@ def main():
                 )
             
             # Display feedback suggestions with modern styling
-            if st.session_state.feedback_suggestions:
-                st.markdown("""
-                <div class="results-container">
-                    <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
-                        💡 AI Feedback Suggestions
-                    </h3>
-                    <p style="color: var(--text-secondary); margin-bottom: 1.5rem;">
-                        Here are 3 specific recommendations to improve your resume:
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                for i, suggestion in enumerate(st.session_state.feedback_suggestions, 1):
-                    st.markdown(f"""
-                    <div class="suggestion-card">
-                        <div style="display: flex; align-items: flex-start;">
-                            <span class="suggestion-number">{i}</span>
-                            <div style="flex: 1;">
-                                <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
-                                    {suggestion}
-                                </p>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            feedback_area = st.empty()
+            comparison_area = st.empty()
+            combined_ran = st.session_state.combined_pending
+            if combined_ran:
+                st.session_state.combined_pending = False
+                run_combined_analysis(feedback_area, comparison_area)
+            elif st.session_state.feedback_pending:
+                st.session_state.feedback_pending = False
+                run_feedback_analysis(feedback_area)
+            elif st.session_state.feedback_suggestions:
+                with feedback_area.container():
+                    render_feedback_suggestions(st.session_state.feedback_suggestions)
             
             # Display job comparison results
-            if st.session_state.job_comparison:
-                st.markdown("""
-                <div class="results-container">
-                    <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
-                        🎯 Job Match Analysis
-                    </h3>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Score display with visual indicator
-                score = st.session_state.job_comparison.get('score', 0)
-                score_color = "#10b981" if score >= 80 else "#f59e0b" if score >= 60 else "#ef4444"
-                
-                st.markdown(f"""
-                <div style="text-align: center; margin-bottom: 2rem;">
-                    <div style="font-size: 3rem; font-weight: 800; color: {score_color}; margin-bottom: 0.5rem;">
-                        {score}/100
-                    </div>
-                    <div style="font-size: 1.2rem; color: var(--text-secondary); font-weight: 600;">
-                        Match Score
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Explanation
-                if st.session_state.job_comparison.get('explanation'):
-                    st.markdown("""
-                    <div class="suggestion-card">
-                        <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
-                            📝 Analysis
-                        </h4>
-                        <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
-                            """ + st.session_state.job_comparison['explanation'] + """
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Strengths
-                if st.session_state.job_comparison.get('strengths'):
-                    st.markdown("""
-                    <div class="suggestion-card">
-                        <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
-                            ✅ Key Strengths
-                        </h4>
-                        <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
-                            """ + st.session_state.job_comparison['strengths'] + """
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Areas for improvement
-                if st.session_state.job_comparison.get('improvements'):
-                    st.markdown("""
-                    <div class="suggestion-card">
-                        <h4 style="margin: 0 0 1rem 0; color: var(--text-primary); font-weight: 600;">
-                            🔧 Areas to Improve
-                        </h4>
-                        <p style="margin: 0; line-height: 1.6; color: var(--text-primary);">
-                            """ + st.session_state.job_comparison['improvements'] + """
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+            if st.session_state.comparison_pending:
+                st.session_state.comparison_pending = False
+                run_job_comparison(comparison_area)
+            elif st.session_state.job_comparison and not combined_ran:
+                with comparison_area.container():
+                    render_job_comparison(st.session_state.job_comparison)
         else:
             st.markdown("""
             <div class="upload-area">
@@ -904,6 +1775,81 @@ def main():
                 <p>Upload a resume file and click 'Analyze Resume' to see results here.</p>
             </div>
             """, unsafe_allow_html=True)
+    
+        # Candidate search results
+        if st.session_state.candidate_matches:
+            st.markdown("""
+            <div class="results-container">
+                <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
+                    🔎 Top Candidates
+                </h3>
+            </div>
+            """, unsafe_allow_html=True)
+            st.dataframe(
+                [
+                    {
+                        "Resume": match["name"],
+                        "Similarity": match["similarity"],
+                        "Match Score": match.get("score"),
+                    }
+                    for match in st.session_state.candidate_matches
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        # Multi-job comparison results; click a column header to sort
+        if st.session_state.multi_job_results:
+            st.markdown("""
+            <div class="results-container">
+                <h3 style="margin-bottom: 1.5rem; color: var(--text-primary); font-weight: 700;">
+                    📋 Job Matches
+                </h3>
+            </div>
+            """, unsafe_allow_html=True)
+            ranked_jobs = sorted(
+                st.session_state.multi_job_results,
+                key=lambda row: row["score"] if row["score"] is not None else -1,
+                reverse=True
+            )
+            st.dataframe(
+                [
+                    {
+                        "Job": row["job"],
+                        "Match Score": row["score"],
+                        "Pre-score": row["prescore"],
+                        "Note": row["error"] or "",
+                    }
+                    for row in ranked_jobs
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+            compared_jobs = [row for row in ranked_jobs if row["comparison"]]
+            if compared_jobs:
+                selected = st.selectbox(
+                    "Show analysis for",
+                    range(len(compared_jobs)),
+                    format_func=lambda index: f"{compared_jobs[index]['job']} ({compared_jobs[index]['score']}/100)"
+                )
+                render_job_comparison(compared_jobs[selected]["comparison"])
+    
+    # Browse a batch screening run written with batch_screening.py --store; results cover every candidate in the run
+    if SHOW_ADMIN_PANELS:
+        with st.expander("🗂️ Screening Results", expanded=bool(st.session_state.results_store_dir)):
+            st.session_state.results_store_dir = st.text_input(
+                "Results store directory",
+                value=st.session_state.results_store_dir,
+                placeholder=".resumeai_cache/screening_results",
+                help="Directory passed to batch_screening.py --store"
+            )
+            if st.session_state.results_store_dir:
+                render_screening_results(st.session_state.results_store_dir)
+    
+    # Keep polling while extraction is still running in the background
+    if extraction_job is not None:
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
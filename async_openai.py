@@ -0,0 +1,381 @@
+"""Async Azure OpenAI path with request and token rate limiting for batch workloads"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+import weakref
+from typing import Optional, Dict, Any, Tuple
+
+import openai
+from openai import AsyncAzureOpenAI
+
+from app import (
+    COMPARISON_MAX_TOKENS,
+    COMPARISON_TEMPERATURE,
+    FEEDBACK_MAX_TOKENS,
+    FEEDBACK_TEMPERATURE,
+    OPENAI_API_VERSION,
+    build_comparison_messages,
+    build_feedback_messages,
+    report_error,
+)
+from cache import get_response_cache, response_cache_key
+from completion_flow import CompletionRequest, condense_flow, run_flow_async, structured_flow
+from metrics import get_metrics, record_event, trace_stage
+from schemas import COMPARISON_SCHEMA_HINT, FEEDBACK_SCHEMA_HINT, parse_feedback_result, parse_job_comparison
+
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("AZURE_OPENAI_RPM", "60"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("AZURE_OPENAI_TPM", "60000"))
+MAX_RETRIES = 6
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class RateLimiter:
+    """Token-bucket scheduler enforcing requests-per-minute and tokens-per-minute budgets"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_budget = float(requests_per_minute)
+        self._token_budget = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_budget = min(
+            self.requests_per_minute, self._request_budget + elapsed * self.requests_per_minute / 60
+        )
+        self._token_budget = min(
+            self.tokens_per_minute, self._token_budget + elapsed * self.tokens_per_minute / 60
+        )
+
+    async def acquire(self, tokens: int):
+        """Wait until one request and the estimated tokens fit in the budget"""
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+
+                self._refill()
+                if self._request_budget >= 1 and self._token_budget >= tokens:
+                    self._request_budget -= 1
+                    self._token_budget -= tokens
+                    return
+
+                request_wait = max(0.0, (1 - self._request_budget) * 60 / self.requests_per_minute)
+                token_wait = max(0.0, (tokens - self._token_budget) * 60 / self.tokens_per_minute)
+                await asyncio.sleep(max(request_wait, token_wait))
+
+    def refund(self, estimated_tokens: int, actual_tokens: int):
+        """Return over-reserved tokens once the real usage is known"""
+        self._token_budget = min(self.tokens_per_minute, self._token_budget + estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float):
+        """Hold all requests after the service reports throttling"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def estimate_tokens(messages: list, max_tokens: int) -> int:
+    """Roughly estimate the tokens a request will consume (about 4 characters per token)"""
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the Retry-After hint from a throttled response, if present"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt))
+
+
+def _credentials_key(endpoint: str, secret: str) -> str:
+    return hashlib.sha256(f"{endpoint}\n{secret}".encode('utf-8')).hexdigest()
+
+
+class AsyncClientSession:
+    """Async clients and rate limiters for one event loop, closed together when the run ends"""
+
+    def __init__(self):
+        self._clients: Dict[str, AsyncAzureOpenAI] = {}
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+    def client(self, endpoint: str, api_key: str) -> AsyncAzureOpenAI:
+        key = _credentials_key(endpoint, api_key)
+        if key not in self._clients:
+            # Retries are handled by the scheduler so Retry-After is respected across all requests
+            self._clients[key] = AsyncAzureOpenAI(
+                azure_endpoint=endpoint,
+                api_key=api_key,
+                api_version=OPENAI_API_VERSION,
+                max_retries=0
+            )
+        return self._clients[key]
+
+    def limiter(self, endpoint: str, deployment_name: str) -> RateLimiter:
+        key = (endpoint, deployment_name)
+        if key not in self._limiters:
+            self._limiters[key] = RateLimiter(DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+        return self._limiters[key]
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._limiters.clear()
+        await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
+
+
+# Async clients and locks are bound to the event loop that created them. Sessions are keyed weakly on the
+# loop object itself, since a loop's id can be reused by a later loop once the first is collected
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClientSession]" = weakref.WeakKeyDictionary()
+
+
+def get_async_session() -> AsyncClientSession:
+    """Return the client session of the running event loop"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None:
+        session = _sessions[loop] = AsyncClientSession()
+    return session
+
+
+async def close_async_session():
+    """Close the running event loop's clients; call this when a batch run finishes"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def get_async_client(endpoint: str, api_key: str) -> AsyncAzureOpenAI:
+    """Return the async client for an endpoint on the running event loop"""
+    return get_async_session().client(endpoint, api_key)
+
+
+def get_rate_limiter(endpoint: str, deployment_name: str) -> RateLimiter:
+    """Return the shared rate limiter for a deployment on the running event loop"""
+    return get_async_session().limiter(endpoint, deployment_name)
+
+
+async def chat_completion_async(
+    client: AsyncAzureOpenAI,
+    limiter: RateLimiter,
+    deployment_name: str,
+    messages: list,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Run a rate-limited chat completion with retries, serving repeats from the response cache"""
+    cache = get_response_cache()
+    key = response_cache_key(deployment_name, messages, temperature, max_tokens, response_format)
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            record_event("cache_hit", "completion")
+            return cached["content"]
+        record_event("cache_miss", "completion")
+
+    request_options = {"response_format": response_format} if response_format else {}
+    estimated_tokens = estimate_tokens(messages, max_tokens)
+    for attempt in range(MAX_RETRIES + 1):
+        waited = time.perf_counter()
+        await limiter.acquire(estimated_tokens)
+        get_metrics().observe("rate_limit_wait", time.perf_counter() - waited)
+        started = time.perf_counter()
+        try:
+            with trace_stage("completion") as stage:
+                response = await client.chat.completions.create(
+                    model=deployment_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **request_options
+                )
+                if response.usage:
+                    stage.record(
+                        prompt_tokens=response.usage.prompt_tokens,
+                        completion_tokens=response.usage.completion_tokens
+                    )
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_RETRIES:
+                raise
+            record_event("retry", "completion")
+            delay = retry_after_seconds(e)
+            if delay is not None:
+                limiter.pause(delay)
+            else:
+                await asyncio.sleep(backoff_seconds(attempt))
+            continue
+
+        latency = time.perf_counter() - started
+        content = response.choices[0].message.content
+        total_tokens = response.usage.total_tokens if response.usage else estimated_tokens
+        limiter.refund(estimated_tokens, total_tokens)
+        cache.set(key, content, total_tokens, latency)
+        return content
+
+
+async def complete_request_async(
+    client: AsyncAzureOpenAI,
+    limiter: RateLimiter,
+    deployment_name: str,
+    request: CompletionRequest
+) -> str:
+    """Answer one request from a completion flow with chat_completion_async"""
+    return await chat_completion_async(
+        client,
+        limiter,
+        deployment_name,
+        request.messages,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        use_cache=request.use_cache,
+        response_format=request.response_format
+    )
+
+
+async def structured_completion_async(
+    client: AsyncAzureOpenAI,
+    limiter: RateLimiter,
+    deployment_name: str,
+    messages: list,
+    parse_fn,
+    schema_hint: str,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True
+):
+    """Run a JSON-mode chat completion and validate it, repairing a malformed reply once"""
+    return await run_flow_async(
+        structured_flow(deployment_name, messages, parse_fn, schema_hint, max_tokens, temperature, use_cache),
+        lambda request: complete_request_async(client, limiter, deployment_name, request)
+    )
+
+
+async def condense_resume_async(
+    resume_text: str,
+    client: AsyncAzureOpenAI,
+    limiter: RateLimiter,
+    deployment_name: str,
+    use_cache: bool = True
+) -> str:
+    """Clean the resume and, when it is over the token budget, condense its chunks concurrently"""
+    return await run_flow_async(
+        condense_flow(resume_text, use_cache),
+        lambda request: complete_request_async(client, limiter, deployment_name, request)
+    )
+
+
+async def request_resume_feedback_async(
+    resume_text: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> list:
+    """Get resume feedback from Azure OpenAI without blocking the event loop (raises on failure)"""
+    client = get_async_client(endpoint, api_key)
+    limiter = get_rate_limiter(endpoint, deployment_name)
+    resume_text = await condense_resume_async(resume_text, client, limiter, deployment_name, use_cache)
+    feedback = await structured_completion_async(
+        client,
+        limiter,
+        deployment_name,
+        build_feedback_messages(resume_text),
+        parse_feedback_result,
+        FEEDBACK_SCHEMA_HINT,
+        max_tokens=FEEDBACK_MAX_TOKENS,
+        temperature=FEEDBACK_TEMPERATURE,
+        use_cache=use_cache
+    )
+    return feedback.suggestions
+
+
+async def get_resume_feedback_async(
+    resume_text: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Optional[list]:
+    """Get resume feedback from Azure OpenAI without blocking the event loop"""
+    try:
+        return await request_resume_feedback_async(resume_text, endpoint, api_key, deployment_name, use_cache)
+    except Exception as e:
+        report_error(f"Error getting feedback from Azure OpenAI: {str(e)}")
+        return None
+
+
+async def request_job_comparison_async(
+    resume_text: str,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> dict:
+    """Compare resume with job description without blocking the event loop (raises on failure)"""
+    client = get_async_client(endpoint, api_key)
+    limiter = get_rate_limiter(endpoint, deployment_name)
+    resume_text = await condense_resume_async(resume_text, client, limiter, deployment_name, use_cache)
+    comparison = await structured_completion_async(
+        client,
+        limiter,
+        deployment_name,
+        build_comparison_messages(resume_text, job_description),
+        parse_job_comparison,
+        COMPARISON_SCHEMA_HINT,
+        max_tokens=COMPARISON_MAX_TOKENS,
+        temperature=COMPARISON_TEMPERATURE,
+        use_cache=use_cache
+    )
+    return comparison.to_dict()
+
+
+async def compare_resume_with_job_async(
+    resume_text: str,
+    job_description: str,
+    endpoint: str,
+    api_key: str,
+    deployment_name: str,
+    use_cache: bool = True
+) -> Optional[dict]:
+    """Compare resume with job description without blocking the event loop"""
+    try:
+        return await request_job_comparison_async(
+            resume_text, job_description, endpoint, api_key, deployment_name, use_cache
+        )
+    except Exception as e:
+        report_error(f"Error comparing resume with job description: {str(e)}")
+        return None
@@ -0,0 +1,446 @@
+"""Headless batch screening: rank a folder or zip of resumes against one job description
+
+Usage:
+    python batch_screening.py resumes/ --job job.txt --output results.jsonl --workers 8
+    python batch_screening.py resumes/ --job job.txt --store .resumeai_cache/screening_results
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterable, Iterator, List, Tuple
+
+from app import extract_resume_text, request_job_comparison
+from metrics import start_metrics_server
+from prescoring import prescore, prescore_many, select_candidates
+from results_store import ResultsStore
+from routing import ROUTING_MODES, get_routing_policy, get_routing_stats, set_routing_policy
+from schemas import get_parse_stats
+from vector_index import get_resume_index
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+RESULT_FIELDS = ['rank', 'file', 'status', 'score', 'prescore', 'explanation', 'strengths', 'improvements', 'error']
+
+
+@dataclass
+class ScreeningConfig:
+    """Azure credentials and options for a screening run"""
+    openai_endpoint: str
+    openai_key: str
+    openai_deployment: str
+    doc_endpoint: str = ""
+    doc_key: str = ""
+    use_cache: bool = True
+    min_prescore: float = 0.0
+    top_k: Optional[int] = None
+    index_resumes: bool = False
+
+
+def iter_resume_files(source: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, content) for every supported resume in a directory or zip archive"""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield info.filename, archive.read(info)
+        return
+
+    for root, _, files in os.walk(source):
+        for filename in sorted(files):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                path = os.path.join(root, filename)
+                with open(path, 'rb') as f:
+                    yield os.path.relpath(path, source), f.read()
+
+
+def prepare_resume(name: str, file_content: bytes, job_description: str, config: ScreeningConfig) -> Dict[str, Any]:
+    """Extract a resume and pre-score it locally; the text is kept under '_text' for the LLM stage"""
+    record: Dict[str, Any] = {'file': name, 'status': 'ok', 'score': None, 'prescore': None}
+
+    resume_text = extract_resume_text(file_content, name, config.doc_endpoint, config.doc_key)
+    if not resume_text:
+        # The extractor's own error message is logged; the row only says that nothing came back
+        record['status'] = 'extraction_failed'
+        record['error'] = 'No text could be extracted'
+        return record
+
+    record['_text'] = resume_text
+    if config.index_resumes:
+        get_resume_index().add_resume(name, resume_text)
+    record['prescore'] = prescore(resume_text, job_description).score
+    if record['prescore'] < config.min_prescore:
+        record['status'] = 'below_prescore'
+    return record
+
+
+def needs_comparison(record: Dict[str, Any]) -> bool:
+    return record['status'] == 'ok' and '_text' in record
+
+
+def apply_comparison(record: Dict[str, Any], comparison: Optional[dict], error: str = "") -> Dict[str, Any]:
+    """Merge an LLM comparison, or the reason it failed, into a record and drop the resume text"""
+    record.pop('_text', None)
+    if comparison is None:
+        record['status'] = 'comparison_failed'
+        record['error'] = error or 'No comparison was returned'
+    else:
+        record.update(comparison)
+    return record
+
+
+def compare_record(record: Dict[str, Any], job_description: str, config: ScreeningConfig) -> Dict[str, Any]:
+    """Run the LLM comparison for a prepared record that passed the pre-score gate"""
+    if not needs_comparison(record):
+        record.pop('_text', None)
+        return record
+
+    try:
+        comparison = request_job_comparison(
+            record['_text'],
+            job_description,
+            config.openai_endpoint,
+            config.openai_key,
+            config.openai_deployment,
+            use_cache=config.use_cache
+        )
+    except Exception as e:
+        return apply_comparison(record, None, f"{type(e).__name__}: {e}")
+    return apply_comparison(record, comparison)
+
+
+def screen_resume(name: str, file_content: bytes, job_description: str, config: ScreeningConfig) -> Dict[str, Any]:
+    """Extract, pre-score and (if it passes the gate) LLM-score a single resume"""
+    return compare_record(prepare_resume(name, file_content, job_description, config), job_description, config)
+
+
+def shortlist(records: List[Dict[str, Any]], job_description: str, config: ScreeningConfig) -> List[Dict[str, Any]]:
+    """Re-score prepared records against each other and mark all but the top K as not shortlisted"""
+    candidates = [record for record in records if needs_comparison(record)]
+    # Scoring the whole batch together gives corpus-wide IDF weights
+    scores = prescore_many([record['_text'] for record in candidates], job_description)
+    for record, score in zip(candidates, scores):
+        record['prescore'] = score.score
+
+    selected = select_candidates([score.score for score in scores], config.min_prescore, config.top_k)
+    selected_ids = {id(candidates[index]) for index in selected}
+    for record in candidates:
+        if id(record) not in selected_ids:
+            record['status'] = 'below_prescore' if record['prescore'] < config.min_prescore else 'not_shortlisted'
+            record.pop('_text', None)
+    return [candidates[index] for index in selected]
+
+
+def bounded_map(fn: Callable, items: Iterable, max_workers: int) -> Iterator[Any]:
+    """Map fn over items on a thread pool, yielding results as they finish"""
+    # Only a small window of items is held in memory at once, however large the input is
+    max_in_flight = max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        for item in items:
+            in_flight.add(executor.submit(fn, item))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def prepare_resumes(
+    files: Iterator[Tuple[str, bytes]],
+    job_description: str,
+    config: ScreeningConfig,
+    max_workers: int = 8
+) -> Iterator[Dict[str, Any]]:
+    """Extract and pre-score every resume without calling the LLM"""
+    return bounded_map(lambda item: prepare_resume(item[0], item[1], job_description, config), files, max_workers)
+
+
+def screen_resumes(
+    files: Iterator[Tuple[str, bytes]],
+    job_description: str,
+    config: ScreeningConfig,
+    max_workers: int = 8
+) -> Iterator[Dict[str, Any]]:
+    """Score resumes on a bounded worker pool, yielding each result as soon as it finishes"""
+    if config.top_k is None:
+        yield from bounded_map(
+            lambda item: screen_resume(item[0], item[1], job_description, config), files, max_workers
+        )
+        return
+
+    # Top-K selection needs every pre-score before any LLM call is made
+    records = list(prepare_resumes(files, job_description, config, max_workers))
+    selected = shortlist(records, job_description, config)
+    for record in records:
+        if not needs_comparison(record):
+            yield record
+    yield from bounded_map(lambda record: compare_record(record, job_description, config), selected, max_workers)
+
+
+async def compare_record_async(record: Dict[str, Any], job_description: str, config: ScreeningConfig) -> Dict[str, Any]:
+    """Run the LLM comparison for a prepared record through the rate-limited async client"""
+    from async_openai import request_job_comparison_async
+
+    if not needs_comparison(record):
+        record.pop('_text', None)
+        return record
+
+    try:
+        comparison = await request_job_comparison_async(
+            record['_text'],
+            job_description,
+            config.openai_endpoint,
+            config.openai_key,
+            config.openai_deployment,
+            use_cache=config.use_cache
+        )
+    except Exception as e:
+        return apply_comparison(record, None, f"{type(e).__name__}: {e}")
+    return apply_comparison(record, comparison)
+
+
+async def screen_resume_async(
+    name: str,
+    file_content: bytes,
+    job_description: str,
+    config: ScreeningConfig
+) -> Dict[str, Any]:
+    """Extract a resume on a worker thread and score it through the rate-limited async client"""
+    loop = asyncio.get_running_loop()
+    record = await loop.run_in_executor(None, prepare_resume, name, file_content, job_description, config)
+    return await compare_record_async(record, job_description, config)
+
+
+async def bounded_map_async(fn: Callable, items: Iterable, concurrency: int) -> AsyncIterator[Any]:
+    """Await fn over items with at most `concurrency` in flight, yielding results as they finish"""
+    in_flight = set()
+    for item in items:
+        in_flight.add(asyncio.ensure_future(fn(item)))
+        if len(in_flight) >= concurrency:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    while in_flight:
+        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+
+
+async def screen_resumes_async(
+    files: Iterator[Tuple[str, bytes]],
+    job_description: str,
+    config: ScreeningConfig,
+    concurrency: int = 64,
+    max_workers: int = 8
+) -> AsyncIterator[Dict[str, Any]]:
+    """Score resumes with many requests in flight, paced by the Azure OpenAI rate limiter"""
+    if config.top_k is None:
+        async for record in bounded_map_async(
+            lambda item: screen_resume_async(item[0], item[1], job_description, config), files, concurrency
+        ):
+            yield record
+        return
+
+    # Top-K selection needs every pre-score before any LLM call is made
+    loop = asyncio.get_running_loop()
+    records = await loop.run_in_executor(
+        None, lambda: list(prepare_resumes(files, job_description, config, max_workers))
+    )
+    selected = shortlist(records, job_description, config)
+    for record in records:
+        if not needs_comparison(record):
+            yield record
+    async for record in bounded_map_async(
+        lambda record: compare_record_async(record, job_description, config), selected, concurrency
+    ):
+        yield record
+
+
+class ResultWriter:
+    """Append screening results to a JSONL or CSV file, flushing after every row"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_csv = path.lower().endswith('.csv')
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def rank_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort results by score (failures last) and number them"""
+    ranked = sorted(results, key=lambda r: (
+        r.get('score') is None, -(r.get('score') or 0), -(r.get('prescore') or 0), r['file']
+    ))
+    for rank, record in enumerate(ranked, 1):
+        record['rank'] = rank
+    return ranked
+
+
+def ranked_store_records(store: ResultsStore) -> Iterator[Dict[str, Any]]:
+    """Read a results store back in ranking order, one row at a time"""
+    for rank, row in enumerate(store.ranked(), 1):
+        record = store.get(int(row))
+        del record['row']
+        record['rank'] = rank
+        yield record
+
+
+def ranked_output_path(output: str) -> str:
+    """Return the path for the final ranked file next to the streamed output"""
+    stem, ext = os.path.splitext(output)
+    return f"{stem}.ranked{ext}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rank resumes against a job description")
+    parser.add_argument("source", help="Directory or zip archive of PDF, DOCX and TXT resumes")
+    parser.add_argument("--job", required=True, help="Text file containing the job description")
+    parser.add_argument("--output", default="screening_results.jsonl", help="Results file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent resumes in progress")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache")
+    parser.add_argument("--async-mode", action="store_true",
+                        help="Use the async client, paced by AZURE_OPENAI_RPM and AZURE_OPENAI_TPM")
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight in async mode")
+    parser.add_argument("--min-prescore", type=float, default=0.0,
+                        help="Skip the LLM for resumes whose local pre-score (0-100) is below this")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Only send the K best pre-scored resumes to the LLM")
+    parser.add_argument("--index", action="store_true",
+                        help="Add every extracted resume to the candidate search index")
+    parser.add_argument("--store", default=None,
+                        help="Also write results to a new columnar results store in this directory, "
+                             "and rank from it instead of holding every result in memory")
+    parser.add_argument("--routing", choices=ROUTING_MODES, default=None,
+                        help="Override RESUMEAI_EXTRACTION_ROUTING: inspect each file (auto) or always use one extractor")
+    parser.add_argument("--openai-endpoint", default=os.environ.get("AZURE_OPENAI_ENDPOINT", ""))
+    parser.add_argument("--openai-key", default=os.environ.get("AZURE_OPENAI_API_KEY", ""))
+    parser.add_argument("--openai-deployment", default=os.environ.get("AZURE_OPENAI_DEPLOYMENT", ""))
+    parser.add_argument("--doc-endpoint", default=os.environ.get("AZURE_DOC_INTELLIGENCE_ENDPOINT", ""))
+    parser.add_argument("--doc-key", default=os.environ.get("AZURE_DOC_INTELLIGENCE_KEY", ""))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    if not (args.openai_endpoint and args.openai_key and args.openai_deployment):
+        parser.error("Azure OpenAI endpoint, key and deployment are required")
+
+    with open(args.job, encoding='utf-8') as f:
+        job_description = f.read()
+
+    config = ScreeningConfig(
+        openai_endpoint=args.openai_endpoint,
+        openai_key=args.openai_key,
+        openai_deployment=args.openai_deployment,
+        doc_endpoint=args.doc_endpoint,
+        doc_key=args.doc_key,
+        use_cache=not args.no_cache,
+        min_prescore=args.min_prescore,
+        top_k=args.top_k,
+        index_resumes=args.index
+    )
+
+    if args.store and os.path.exists(os.path.join(args.store, "meta.json")):
+        parser.error(f"{args.store} already holds a results store; choose a new directory for each run")
+
+    if args.routing:
+        set_routing_policy(replace(get_routing_policy(), mode=args.routing))
+
+    metrics_url = start_metrics_server()
+    if metrics_url:
+        print(f"Serving metrics at {metrics_url}", file=sys.stderr)
+
+    results = []
+    screened = 0
+    store = ResultsStore(args.store, writable=True) if args.store else None
+
+    def record_result(writer: ResultWriter, record: Dict[str, Any]):
+        nonlocal screened
+        screened += 1
+        # With a store, results live on disk and are ranked from its columns at the end
+        if store is not None:
+            store.append(record)
+        else:
+            results.append(record)
+        writer.write(record)
+        print(f"[{screened}] {record['file']}: {record['status']} {record.get('score', '')}", file=sys.stderr)
+
+    with ResultWriter(args.output) as writer:
+        files = iter_resume_files(args.source)
+        if args.async_mode:
+            async def run():
+                from async_openai import close_async_session
+
+                try:
+                    async for record in screen_resumes_async(
+                        files, job_description, config, args.concurrency, args.workers
+                    ):
+                        record_result(writer, record)
+                finally:
+                    await close_async_session()
+
+            asyncio.run(run())
+        else:
+            for record in screen_resumes(files, job_description, config, args.workers):
+                record_result(writer, record)
+
+    ranked_path = ranked_output_path(args.output)
+    with ResultWriter(ranked_path) as writer:
+        if store is not None:
+            store.close()
+            for record in ranked_store_records(store):
+                writer.write(record)
+        else:
+            for record in rank_results(results):
+                writer.write(record)
+
+    print(f"Screened {screened} resumes, ranked results written to {ranked_path}", file=sys.stderr)
+    if store is not None:
+        print(f"Results store written to {args.store}", file=sys.stderr)
+    parse_stats = get_parse_stats().stats()
+    if parse_stats["parsed"]:
+        print(
+            f"Structured replies: {parse_stats['parsed']} parsed, {parse_stats['failure_rate']:.1%} needed repair, "
+            f"{parse_stats['failures'] - parse_stats['repaired']} rejected",
+            file=sys.stderr
+        )
+    routing_stats = get_routing_stats().stats()
+    if routing_stats["local"] or routing_stats["document_intelligence"]:
+        print(
+            f"Extraction routing: {routing_stats['local']} local, {routing_stats['document_intelligence']} "
+            f"Document Intelligence, {routing_stats['misroutes']} misroutes, {routing_stats['avoidable']} avoidable",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
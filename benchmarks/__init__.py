@@ -0,0 +1,5 @@
+"""Benchmark harness for the extraction and analysis paths
+
+Usage:
+    python -m benchmarks.run --iterations 20 --baseline benchmarks/baseline.json
+"""
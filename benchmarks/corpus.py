@@ -0,0 +1,137 @@
+"""Deterministic synthetic resume corpus in PDF, DOCX and TXT formats"""
+import io
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+import docx
+
+# Pages per generated resume; "large" crosses the parallel PDF extraction threshold
+CORPUS_SIZES = {"small": 1, "medium": 4, "large": 24}
+LINES_PER_PAGE = 48
+PDF_FONT_SIZE = 9
+PDF_LINE_HEIGHT = 14
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Business Analyst"]
+EMPLOYERS = ["Contoso", "Fabrikam", "Northwind Traders", "Adventure Works", "Tailspin Toys", "Litware"]
+SKILLS = [
+    "Python", "SQL", "Azure", "AWS", "Docker", "Kubernetes", "React", "TypeScript", "Spark", "Airflow",
+    "machine learning", "data analysis", "project management", "stakeholder management", "Agile", "Scrum",
+]
+VERBS = ["Led", "Built", "Designed", "Migrated", "Automated", "Reduced", "Improved", "Launched", "Scaled"]
+OBJECTS = [
+    "the billing pipeline", "a customer analytics platform", "CI/CD for 40 services", "the data warehouse",
+    "an internal search service", "the onboarding flow", "reporting dashboards", "a recommendation engine",
+]
+JOB_DESCRIPTION = """Senior Software Engineer
+
+We are looking for an engineer with strong Python and SQL skills, experience running services on Azure
+with Docker and Kubernetes, and a track record of leading projects with stakeholders in an Agile team.
+Experience with machine learning or data analysis is a plus.
+"""
+
+
+@dataclass
+class Document:
+    """One generated resume in one file format"""
+    name: str
+    size: str
+    kind: str
+    content: bytes
+    text: str
+
+
+def generate_resume_text(pages: int, seed: int = 0) -> str:
+    """Generate plausible resume text of roughly the given number of pages"""
+    rng = random.Random(seed)
+    lines = [
+        f"Alex Candidate {seed}",
+        "alex.candidate@example.com | +1 555 0100 | Seattle, WA",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(3, 15)} years of experience in {', '.join(rng.sample(SKILLS, 4))}.",
+        "",
+        "EXPERIENCE",
+    ]
+    target = pages * LINES_PER_PAGE
+    year = 2024
+    while len(lines) < target - 8:
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(EMPLOYERS)} ({year - rng.randint(1, 3)} - {year})")
+        year -= rng.randint(1, 3)
+        for _ in range(rng.randint(3, 6)):
+            lines.append(
+                f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, "
+                f"cutting cost by {rng.randint(5, 60)}%"
+            )
+        lines.append("")
+    lines.extend([
+        "EDUCATION",
+        f"BSc Computer Science, University of Example ({year - 4} - {year})",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 8)),
+    ])
+    return "\n".join(lines)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(text: str) -> bytes:
+    """Write text into a minimal PDF with a real text layer, LINES_PER_PAGE lines per page"""
+    lines = text.splitlines()
+    pages = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    # Object 1 is the catalog, 2 the page tree, 3 the font; each page adds a page and a content object
+    objects: Dict[int, bytes] = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    for index, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        page_ids.append(page_id)
+        stream = f"BT /F1 {PDF_FONT_SIZE} Tf {PDF_LINE_HEIGHT} TL 50 800 Td\n"
+        stream += "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines) + "ET"
+        data = stream.encode("latin-1", errors="replace")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii")
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(page_ids)} >>"
+    ).encode("ascii")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = output.tell()
+        output.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for object_id in sorted(objects):
+        output.write(b"%010d 00000 n \n" % offsets[object_id])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return output.getvalue()
+
+
+def write_docx(text: str) -> bytes:
+    """Write text into a DOCX file, one paragraph per line"""
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def build_corpus(sizes: Dict[str, int] = CORPUS_SIZES) -> List[Document]:
+    """Generate every size of resume in every supported format"""
+    corpus = []
+    for seed, (size, pages) in enumerate(sizes.items()):
+        text = generate_resume_text(pages, seed)
+        corpus.append(Document(f"{size}.txt", size, "txt", text.encode("utf-8"), text))
+        corpus.append(Document(f"{size}.pdf", size, "pdf", write_pdf(text), text))
+        corpus.append(Document(f"{size}.docx", size, "docx", write_docx(text), text))
+    return corpus
@@ -0,0 +1,225 @@
+"""Local stand-ins for the Azure Document Intelligence and Azure OpenAI endpoints with configurable latency"""
+import base64
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any
+
+MOCK_API_KEY = "benchmark-key"
+STREAM_CHUNK_CHARS = 16
+
+FEEDBACK_REPLY = {
+    "suggestions": [
+        "Quantify the impact of each role with concrete metrics such as revenue, latency or cost savings.",
+        "Move the skills section above experience and group skills by category.",
+        "Trim older roles to one or two bullets so the most recent experience stands out.",
+    ]
+}
+COMPARISON_REPLY = {
+    "score": 74,
+    "explanation": "The resume covers most of the required stack and shows relevant leadership experience.",
+    "strengths": "Python, SQL and Azure experience; led cross-team projects.",
+    "improvements": "Add Kubernetes production experience and mention stakeholder management explicitly.",
+}
+
+
+def mock_reply(messages: list) -> str:
+    """Pick a schema-valid reply from the first user prompt, as the real deployment would answer it"""
+    prompt = next((message["content"] for message in messages if message["role"] == "user"), "")
+    if '"suggestions"' in prompt and '"score"' in prompt:
+        return json.dumps({**COMPARISON_REPLY, **FEEDBACK_REPLY})
+    if '"score"' in prompt:
+        return json.dumps(COMPARISON_REPLY)
+    if '"suggestions"' in prompt:
+        return json.dumps(FEEDBACK_REPLY)
+    return "\n".join(f"- {line[:120]}" for line in prompt.splitlines()[4:40] if line.strip())
+
+
+class MockServer:
+    """Threaded HTTP server running in the background"""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def mock(self) -> MockServer:
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self):
+        self.mock.count_request()
+        request = json.loads(self.read_body())
+        time.sleep(self.mock.latency_seconds)
+
+        content = mock_reply(request["messages"])
+        prompt_tokens = sum(len(message["content"]) for message in request["messages"]) // 4
+        completion_tokens = len(content) // 4
+        deployment = self.path.split("/deployments/")[-1].split("/")[0]
+
+        if request.get("stream"):
+            self.send_stream(deployment, content)
+            return
+        self.send_json(200, {
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def send_stream(self, deployment: str, content: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            chunk = {
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": deployment,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": None,
+                    "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]},
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class MockOpenAIServer(MockServer):
+    """Answers chat completions (streamed or not) with schema-valid replies after a fixed latency"""
+
+    handler_class = _OpenAIHandler
+
+
+class _DocumentIntelligenceHandler(_Handler):
+    def do_POST(self):
+        self.mock.count_request()
+        body = self.read_body()
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            body = base64.b64decode(json.loads(body).get("base64Source", ""))
+        time.sleep(self.mock.latency_seconds)
+
+        operation_id = self.mock.store_result(len(body))
+        model_path = self.path.split("?")[0].replace(":analyze", "")
+        self.send_response(202)
+        self.send_header("Operation-Location", f"{self.mock.url}{model_path}/analyzeResults/{operation_id}")
+        # A sub-second hint keeps the SDK poller from waiting its default one second between polls
+        self.send_header("retry-after-ms", "1")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.mock.count_request()
+        operation_id = self.path.split("?")[0].rsplit("/", 1)[-1]
+        content = self.mock.get_result(operation_id)
+        if content is None:
+            self.send_json(404, {"error": {"code": "NotFound", "message": "Unknown operation"}})
+            return
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.send_json(200, {
+            "status": "succeeded",
+            "createdDateTime": timestamp,
+            "lastUpdatedDateTime": timestamp,
+            "analyzeResult": {
+                "apiVersion": "2024-11-30",
+                "modelId": "prebuilt-read",
+                "stringIndexType": "textElements",
+                "content": content,
+                "pages": [],
+            },
+        })
+
+
+class MockDocumentIntelligenceServer(MockServer):
+    """Accepts analyze requests and returns text sized like the upload after a fixed latency"""
+
+    handler_class = _DocumentIntelligenceHandler
+
+    def __init__(self, latency_seconds: float = 0.0):
+        super().__init__(latency_seconds)
+        # Only the upload size is kept per operation, so long runs do not accumulate result text
+        self._upload_sizes: Dict[str, int] = {}
+        self._operation_ids = itertools.count(1)
+
+    def store_result(self, upload_bytes: int) -> str:
+        with self._lock:
+            operation_id = str(next(self._operation_ids))
+            self._upload_sizes[operation_id] = upload_bytes
+        return operation_id
+
+    def get_result(self, operation_id: str) -> Optional[str]:
+        with self._lock:
+            upload_bytes = self._upload_sizes.get(operation_id)
+        if upload_bytes is None:
+            return None
+        # Roughly one character of text per 4 bytes of document, like a text-heavy PDF
+        line = "Extracted resume line with experience, skills and education details.\n"
+        return line * max(1, upload_bytes // 4 // len(line))
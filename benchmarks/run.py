@@ -0,0 +1,279 @@
+"""Benchmark the extraction and analysis paths against local mock Azure endpoints
+
+Each stage runs in a fresh process so its peak RSS is measured on its own. Every document is
+run once untimed first, so imports, client creation and connection pools are not in the numbers.
+
+Usage:
+    python -m benchmarks.run --iterations 20 --openai-latency-ms 300 --di-latency-ms 800
+    python -m benchmarks.run --baseline benchmarks/baseline.json --update-baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+from benchmarks.corpus import CORPUS_SIZES, JOB_DESCRIPTION, Document, build_corpus
+from benchmarks.mock_servers import MOCK_API_KEY, MockDocumentIntelligenceServer, MockOpenAIServer
+from metrics import percentile
+from resume_parser import parse_resume
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MOCK_DEPLOYMENT = "benchmark-deployment"
+STAGES = (
+    "parse_resume",
+    "extract_txt",
+    "extract_pdf",
+    "extract_docx",
+    "extract_document_intelligence",
+    "feedback",
+    "feedback_stream",
+    "comparison",
+    "combined",
+)
+# +1: a higher value is worse, -1: a lower value is worse
+REGRESSION_METRICS = {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "throughput_per_s": -1}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished children"""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def build_calls(app, stage: str, documents: List[Document], endpoints: Dict[str, str]) -> List[Tuple[Document, Callable]]:
+    """Bind each document to the app function a stage measures"""
+    openai_url, di_url = endpoints["openai"], endpoints["document_intelligence"]
+    llm_args = (openai_url, MOCK_API_KEY, MOCK_DEPLOYMENT)
+
+    def by_kind(kind: str) -> List[Document]:
+        return [document for document in documents if document.kind == kind]
+
+    if stage == "parse_resume":
+        # Local only; the parser is expected to sustain over 1000 resumes per second on one core
+        return [(d, lambda d=d: parse_resume(d.text)) for d in by_kind("txt")]
+    if stage == "extract_txt":
+        return [(d, lambda d=d: app.extract_resume_text(d.content, d.name)) for d in by_kind("txt")]
+    if stage == "extract_pdf":
+        return [(d, lambda d=d: app.extract_text_from_pdf(d.content)) for d in by_kind("pdf")]
+    if stage == "extract_docx":
+        return [(d, lambda d=d: app.extract_text_from_docx(d.content)) for d in by_kind("docx")]
+    if stage == "extract_document_intelligence":
+        return [
+            (d, lambda d=d: app.extract_text_with_document_intelligence(d.content, d.name, di_url, MOCK_API_KEY))
+            for d in by_kind("pdf")
+        ]
+    if stage == "feedback":
+        return [(d, lambda d=d: app.get_resume_feedback(d.text, *llm_args, use_cache=False)) for d in by_kind("txt")]
+    if stage == "feedback_stream":
+        return [
+            (d, lambda d=d: list(app.stream_resume_feedback(d.text, *llm_args, use_cache=False))[-1])
+            for d in by_kind("txt")
+        ]
+    if stage == "comparison":
+        return [
+            (d, lambda d=d: app.compare_resume_with_job(d.text, JOB_DESCRIPTION, *llm_args, use_cache=False))
+            for d in by_kind("txt")
+        ]
+    if stage == "combined":
+        return [
+            (d, lambda d=d: app.analyze_resume_and_job(d.text, JOB_DESCRIPTION, *llm_args, use_cache=False))
+            for d in by_kind("txt")
+        ]
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def summarize(latencies: List[float], processed_bytes: int, errors: int) -> Dict[str, Any]:
+    """Latency percentiles and throughput over the successful calls of one stage and document size
+
+    Failed calls are only counted: a fast error would otherwise pull the percentiles down.
+    """
+    busy = sum(latencies)
+    return {
+        "calls": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput_per_s": round(len(latencies) / busy, 3) if busy else 0.0,
+        "mb_per_s": round(processed_bytes / busy / 1e6, 3) if busy else 0.0,
+    }
+
+
+def run_stage(connection, stage: str, documents: List[Document], iterations: int, endpoints: Dict[str, str]):
+    """Process entry point: time one stage and send its summary back over the pipe"""
+    import app
+
+    calls = build_calls(app, stage, documents, endpoints)
+    for _, call in calls:
+        call()
+    startup_rss = peak_rss_mb()
+
+    samples: Dict[str, List[float]] = {}
+    sizes: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    for _ in range(iterations):
+        for document, call in calls:
+            started = time.perf_counter()
+            try:
+                result = call()
+            except Exception:
+                result = None
+            elapsed = time.perf_counter() - started
+            latencies = samples.setdefault(document.size, [])
+            errors.setdefault(document.size, 0)
+            if result:
+                latencies.append(elapsed)
+                sizes[document.size] = sizes.get(document.size, 0) + len(document.content)
+            else:
+                errors[document.size] += 1
+
+    peak = peak_rss_mb()
+    connection.send({
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        "rss_growth_mb": round(peak - startup_rss, 1) if peak is not None else None,
+        "sizes": {size: summarize(samples[size], sizes.get(size, 0), errors[size]) for size in samples},
+    })
+    connection.close()
+
+
+def run_stage_in_process(stage: str, documents: List[Document], iterations: int, endpoints: Dict[str, str]) -> Dict[str, Any]:
+    """Run a stage in a fresh spawned process so peak RSS is not shared with other stages"""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_stage, args=(sender, stage, documents, iterations, endpoints))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Stage {stage} exited with code {process.exitcode} before reporting")
+    finally:
+        process.join()
+    return result
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe every metric that moved in the wrong direction by more than the tolerance"""
+    regressions = []
+    for stage, stage_result in results["stages"].items():
+        baseline_stage = baseline.get("stages", {}).get(stage)
+        if baseline_stage is None:
+            continue
+        checks = [(stage, "peak_rss_mb", stage_result["peak_rss_mb"], baseline_stage.get("peak_rss_mb"), 1)]
+        for size, metrics in stage_result["sizes"].items():
+            baseline_metrics = baseline_stage.get("sizes", {}).get(size, {})
+            for metric, direction in REGRESSION_METRICS.items():
+                checks.append((f"{stage}[{size}]", metric, metrics[metric], baseline_metrics.get(metric), direction))
+            # Errors are compared as counts, since a clean baseline has no ratio to move against
+            if metrics["errors"] > baseline_metrics.get("errors", 0):
+                regressions.append(
+                    f"{stage}[{size}] errors: {baseline_metrics.get('errors', 0)} -> {metrics['errors']}"
+                )
+
+        for label, metric, current, previous, direction in checks:
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if change * direction > tolerance:
+                regressions.append(f"{label} {metric}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]):
+    header = f"{'stage':<32}{'calls':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>9}{'MB/s':>8}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for stage, stage_result in results["stages"].items():
+        for size, m in stage_result["sizes"].items():
+            print(
+                f"{f'{stage}[{size}]':<32}{m['calls']:>7}{m['errors']:>5}{m['p50_ms']:>10.1f}{m['p95_ms']:>10.1f}"
+                f"{m['p99_ms']:>10.1f}{m['throughput_per_s']:>9.1f}{m['mb_per_s']:>8.2f}"
+                f"{stage_result['peak_rss_mb'] or 0:>9.0f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Stages to run")
+    parser.add_argument("--sizes", nargs="+", choices=list(CORPUS_SIZES), default=list(CORPUS_SIZES),
+                        help="Synthetic resume sizes to include")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed runs per document")
+    parser.add_argument("--openai-latency-ms", type=float, default=200, help="Mock Azure OpenAI response latency")
+    parser.add_argument("--di-latency-ms", type=float, default=500, help="Mock Document Intelligence analyze latency")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # Benchmarks must not read from or write to the real caches
+    os.environ["RESUMEAI_CACHE_DIR"] = tempfile.mkdtemp(prefix="resumeai-bench-")
+    os.environ["RESUMEAI_INDEX_DIR"] = os.path.join(os.environ["RESUMEAI_CACHE_DIR"], "resume_index")
+
+    documents = build_corpus({size: CORPUS_SIZES[size] for size in args.sizes})
+    results: Dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "iterations": args.iterations,
+            "sizes": {size: CORPUS_SIZES[size] for size in args.sizes},
+            "openai_latency_ms": args.openai_latency_ms,
+            "di_latency_ms": args.di_latency_ms,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": {},
+    }
+
+    with MockOpenAIServer(args.openai_latency_ms / 1000) as openai_server, \
+            MockDocumentIntelligenceServer(args.di_latency_ms / 1000) as di_server:
+        endpoints = {"openai": openai_server.url, "document_intelligence": di_server.url}
+        for stage in args.stages:
+            print(f"Running {stage}...", file=sys.stderr)
+            results["stages"][stage] = run_stage_in_process(stage, documents, args.iterations, endpoints)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    exit_code = 0
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {args.tolerance:.0%} of {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            exit_code = 1
+        else:
+            print(f"\nNo regressions beyond {args.tolerance:.0%} of {args.baseline}")
+    elif args.baseline:
+        print(f"Baseline {args.baseline} not found; run with --update-baseline to create it", file=sys.stderr)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Measure Streamlit cold start and rerun time for app.py
+
+Cold start is timed in fresh interpreters: the import of app on its own, then the first full script
+run under Streamlit's AppTest harness. Reruns reuse one AppTest session, as a widget interaction would.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --reruns 20
+    python -m benchmarks.startup --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Optional, Dict, Any, List
+
+from metrics import percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Runs in a fresh interpreter and prints one JSON line of timings
+COLD_START_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, os.path.dirname({app_path!r}))
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+test = AppTest.from_file({app_path!r}, default_timeout=60)
+harness = time.perf_counter()
+test.run()
+finished = time.perf_counter()
+print(json.dumps({{"import_s": imported - started, "first_run_s": finished - harness, "modules": len(sys.modules)}}))
+"""
+
+
+def measure_cold_start() -> Dict[str, float]:
+    """Time importing app and its first script run in a new process"""
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT.format(app_path=APP_PATH)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_reruns(reruns: int) -> List[float]:
+    """Time repeated script runs in one session, after the first run has warmed it"""
+    from streamlit.testing.v1 import AppTest
+
+    test = AppTest.from_file(APP_PATH, default_timeout=60)
+    test.run()
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        test.run()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize_ms(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1) if samples else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the cold start in")
+    parser.add_argument("--reruns", type=int, default=20, help="Script reruns to time in one session")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    cold_starts = [measure_cold_start() for _ in range(args.runs)]
+    results: Dict[str, Any] = {
+        "import": summarize_ms([run["import_s"] for run in cold_starts]),
+        "first_run": summarize_ms([run["first_run_s"] for run in cold_starts]),
+        "rerun": summarize_ms(measure_reruns(args.reruns)),
+        "modules_loaded": cold_starts[-1]["modules"],
+    }
+
+    for name in ("import", "first_run", "rerun"):
+        m = results[name]
+        print(f"{name:<12}{m['p50_ms']:>10.1f} ms p50{m['p95_ms']:>10.1f} ms p95{m['max_ms']:>10.1f} ms max")
+    print(f"{'modules':<12}{results['modules_loaded']:>10}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+"""Content-addressed caches used by ResumeAI"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple
+
+DEFAULT_CACHE_DIR = os.environ.get("RESUMEAI_CACHE_DIR", ".resumeai_cache")
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("RESUMEAI_SQLITE_BUSY_TIMEOUT", "30"))
+
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def extraction_cache_key(extractor_name: str, extractor_version: str, file_content: bytes) -> str:
+    """Build the cache key for an extractor run over a file"""
+    return f"{extractor_name}:{extractor_version}:{content_hash(file_content)}"
+
+
+def response_cache_key(
+    deployment_name: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Build the cache key for a chat completion request"""
+    # Whitespace is collapsed so indentation changes in prompt templates don't miss the cache
+    normalized = {
+        "deployment": deployment_name.strip(),
+        "messages": [
+            {"role": message["role"], "content": " ".join(message["content"].split())}
+            for message in messages
+        ],
+        "temperature": round(float(temperature), 4),
+        "max_tokens": int(max_tokens),
+    }
+    if response_format is not None:
+        normalized["response_format"] = response_format
+    payload = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return "chat:" + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU cache bounded by the total size of its values"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                self._entries.pop(key)
+                self._size -= entry[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        size = len(value.encode('utf-8'))
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            # An oversized value is not stored, but the old value for the key must not outlive it
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class DiskCache:
+    """SQLite-backed cache evicting least recently accessed entries by size"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Access times from reads, written with the next set so reads never take SQLite's write lock
+        self._accessed: Dict[str, float] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # WAL lets the UI and worker processes read while another writes; writers wait up to
+        # SQLITE_BUSY_TIMEOUT seconds for the lock instead of failing
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL,
+                expires REAL
+            )
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "expires" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN expires REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.commit()
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Return a live entry's value and expiry time; expired rows are left for the next write to remove"""
+        with self._lock:
+            now = time.time()
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            self.hits += 1
+            return row[0].decode('utf-8'), row[1]
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def _write_accessed(self):
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        data = value.encode('utf-8')
+        now = time.time()
+        with self._lock:
+            if len(data) > self.max_bytes:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return
+            self._write_accessed()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, accessed, expires) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now + ttl if ttl else None)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            return {
+                "entries": entries,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class TieredCache:
+    """Two-tier cache: an in-process LRU in front of a SQLite store"""
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is None:
+            return None
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is None:
+            self.memory.set(key, value)
+        else:
+            # The promoted copy expires with the disk entry, not later
+            remaining = expires - time.time()
+            if remaining <= 0:
+                return None
+            self.memory.set(key, value, remaining)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        disk = self.disk.stats() if self.disk is not None else None
+        hits = memory["hits"] + (disk["hits"] if disk else 0)
+        return {
+            "hits": hits,
+            "misses": disk["misses"] if disk else memory["misses"],
+            "memory": memory,
+            "disk": disk,
+        }
+
+
+_extraction_cache: Optional[TieredCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> TieredCache:
+    """Return the process-wide cache for extracted resume text"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            memory_mb = int(os.environ.get("RESUMEAI_EXTRACTION_CACHE_MEMORY_MB", "64"))
+            disk_mb = int(os.environ.get("RESUMEAI_EXTRACTION_CACHE_DISK_MB", "512"))
+            disk = None
+            if disk_mb > 0:
+                disk = DiskCache(os.path.join(DEFAULT_CACHE_DIR, "extraction.sqlite3"), disk_mb * 1024 * 1024)
+            _extraction_cache = TieredCache(LRUCache(memory_mb * 1024 * 1024), disk)
+        return _extraction_cache
+
+
+class ResponseCache:
+    """Chat completion cache that tracks the tokens and latency it saves"""
+
+    def __init__(self, store: TieredCache, ttl_seconds: float):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.saved_latency = 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            entry = json.loads(value)
+            self.hits += 1
+            self.saved_tokens += entry.get("total_tokens", 0)
+            self.saved_latency += entry.get("latency", 0.0)
+            return entry
+
+    def set(self, key: str, content: str, total_tokens: int, latency: float):
+        entry = {"content": content, "total_tokens": total_tokens, "latency": latency}
+        self.store.set(key, json.dumps(entry), self.ttl_seconds)
+
+    def delete(self, key: str):
+        self.store.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "saved_tokens": self.saved_tokens,
+                "saved_latency": self.saved_latency,
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide cache for Azure OpenAI responses"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            memory_mb = int(os.environ.get("RESUMEAI_RESPONSE_CACHE_MEMORY_MB", "16"))
+            disk_mb = int(os.environ.get("RESUMEAI_RESPONSE_CACHE_DISK_MB", "128"))
+            ttl_hours = float(os.environ.get("RESUMEAI_RESPONSE_CACHE_TTL_HOURS", "24"))
+            disk = None
+            if disk_mb > 0:
+                disk = DiskCache(os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite3"), disk_mb * 1024 * 1024)
+            store = TieredCache(LRUCache(memory_mb * 1024 * 1024), disk)
+            _response_cache = ResponseCache(store, ttl_hours * 3600)
+        return _response_cache
+
+
+class WaitTimeout(Exception):
+    """An in-flight call did not finish within the time a waiter was willing to give it"""
+
+
+class _Call:
+    """One in-flight call whose result is shared with every caller that joined it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Return the leader's result or raise its error; raises WaitTimeout if it takes longer than timeout"""
+        if not self.done.wait(timeout):
+            raise WaitTimeout(f"The shared call did not finish within {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one, so identical paid requests run once"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.shared = 0
+        self.expired = 0
+
+    def join(self, key: str) -> Tuple[_Call, bool]:
+        """Return the in-flight call for a key and whether this caller leads it and must complete it"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.leaders += 1
+            return call, True
+
+    def complete(self, key: str, call: _Call, result: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's result or error to its waiters; later callers start a new call"""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def wait(self, call: _Call, timeout: Optional[float] = None) -> Any:
+        """Wait as a follower of call; on WaitTimeout the caller should make its own request"""
+        try:
+            return call.wait(timeout)
+        except WaitTimeout:
+            with self._lock:
+                call.waiters -= 1
+                self.expired += 1
+            raise
+
+    def do(self, key: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Tuple[Any, bool]:
+        """Run fn once for all concurrent callers with this key; returns (result, shared)
+
+        Followers wait at most timeout seconds for the leader, then run fn themselves.
+        """
+        call, leader = self.join(key)
+        if not leader:
+            try:
+                return self.wait(call, timeout), True
+            except WaitTimeout:
+                # A stuck leader must not hold its followers longer than their own request would take
+                return fn(*args, **kwargs), False
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            # Waiters see the same failure rather than each retrying into a rate limit
+            self.complete(key, call, error=e)
+            raise
+        self.complete(key, call, result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "expired": self.expired,
+            }
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide registry of in-flight extractions and completions"""
+    return _single_flight
@@ -0,0 +1,188 @@
+"""Registry of Azure clients shared across Streamlit reruns and sessions"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Any, Callable, Iterator, List
+
+from metrics import percentile
+
+# The SDKs are imported by the factories on first use, so importing this module stays cheap
+if TYPE_CHECKING:
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+    from openai import AzureOpenAI
+
+HTTP_POOL_SIZE = int(os.environ.get("RESUMEAI_HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("RESUMEAI_HTTP_KEEPALIVE_SECONDS", "60"))
+CLIENT_IDLE_SECONDS = float(os.environ.get("RESUMEAI_CLIENT_IDLE_SECONDS", "900"))
+# Per-request timeout of the Azure OpenAI client, also the longest a coalesced caller waits for a shared
+# reply or extraction
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("RESUMEAI_REQUEST_TIMEOUT_SECONDS", "120"))
+LATENCY_SAMPLES = 1000
+
+
+class _ClientEntry:
+    def __init__(self, kind: str, client: Any, close: Callable[[], None]):
+        self.kind = kind
+        self.client = client
+        self.close = close
+        self.last_used = time.monotonic()
+        self.requests = 0
+        self.active = 0
+
+
+class ClientRegistry:
+    """Caches clients by configuration and evicts the ones left idle"""
+
+    def __init__(self, idle_seconds: float = CLIENT_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[tuple, _ClientEntry] = {}
+        self._by_client: Dict[int, _ClientEntry] = {}
+        self._lock = threading.Lock()
+        # First requests on a client pay for the connection and TLS handshake; later ones reuse it.
+        # Samples are kept per client kind, since a document upload and a chat completion aren't comparable
+        self._latencies: Dict[str, Dict[str, List[float]]] = {}
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def get(self, key: tuple, factory: Callable[[], tuple]) -> Any:
+        """Return the client for a (kind, ...) key, building it with factory() -> (client, close) if needed"""
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is None:
+                client, close = factory()
+                entry = _ClientEntry(key[0], client, close)
+                self._entries[key] = entry
+                self._by_client[id(client)] = entry
+                self.created += 1
+            else:
+                self.reused += 1
+            entry.last_used = time.monotonic()
+            return entry.client
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            # A client in the middle of a request is never closed, however long the request takes
+            if not entry.active and now - entry.last_used > self.idle_seconds:
+                del self._entries[key]
+                self._by_client.pop(id(entry.client), None)
+                entry.close()
+                self.evicted += 1
+
+    @contextmanager
+    def in_use(self, client: Any) -> Iterator[None]:
+        """Mark a client busy for the length of a request so idle eviction cannot close it mid-call"""
+        with self._lock:
+            entry = self._by_client.get(id(client))
+            if entry is not None:
+                entry.active += 1
+        try:
+            yield
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry.active -= 1
+                    entry.last_used = time.monotonic()
+
+    def record_latency(self, client: Any, seconds: float):
+        """Record a request latency against the client that served it"""
+        with self._lock:
+            entry = self._by_client.get(id(client))
+            if entry is None:
+                return
+            latencies = self._latencies.setdefault(entry.kind, {"cold": [], "warm": []})
+            samples = latencies["cold"] if entry.requests == 0 else latencies["warm"]
+            samples.append(seconds)
+            del samples[:-LATENCY_SAMPLES]
+            entry.requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {}
+            for kind, latencies in self._latencies.items():
+                cold, warm = latencies["cold"], latencies["warm"]
+                cold_p50, cold_p99 = percentile(cold, 50), percentile(cold, 99)
+                warm_p50, warm_p99 = percentile(warm, 50), percentile(warm, 99)
+                kinds[kind] = {
+                    "cold_p50": cold_p50,
+                    "cold_p99": cold_p99,
+                    "warm_p50": warm_p50,
+                    "warm_p99": warm_p99,
+                    "saved_p50": max(0.0, cold_p50 - warm_p50) if cold and warm else 0.0,
+                    "saved_p99": max(0.0, cold_p99 - warm_p99) if cold and warm else 0.0,
+                }
+            return {
+                "clients": len(self._entries),
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "kinds": kinds,
+            }
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Return the process-wide client registry"""
+    return _registry
+
+
+def _key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+def get_openai_client(endpoint: str, api_key: str, api_version: str) -> "AzureOpenAI":
+    """Return a shared Azure OpenAI client backed by a pooled keep-alive HTTP transport"""
+    def factory():
+        import httpx
+        from openai import AzureOpenAI
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS
+            )
+        )
+        client = AzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            http_client=http_client,
+            timeout=REQUEST_TIMEOUT_SECONDS
+        )
+        return client, http_client.close
+
+    return _registry.get(("openai", endpoint, _key_fingerprint(api_key), api_version), factory)
+
+
+def get_document_intelligence_client(endpoint: str, api_key: str) -> "DocumentIntelligenceClient":
+    """Return a shared Document Intelligence client backed by a pooled requests session"""
+    def factory():
+        import requests
+        from azure.ai.documentintelligence import DocumentIntelligenceClient
+        from azure.core.credentials import AzureKeyCredential
+        from azure.core.pipeline.transport import RequestsTransport
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        client = DocumentIntelligenceClient(
+            endpoint=endpoint,
+            credential=AzureKeyCredential(api_key),
+            transport=RequestsTransport(session=session, session_owner=False)
+        )
+
+        def close():
+            client.close()
+            session.close()
+
+        return client, close
+
+    return _registry.get(("document_intelligence", endpoint, _key_fingerprint(api_key)), factory)
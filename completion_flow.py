@@ -0,0 +1,165 @@
+"""Condense, parse and repair steps shared by the threaded app path and the async batch path
+
+Each flow is a generator that yields the chat completion requests it needs and receives their replies,
+so the same steps run on chat_completion in app.py and on chat_completion_async in async_openai.py.
+A yielded list is a batch of independent requests that the driver may run concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Generator, List, Union
+
+from cache import get_response_cache, response_cache_key
+from metrics import record_event, trace_stage, traced
+from prompting import RESUME_TOKEN_BUDGET, chunk_text, clean_extracted_text, count_tokens
+from resume_parser import relevant_text
+from schemas import ParseError, get_parse_stats, repair_messages
+
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+CONDENSE_MAX_TOKENS = 600
+CONDENSE_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class CompletionRequest:
+    """One chat completion a flow needs answered"""
+    messages: list
+    max_tokens: int
+    temperature: float
+    use_cache: bool = True
+    response_format: Optional[Dict[str, Any]] = None
+
+
+Flow = Generator[Union[CompletionRequest, List[CompletionRequest]], Union[str, List[str]], Any]
+
+
+@traced("prompt.condense")
+def build_condense_messages(resume_chunk: str) -> list:
+    """Build the chat messages condensing one chunk of an over-long resume (the map step)"""
+    prompt = f"""
+    Condense the following part of a resume. Keep every job title, employer, date, degree, skill,
+    certification and measurable achievement. Drop filler and repetition. Use short bullet points.
+
+    Resume part:
+    {resume_chunk}
+    """
+    return [
+        {"role": "system", "content": "You are a precise assistant that condenses resumes without losing facts."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def condense_flow(resume_text: str, use_cache: bool = True) -> Flow:
+    """Clean the resume and, when it is over the token budget, condense its chunks in one batch"""
+    cleaned_text = clean_extracted_text(resume_text)
+    if count_tokens(cleaned_text) <= RESUME_TOKEN_BUDGET:
+        return cleaned_text
+
+    # Dropping references and interests locally may be enough to avoid the condense requests
+    cleaned_text = relevant_text(cleaned_text)
+    if count_tokens(cleaned_text) <= RESUME_TOKEN_BUDGET:
+        return cleaned_text
+
+    with trace_stage("condense"):
+        summaries = yield [
+            CompletionRequest(build_condense_messages(chunk), CONDENSE_MAX_TOKENS, 0.0, use_cache)
+            for chunk in chunk_text(cleaned_text)
+        ]
+    return "\n\n".join(summaries)
+
+
+def parse_reply_flow(
+    deployment_name: str,
+    messages: list,
+    reply: str,
+    parse_fn: Callable,
+    schema_hint: str,
+    max_tokens: int,
+    temperature: float
+) -> Flow:
+    """Validate a JSON reply, asking the model once to repair it when it does not match the schema"""
+    parse_stats = get_parse_stats()
+    try:
+        with trace_stage("parse"):
+            result = parse_fn(reply)
+    except ParseError as e:
+        error = e
+    else:
+        parse_stats.record(failed_first=False, repaired=False)
+        return result
+
+    record_event("repair", "parse")
+    # Never serve the rejected reply from the cache again
+    get_response_cache().delete(
+        response_cache_key(deployment_name, messages, temperature, max_tokens, JSON_RESPONSE_FORMAT)
+    )
+    repaired_reply = yield CompletionRequest(
+        repair_messages(messages, reply, error, schema_hint),
+        max_tokens,
+        temperature,
+        use_cache=False,
+        response_format=JSON_RESPONSE_FORMAT
+    )
+    try:
+        with trace_stage("parse"):
+            result = parse_fn(repaired_reply)
+    except ParseError:
+        parse_stats.record(failed_first=True, repaired=False)
+        raise
+    parse_stats.record(failed_first=True, repaired=True)
+    return result
+
+
+def structured_flow(
+    deployment_name: str,
+    messages: list,
+    parse_fn: Callable,
+    schema_hint: str,
+    max_tokens: int,
+    temperature: float,
+    use_cache: bool = True
+) -> Flow:
+    """Run a JSON-mode chat completion and return the validated, typed result"""
+    reply = yield CompletionRequest(messages, max_tokens, temperature, use_cache, JSON_RESPONSE_FORMAT)
+    return (yield from parse_reply_flow(
+        deployment_name, messages, reply, parse_fn, schema_hint, max_tokens, temperature
+    ))
+
+
+def run_flow(flow: Flow, complete: Callable[[CompletionRequest], str], max_workers: int = CONDENSE_WORKERS) -> Any:
+    """Drive a flow with a blocking completion function; batched requests run on a thread pool"""
+    resume, value = flow.send, None
+    while True:
+        try:
+            request = resume(value)
+        except StopIteration as stop:
+            return stop.value
+        # Failures are raised inside the flow, so its trace stages record them before they propagate
+        try:
+            if isinstance(request, list):
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    value = list(executor.map(complete, request))
+            else:
+                value = complete(request)
+            resume = flow.send
+        except Exception as e:
+            resume, value = flow.throw, e
+
+
+async def run_flow_async(flow: Flow, complete: Callable) -> Any:
+    """Drive a flow with a coroutine completion function; batched requests are gathered concurrently"""
+    import asyncio
+
+    resume, value = flow.send, None
+    while True:
+        try:
+            request = resume(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            if isinstance(request, list):
+                value = list(await asyncio.gather(*[complete(item) for item in request]))
+            else:
+                value = await complete(request)
+            resume = flow.send
+        except Exception as e:
+            resume, value = flow.throw, e
@@ -0,0 +1,254 @@
+"""Background job queue so long-running extraction never blocks a Streamlit script thread"""
+import base64
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List
+
+JOB_RETENTION_SECONDS = 3600
+WORKER_MODES = ("threads", "processes")
+WORKER_REQUEST_TIMEOUT = float(os.environ.get("RESUMEAI_WORKER_TIMEOUT", "30"))
+
+_current_job = threading.local()
+
+
+class Job:
+    """State of a submitted job, polled by the UI between reruns"""
+
+    def __init__(self, job_id: str, description: str):
+        self.id = job_id
+        self.description = description
+        self.status = "queued"
+        self.progress = "Waiting for a free worker"
+        self.result: Any = None
+        self._partial_chunks: List[str] = []
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def partial_text(self) -> str:
+        """Text streamed by the job so far"""
+        return "\n".join(self._partial_chunks)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe state for the worker service's job endpoint"""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "progress": self.progress,
+            "result": encode_value(self.result),
+            "partial_text": self.partial_text(),
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["id"], data["description"])
+        job.status = data["status"]
+        job.progress = data["progress"]
+        job.result = decode_value(data.get("result"))
+        job._partial_chunks = [data["partial_text"]] if data.get("partial_text") else []
+        job.error = data.get("error")
+        job.submitted = data.get("submitted", job.submitted)
+        job.started = data.get("started")
+        job.finished = data.get("finished")
+        return job
+
+
+def encode_value(value: Any) -> Any:
+    """Make job arguments and results JSON-safe; bytes travel as base64"""
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    return value
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"__bytes__"}:
+            return base64.b64decode(value["__bytes__"])
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+def report_progress(message: str):
+    """Update the progress message of the job running on this thread, if any"""
+    job = getattr(_current_job, "job", None)
+    if job is not None:
+        job.progress = message
+
+
+def report_partial_text(chunk: str):
+    """Publish a chunk of output from the job running on this thread, if any"""
+    job = getattr(_current_job, "job", None)
+    if job is not None:
+        job._partial_chunks.append(chunk)
+
+
+class JobQueue:
+    """Fixed-size worker pool shared by every session in the process"""
+
+    def __init__(self, max_workers: int, mode: str = "threads"):
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Worker mode must be one of {', '.join(WORKER_MODES)}, got {mode!r}")
+        self.max_workers = max_workers
+        self.mode = mode
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resumeai-job")
+        # In process mode each job thread hands its call to a process, so CPU-bound parsing is not
+        # serialised by the GIL; progress and partial text are then only reported at the end
+        self._processes = None
+        if mode == "processes":
+            self._processes = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, description: str, fn: Callable, *args, **kwargs) -> str:
+        """Queue fn(*args, **kwargs) and return the id used to poll it"""
+        job = Job(uuid.uuid4().hex, description)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict):
+        job.status = "running"
+        job.progress = "Started"
+        job.started = time.time()
+        _current_job.job = job
+        try:
+            if self._processes is not None:
+                job.progress = "Running in a worker process"
+                job.result = self._processes.submit(fn, *args, **kwargs).result()
+            else:
+                job.result = fn(*args, **kwargs)
+            job._partial_chunks = []
+            job.progress = "Finished"
+            # finished is set before status, so a job that reads as done always has a finish time
+            job.finished = time.time()
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.progress = "Failed"
+            job.finished = time.time()
+            job.status = "failed"
+        finally:
+            _current_job.job = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished is not None and job.finished < cutoff:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+        }
+
+
+class RemoteJobQueue:
+    """JobQueue stand-in that submits registered tasks to a worker service over HTTP"""
+
+    def __init__(self, url: str, token: str = "", timeout: float = WORKER_REQUEST_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.mode = "remote"
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # urllib pulls in http.client and email, so it is only imported once a worker URL is in use
+        import urllib.request
+
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(f"{self.url}{path}", data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def submit(self, description: str, fn: Callable, *args, **kwargs) -> str:
+        """Queue a task on the worker by function name; the worker only runs tasks it has registered"""
+        response = self._request("POST", "/jobs", {
+            "task": fn.__name__,
+            "description": description,
+            "args": encode_value(list(args)),
+            "kwargs": encode_value(kwargs),
+        })
+        return response["id"]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        import urllib.error
+
+        try:
+            return Job.from_dict(self._request("GET", f"/jobs/{job_id}"))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            error = f"Worker returned HTTP {e.code}"
+        except (urllib.error.URLError, OSError) as e:
+            error = f"Worker unreachable: {e}"
+        # Surface an unreachable worker as a failed job rather than an exception in the UI
+        job = Job(job_id, "")
+        job.status, job.progress, job.error, job.finished = "failed", "Failed", error, time.time()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            return {"mode": self.mode, **self._request("GET", "/stats")}
+        except OSError:
+            return {"mode": self.mode, "workers": 0, "queued": 0, "running": 0}
+
+
+_extraction_queue = None
+_extraction_queue_lock = threading.Lock()
+
+
+def get_extraction_queue():
+    """Return the process-wide queue that caps concurrent extraction jobs
+
+    RESUMEAI_WORKER_URL sends jobs to a worker service (see worker.py); otherwise jobs run here on
+    RESUMEAI_EXTRACTION_WORKERS threads, or processes when RESUMEAI_WORKER_MODE is "processes".
+    """
+    global _extraction_queue
+    with _extraction_queue_lock:
+        if _extraction_queue is None:
+            worker_url = os.environ.get("RESUMEAI_WORKER_URL")
+            if worker_url:
+                _extraction_queue = RemoteJobQueue(worker_url, os.environ.get("RESUMEAI_WORKER_TOKEN", ""))
+            else:
+                _extraction_queue = JobQueue(
+                    int(os.environ.get("RESUMEAI_EXTRACTION_WORKERS", "4")),
+                    os.environ.get("RESUMEAI_WORKER_MODE", "threads")
+                )
+        return _extraction_queue
@@ -0,0 +1,211 @@
+"""Per-stage timings and counters, exported in the Prometheus text format and as optional OpenTelemetry spans"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional, Dict, Any, Deque, Iterator, List, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+    _tracer = otel_trace.get_tracer("resumeai")
+except ImportError:
+    _tracer = None
+
+STAGE_SAMPLES = int(os.environ.get("RESUMEAI_METRICS_SAMPLES", "1000"))
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+COUNTED_ATTRIBUTES = {
+    "bytes": "resumeai_stage_bytes_total",
+    "prompt_tokens": "resumeai_prompt_tokens_total",
+    "completion_tokens": "resumeai_completion_tokens_total",
+}
+METRIC_HELP = {
+    "resumeai_stage_duration_seconds": "Time spent in each pipeline stage",
+    "resumeai_stage_errors_total": "Stage runs that raised an exception",
+    "resumeai_stage_bytes_total": "Bytes processed by each stage",
+    "resumeai_prompt_tokens_total": "Prompt tokens reported by Azure OpenAI",
+    "resumeai_completion_tokens_total": "Completion tokens reported by Azure OpenAI",
+    "resumeai_events_total": "Cache hits, cache misses, fallbacks and repairs",
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of a list of samples"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Metrics:
+    """Thread-safe registry of stage duration samples and labelled counters"""
+
+    def __init__(self, samples: int = STAGE_SAMPLES):
+        self.samples = samples
+        self._lock = threading.Lock()
+        # Recent samples give live percentiles; count and sum cover the whole process lifetime
+        self._durations: Dict[str, Deque[float]] = {}
+        self._duration_totals: Dict[str, Tuple[int, float]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self._durations.setdefault(stage, deque(maxlen=self.samples)).append(seconds)
+            count, total = self._duration_totals.get(stage, (0, 0.0))
+            self._duration_totals[stage] = (count + 1, total + seconds)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def stage_summaries(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and recent p50/p95/p99 seconds for every stage"""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._durations.items()}
+            totals = dict(self._duration_totals)
+        return {
+            stage: {
+                "count": totals[stage][0],
+                "total": totals[stage][1],
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for stage, values in sorted(samples.items())
+        }
+
+    def counters(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            return [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP resumeai_stage_duration_seconds {METRIC_HELP['resumeai_stage_duration_seconds']}",
+            "# TYPE resumeai_stage_duration_seconds summary",
+        ]
+        for stage, summary in self.stage_summaries().items():
+            for quantile in SUMMARY_QUANTILES:
+                value = summary[f"p{int(quantile * 100)}"]
+                lines.append(
+                    f'resumeai_stage_duration_seconds{{stage="{_escape(stage)}",quantile="{quantile}"}} {value}'
+                )
+            lines.append(f'resumeai_stage_duration_seconds_sum{{stage="{_escape(stage)}"}} {summary["total"]}')
+            lines.append(f'resumeai_stage_duration_seconds_count{{stage="{_escape(stage)}"}} {summary["count"]}')
+
+        described = set()
+        for name, labels, value in self.counters():
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry"""
+    return _metrics
+
+
+def record_event(event: str, stage: str = ""):
+    """Count a cache hit, cache miss, fallback or similar event"""
+    _metrics.increment("resumeai_events_total", event=event, stage=stage)
+
+
+class StageTrace:
+    """Handle for attaching sizes and token counts to the stage being traced"""
+
+    def __init__(self, stage: str, span=None):
+        self.stage = stage
+        self.span = span
+
+    def record(self, **values: Any):
+        for key, value in values.items():
+            if value is None:
+                continue
+            if key in COUNTED_ATTRIBUTES:
+                _metrics.increment(COUNTED_ATTRIBUTES[key], value, stage=self.stage)
+            if self.span is not None:
+                self.span.set_attribute(f"resumeai.{key}", value)
+
+
+@contextmanager
+def trace_stage(stage: str, **values: Any) -> Iterator[StageTrace]:
+    """Time a pipeline stage, recording its duration, errors and any attached values"""
+    span_context = _tracer.start_as_current_span(stage) if _tracer is not None else None
+    span = span_context.__enter__() if span_context is not None else None
+    stage_trace = StageTrace(stage, span)
+    stage_trace.record(**values)
+    started = time.perf_counter()
+    try:
+        yield stage_trace
+    except BaseException as e:
+        _metrics.increment("resumeai_stage_errors_total", stage=stage)
+        _metrics.observe(stage, time.perf_counter() - started)
+        if span_context is not None:
+            span_context.__exit__(type(e), e, e.__traceback__)
+        raise
+    _metrics.observe(stage, time.perf_counter() - started)
+    if span_context is not None:
+        span_context.__exit__(None, None, None)
+
+
+def traced(stage: str):
+    """Decorator form of trace_stage for plain (non-generator) functions"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace_stage(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server() -> Optional[str]:
+    """Serve /metrics on RESUMEAI_METRICS_PORT once per process; returns its URL, or None when disabled"""
+    global _metrics_server
+    port = os.environ.get("RESUMEAI_METRICS_PORT")
+    if not port:
+        return None
+    host = os.environ.get("RESUMEAI_METRICS_HOST", "127.0.0.1")
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            # http.server is only imported when the endpoint is enabled; it is slow to import
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    data = _metrics.render_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, format, *args):
+                    pass
+
+            _metrics_server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+        bound_host, bound_port = _metrics_server.server_address[:2]
+        return f"http://{bound_host}:{bound_port}/metrics"
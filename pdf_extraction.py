@@ -0,0 +1,109 @@
+"""Page-parallel PDF text extraction for large documents
+
+Extraction is serial unless RESUMEAI_PDF_PARALLEL_PAGES is set: PyPDF2 pages are cheap to extract,
+so a process pool only pays off for very long documents on machines with spare cores.
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from typing import Optional, Any, List, Tuple
+
+# 0 disables the pool; otherwise documents with at least this many pages are extracted in parallel
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("RESUMEAI_PDF_PARALLEL_PAGES", "0"))
+PAGE_TIMEOUT_SECONDS = float(os.environ.get("RESUMEAI_PDF_PAGE_TIMEOUT", "10"))
+MAX_WORKERS = int(os.environ.get("RESUMEAI_PDF_WORKERS", str(os.cpu_count() or 1)))
+
+_pool: Optional[Any] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Workers live as long as the pool, so PyPDF2 is imported once per worker rather than once per document
+    import PyPDF2  # noqa: F401
+
+
+def _extract_page_span(file_content: bytes, first: int, last: int) -> List[str]:
+    # Each worker parses the document once for its whole span of pages
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    return [pdf_reader.pages[index].extract_text() or "" for index in range(first, last)]
+
+
+def _get_pool(max_workers: int):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking a process that holds locks in other threads
+            _pool = multiprocessing.get_context("spawn").Pool(processes=max_workers, initializer=_init_worker)
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # A stuck page would otherwise keep its worker busy for every later document
+    pool.terminate()
+
+
+def shutdown_pool():
+    """Stop the shared extraction pool, if one was started"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+def resolve_page_range(page_count: int, page_range: Optional[Tuple[int, int]] = None) -> range:
+    """Turn an optional 1-based inclusive (first, last) page range into page indexes"""
+    if page_range is None:
+        return range(page_count)
+    first, last = page_range
+    return range(max(first, 1) - 1, min(last, page_count))
+
+
+def split_pages(pages: range, parts: int) -> List[range]:
+    """Split a page range into at most parts contiguous spans of near-equal length"""
+    parts = max(1, min(parts, len(pages)))
+    size, extra = divmod(len(pages), parts)
+    spans = []
+    start = pages.start
+    for part in range(parts):
+        end = start + size + (1 if part < extra else 0)
+        spans.append(range(start, end))
+        start = end
+    return spans
+
+
+def extract_pages_parallel(
+    file_content: bytes,
+    pages: range,
+    page_timeout: float = PAGE_TIMEOUT_SECONDS,
+    max_workers: int = MAX_WORKERS
+) -> List[str]:
+    """Extract pages on the shared process pool; spans exceeding their timeout come back empty"""
+    pool = _get_pool(max(1, max_workers))
+    spans = split_pages(pages, max_workers)
+    started = time.monotonic()
+    results = [
+        pool.apply_async(_extract_page_span, (file_content, span.start, span.stop))
+        for span in spans
+    ]
+    page_texts = []
+    timed_out = False
+    for span, result in zip(spans, results):
+        # Spans run side by side, so each one's budget counts from when extraction started
+        remaining = started + page_timeout * len(span) - time.monotonic()
+        try:
+            page_texts.extend(result.get(timeout=max(0.0, remaining)))
+        except multiprocessing.TimeoutError:
+            timed_out = True
+            page_texts.extend([""] * len(span))
+    if timed_out:
+        _discard_pool(pool)
+    return page_texts
@@ -0,0 +1,152 @@
+"""Local deterministic resume/job pre-scoring used to gate LLM comparisons"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just may me more most must my no nor not of off on once only or
+other our ours out over own per same she should so some such than that the their theirs them then there these
+they this those through to too under until up very via was we were what when where which while who whom why
+will with within would you your yours years year experience work working team role job candidate candidates
+ability strong excellent good including include includes responsibilities requirements required preferred plus
+""".split())
+
+# Multi-word skills are matched as bigrams of normalized tokens
+SKILL_KEYWORDS = frozenset("""
+python java javascript typescript c++ c# rust ruby php scala kotlin matlab sql nosql bash
+html css react angular vue django flask fastapi rails graphql api apis dotnet
+aws azure gcp docker kubernetes terraform ansible jenkins git linux unix
+postgresql mysql mongodb redis elasticsearch kafka spark hadoop airflow snowflake databricks tableau powerbi
+pandas numpy tensorflow pytorch nlp llm
+agile scrum kanban jira devops mlops microservices
+leadership management communication stakeholder budgeting forecasting negotiation mentoring
+marketing sales seo crm salesforce hubspot accounting finance audit compliance
+scikit_learn machine_learning deep_learning data_science data_analysis data_engineering computer_vision
+project_management product_management customer_service business_intelligence software_engineering
+""".split())
+
+# Skills that are also everyday words or letters ("go to", "the rest of", "R&D") only count in context
+CONTEXT_SKILLS = {
+    "go": "golang go_lang go_language go_programming go_developer",
+    "r": "rstudio r_programming r_language r_studio r_statistical",
+    "rest": "restful rest_api rest_apis rest_services rest_endpoints",
+    "excel": "microsoft_excel ms_excel excel_vba excel_formulas excel_spreadsheets excel_pivot advanced_excel",
+    "spring": "spring_boot spring_framework spring_mvc spring_cloud",
+    "swift": "swiftui swift_ios ios_swift swift_programming swift_language swift_developer",
+    "node.js": "nodejs node.js node_js",
+}
+SKILL_ALIASES = {alias: skill for skill, aliases in CONTEXT_SKILLS.items() for alias in aliases.split()}
+
+SIMILARITY_WEIGHT = 0.4
+SKILL_WEIGHT = 0.6
+
+
+@dataclass
+class PreScore:
+    """Local match estimate between a resume and a job description"""
+    score: float
+    similarity: float
+    skill_coverage: float
+    matched_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def extract_skills(tokens: Sequence[str]) -> set:
+    """Return the known skill keywords present in a token sequence"""
+    skills = {token for token in tokens if token in SKILL_KEYWORDS}
+    skills.update(SKILL_ALIASES[token] for token in tokens if token in SKILL_ALIASES)
+    for first, second in zip(tokens, tokens[1:]):
+        bigram = f"{first}_{second}"
+        if bigram in SKILL_KEYWORDS:
+            skills.add(bigram)
+        elif bigram in SKILL_ALIASES:
+            skills.add(SKILL_ALIASES[bigram])
+    return skills
+
+
+def tfidf_similarities(query_tokens: List[str], documents: List[List[str]]) -> np.ndarray:
+    """Cosine similarity between a query and each document over sublinear TF-IDF vectors
+
+    Term counts are kept as sparse (row, term, count) triples so memory grows with the
+    number of distinct terms per document rather than documents x vocabulary.
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, terms, counts = [], [], []
+    for row, tokens in enumerate([query_tokens] + documents):
+        term_counts: Dict[int, int] = {}
+        for token in tokens:
+            term = vocabulary.setdefault(token, len(vocabulary))
+            term_counts[term] = term_counts.get(term, 0) + 1
+        rows.extend([row] * len(term_counts))
+        terms.extend(term_counts.keys())
+        counts.extend(term_counts.values())
+
+    document_count = len(documents) + 1
+    rows = np.asarray(rows, dtype=np.int64)
+    terms = np.asarray(terms, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+
+    document_frequency = np.bincount(terms, minlength=len(vocabulary))
+    idf = np.log((1 + document_count) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[terms]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=document_count))
+
+    query_mask = rows == 0
+    query_vector = np.zeros(len(vocabulary))
+    query_vector[terms[query_mask]] = weights[query_mask]
+
+    dots = np.bincount(rows, weights=weights * query_vector[terms], minlength=document_count)
+    similarities = dots / np.maximum(norms * norms[0], 1e-12)
+    return similarities[1:]
+
+
+def prescore_many(resume_texts: List[str], job_description: str) -> List[PreScore]:
+    """Score many resumes against one job description; IDF is computed over the whole batch"""
+    job_tokens = tokenize(job_description)
+    job_skills = extract_skills(job_tokens)
+    resume_tokens = [tokenize(text) for text in resume_texts]
+
+    similarities = tfidf_similarities(job_tokens, resume_tokens)
+
+    results = []
+    for tokens, similarity in zip(resume_tokens, similarities):
+        resume_skills = extract_skills(tokens)
+        matched = sorted(job_skills & resume_skills)
+        missing = sorted(job_skills - resume_skills)
+        # With no recognisable skills in the job description, similarity alone decides
+        coverage = len(matched) / len(job_skills) if job_skills else float(similarity)
+        score = 100 * (SIMILARITY_WEIGHT * float(similarity) + SKILL_WEIGHT * coverage)
+        results.append(PreScore(
+            score=round(score, 1),
+            similarity=round(float(similarity), 4),
+            skill_coverage=round(coverage, 4),
+            matched_skills=[skill.replace('_', ' ') for skill in matched],
+            missing_skills=[skill.replace('_', ' ') for skill in missing],
+        ))
+    return results
+
+
+def prescore(resume_text: str, job_description: str) -> PreScore:
+    """Score a single resume against a job description"""
+    return prescore_many([resume_text], job_description)[0]
+
+
+def select_candidates(scores: Sequence[float], threshold: float = 0.0, top_k: Optional[int] = None) -> List[int]:
+    """Indexes of the candidates that should go on to the LLM, best first"""
+    scores = np.asarray(scores, dtype=np.float32)
+    order = np.argsort(-scores, kind="stable")
+    selected = [int(index) for index in order if scores[index] >= threshold]
+    if top_k is not None:
+        selected = selected[:top_k]
+    return selected
@@ -0,0 +1,113 @@
+"""Prompt assembly helpers: local token counting, extractor clean-up and token budgets"""
+import os
+import re
+from collections import Counter
+from typing import List
+
+RESUME_TOKEN_BUDGET = int(os.environ.get("RESUMEAI_RESUME_TOKEN_BUDGET", "6000"))
+JOB_TOKEN_BUDGET = int(os.environ.get("RESUMEAI_JOB_TOKEN_BUDGET", "2000"))
+CHUNK_TOKENS = int(os.environ.get("RESUMEAI_CHUNK_TOKENS", "3000"))
+
+# Lines repeated this often are page headers/footers left behind by the extractors
+REPEATED_LINE_THRESHOLD = 3
+REPEATED_LINE_MAX_CHARS = 80
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+INLINE_SPACE_PATTERN = re.compile(r"[ \t \f\v]+")
+TOKEN_ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    # tiktoken is optional and may need to fetch its vocabulary, so it is loaded once on first use
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate from words and punctuation"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return int(len(TOKEN_ESTIMATE_PATTERN.findall(text)) * 1.3)
+
+
+def clean_extracted_text(text: str) -> str:
+    """Remove page numbers, repeated headers/footers and redundant whitespace"""
+    lines = [INLINE_SPACE_PATTERN.sub(" ", line).strip() for line in text.splitlines()]
+    counts = Counter(line for line in lines if line)
+
+    cleaned = []
+    seen_repeated = set()
+    previous_blank = True
+    for line in lines:
+        if not line:
+            if not previous_blank:
+                cleaned.append("")
+            previous_blank = True
+            continue
+        if PAGE_NUMBER_PATTERN.match(line):
+            continue
+        if counts[line] >= REPEATED_LINE_THRESHOLD and len(line) <= REPEATED_LINE_MAX_CHARS:
+            # Keep the first occurrence, which is usually the real content (e.g. the name at the top)
+            if line in seen_repeated:
+                continue
+            seen_repeated.add(line)
+        cleaned.append(line)
+        previous_blank = False
+    return "\n".join(cleaned).strip()
+
+
+def fit_to_budget(text: str, budget: int) -> str:
+    """Truncate text on a line boundary so it stays within the token budget"""
+    if count_tokens(text) <= budget:
+        return text
+
+    # Text without line breaks (common in OCR output) is cut on word boundaries instead
+    separator = "\n" if "\n" in text.strip() else " "
+    kept = []
+    used = 0
+    for piece in text.split(separator):
+        piece_tokens = count_tokens(piece) + 1
+        if used + piece_tokens > budget:
+            break
+        kept.append(piece)
+        used += piece_tokens
+    return separator.join(kept).rstrip() + "\n[truncated]"
+
+
+def chunk_text(text: str, chunk_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """Split text into chunks of at most chunk_tokens, breaking between paragraphs where possible"""
+    units = []
+    for paragraph in text.split("\n\n"):
+        paragraph_tokens = count_tokens(paragraph)
+        if paragraph_tokens <= chunk_tokens:
+            units.append((paragraph, paragraph_tokens, "\n\n"))
+            continue
+        # Oversized paragraphs fall back to line breaks
+        for line in paragraph.split("\n"):
+            line = fit_to_budget(line, chunk_tokens)
+            units.append((line, count_tokens(line), "\n"))
+
+    chunks = []
+    current = ""
+    current_tokens = 0
+    for unit, unit_tokens, separator in units:
+        if current and current_tokens + unit_tokens > chunk_tokens:
+            chunks.append(current)
+            current = ""
+            current_tokens = 0
+        current = current + separator + unit if current else unit
+        current_tokens += unit_tokens
+    if current:
+        chunks.append(current)
+    return chunks
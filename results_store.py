@@ -0,0 +1,305 @@
+"""Columnar store for screening results: memory-mapped numeric columns plus an append-only text blob"""
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, Iterator, List
+
+import numpy as np
+
+from cache import DEFAULT_CACHE_DIR
+
+DEFAULT_RESULTS_DIR = os.path.join(DEFAULT_CACHE_DIR, "screening_results")
+# The app only browses stores under these directories; batch runs written elsewhere stay private to the server
+RESULTS_ROOTS = tuple(root for root in (DEFAULT_RESULTS_DIR, os.environ.get("RESUMEAI_RESULTS_DIR", "")) if root)
+MAX_OPEN_READERS = 8
+INITIAL_CAPACITY = 1024
+# Row count and status names are persisted every FLUSH_ROWS appends and on close
+FLUSH_ROWS = 256
+TEXT_FIELDS = ("file", "explanation", "strengths", "improvements", "error")
+NUMERIC_COLUMNS = {"score": np.float32, "prescore": np.float32, "status": np.uint8}
+SORT_COLUMNS = ("score", "prescore", "row")
+
+
+def _column_dtypes() -> Dict[str, Any]:
+    dtypes = dict(NUMERIC_COLUMNS)
+    for field in TEXT_FIELDS:
+        dtypes[f"{field}_offset"] = np.uint64
+        dtypes[f"{field}_length"] = np.uint32
+    return dtypes
+
+
+COLUMN_DTYPES = _column_dtypes()
+
+
+def _load_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+    # Other components write a meta.json too, so only a row count and status list mark a results store
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or not isinstance(meta.get("rows"), int) or not isinstance(meta.get("statuses"), list):
+        return None
+    return meta
+
+
+class ResultsStore:
+    """Screening results as memory-mapped columns; long text lives in an append-only blob referenced by offsets"""
+
+    def __init__(self, directory: str = DEFAULT_RESULTS_DIR, writable: bool = False):
+        self.directory = directory
+        self.writable = writable
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._blob_path = os.path.join(directory, "blobs.bin")
+        self._lock = threading.Lock()
+        self._columns: Dict[str, np.memmap] = {}
+        self._blob: Optional[mmap.mmap] = None
+        self._blob_file = None
+        self._unflushed = 0
+        if writable:
+            os.makedirs(directory, exist_ok=True)
+        self.rows = 0
+        self.statuses: List[str] = []
+        self._read_meta()
+        self._open(max(INITIAL_CAPACITY, self.rows) if writable else self.rows)
+        if writable:
+            self._blob_file = open(self._blob_path, 'ab')
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.col")
+
+    def _read_meta(self):
+        if os.path.exists(self._meta_path):
+            meta = _load_meta(self._meta_path)
+            if meta is None:
+                raise ValueError(f"{self.directory} does not hold a results store")
+            self.rows = meta["rows"]
+            self.statuses = meta["statuses"]
+
+    def _write_meta(self):
+        # Written to a temporary file and renamed, so readers never see a half-written count
+        temp_path = f"{self._meta_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": self.rows, "statuses": self.statuses}, f)
+        os.replace(temp_path, self._meta_path)
+
+    def _open(self, capacity: int):
+        self._capacity = capacity
+        for name, dtype in COLUMN_DTYPES.items():
+            path = self._column_path(name)
+            if self.writable:
+                size = capacity * np.dtype(dtype).itemsize
+                with open(path, 'ab') as f:
+                    if f.tell() < size:
+                        f.truncate(size)
+                self._columns[name] = np.memmap(path, dtype=dtype, mode='r+', shape=(capacity,))
+            elif capacity and os.path.exists(path):
+                self._columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(capacity,))
+            else:
+                # Stores written before a text field was added read it back as empty
+                self._columns[name] = np.zeros(capacity, dtype=dtype)
+
+    def _blob_view(self) -> mmap.mmap:
+        if self._blob_file is not None:
+            # A writer's own reads must see text still sitting in its write buffer
+            self._blob_file.flush()
+            self._blob = None
+        if self._blob is None:
+            # A plain mmap slices to bytes far faster than a NumPy view, which matters when scanning names
+            with open(self._blob_path, 'rb') as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._blob
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def refresh(self):
+        """Pick up rows appended by a writer in another process since this store was opened"""
+        if self.writable:
+            return
+        with self._lock:
+            rows = self.rows
+            self._read_meta()
+            if self.rows != rows:
+                self._open(self.rows)
+                self._blob = None
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Add one screening result and return its row number"""
+        if not self.writable:
+            raise ValueError(f"Results store at {self.directory} is open read-only")
+        with self._lock:
+            row = self.rows
+            if row >= self._capacity:
+                for column in self._columns.values():
+                    column.flush()
+                self._open(self._capacity * 2)
+
+            status = record.get("status") or "ok"
+            if status not in self.statuses:
+                self.statuses.append(status)
+            self._columns["status"][row] = self.statuses.index(status)
+            for name in ("score", "prescore"):
+                value = record.get(name)
+                self._columns[name][row] = np.nan if value is None else float(value)
+
+            offset = self._blob_file.tell()
+            for field in TEXT_FIELDS:
+                data = str(record.get(field) or "").encode('utf-8')
+                self._blob_file.write(data)
+                self._columns[f"{field}_offset"][row] = offset
+                self._columns[f"{field}_length"][row] = len(data)
+                offset += len(data)
+
+            self.rows += 1
+            self._unflushed += 1
+            if self._unflushed >= FLUSH_ROWS:
+                self._flush()
+            return row
+
+    def _flush(self):
+        # Text and columns reach the disk before the row count that makes them visible
+        self._blob_file.flush()
+        for column in self._columns.values():
+            column.flush()
+        self._write_meta()
+        self._unflushed = 0
+
+    def flush(self):
+        if self.writable:
+            with self._lock:
+                self._flush()
+
+    def close(self):
+        if self.writable and self._blob_file is not None:
+            self.flush()
+            self._blob_file.close()
+            self._blob_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a read-only view of a numeric column over the stored rows"""
+        if name == "row":
+            return np.arange(self.rows)
+        return self._columns[name][:self.rows]
+
+    def text(self, field: str, row: int) -> str:
+        """Read one text field of one row from the blob file"""
+        offset = int(self._columns[f"{field}_offset"][row])
+        length = int(self._columns[f"{field}_length"][row])
+        if not length:
+            return ""
+        return self._blob_view()[offset:offset + length].decode('utf-8')
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """Materialise one row as a result dict"""
+        record: Dict[str, Any] = {"row": row, "status": self.statuses[int(self._columns["status"][row])]}
+        for name in ("score", "prescore"):
+            value = float(self._columns[name][row])
+            if np.isnan(value):
+                record[name] = None
+            else:
+                record[name] = int(value) if value.is_integer() else round(value, 2)
+        for field in TEXT_FIELDS:
+            record[field] = self.text(field, row)
+        return record
+
+    def select(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        name_contains: str = ""
+    ) -> np.ndarray:
+        """Return the row numbers matching every given filter"""
+        mask = np.ones(self.rows, dtype=bool)
+        if statuses is not None:
+            codes = [self.statuses.index(status) for status in statuses if status in self.statuses]
+            mask &= np.isin(self.column("status"), codes)
+        scores = self.column("score")
+        if min_score is not None:
+            mask &= scores >= min_score
+        if max_score is not None:
+            mask &= scores <= max_score
+        rows = np.flatnonzero(mask)
+        if name_contains:
+            # Only the file names of rows that passed the numeric filters are read
+            needle = name_contains.lower().encode('utf-8')
+            blob = self._blob_view() if len(rows) else b""
+            offsets = self.column("file_offset")[rows].tolist()
+            ends = (self.column("file_offset")[rows] + self.column("file_length")[rows]).tolist()
+            rows = rows[[needle in blob[start:end].lower() for start, end in zip(offsets, ends)]]
+        return rows
+
+    def sort(self, rows: np.ndarray, by: str = "score", descending: bool = True) -> np.ndarray:
+        """Order row numbers by a column; rows without a value always sort last"""
+        if by not in SORT_COLUMNS:
+            raise ValueError(f"Can only sort by {', '.join(SORT_COLUMNS)}, not {by!r}")
+        values = self.column(by)[rows].astype(np.float64)
+        missing = np.isnan(values)
+        keys = -values if descending else values
+        keys[missing] = 0.0
+        # lexsort sorts by the last key first: missing values, then the column, then row number
+        return rows[np.lexsort((rows, keys, missing))]
+
+    def ranked(self) -> np.ndarray:
+        """All rows in batch ranking order: by score, then pre-score, best first"""
+        rows = np.arange(self.rows)
+        scores = self.column("score").astype(np.float64)
+        prescores = np.nan_to_num(self.column("prescore").astype(np.float64), nan=0.0)
+        missing = np.isnan(scores)
+        return rows[np.lexsort((rows, -prescores, -np.nan_to_num(scores, nan=0.0), missing))]
+
+    def page(self, rows: np.ndarray, page: int, page_size: int = 50) -> List[Dict[str, Any]]:
+        """Materialise one page of rows; only these rows' text is read"""
+        start = max(page, 0) * page_size
+        return [self.get(int(row)) for row in rows[start:start + page_size]]
+
+    def iter_rows(self, rows: Optional[np.ndarray] = None) -> Iterator[Dict[str, Any]]:
+        for row in (range(self.rows) if rows is None else rows):
+            yield self.get(int(row))
+
+
+def resolve_results_dir(directory: str) -> Optional[str]:
+    """Return the real path of directory if it lies under one of RESULTS_ROOTS, otherwise None"""
+    path = os.path.realpath(directory)
+    for root in RESULTS_ROOTS:
+        root = os.path.realpath(root)
+        if os.path.commonpath([path, root]) == root:
+            return path
+    return None
+
+
+# Readers keep their columns and blob mapped, so only the most recently viewed stores stay open
+_readers: "OrderedDict[str, ResultsStore]" = OrderedDict()
+_readers_lock = threading.Lock()
+
+
+def get_results_store(directory: str = DEFAULT_RESULTS_DIR) -> Optional[ResultsStore]:
+    """Return a shared read-only view of a results store, refreshed with any newly written rows"""
+    if _load_meta(os.path.join(directory, "meta.json")) is None:
+        return None
+    with _readers_lock:
+        store = _readers.get(directory)
+        if store is None:
+            try:
+                store = ResultsStore(directory)
+            except ValueError:
+                return None
+            _readers[directory] = store
+            while len(_readers) > MAX_OPEN_READERS:
+                _readers.popitem(last=False)
+        else:
+            _readers.move_to_end(directory)
+    try:
+        store.refresh()
+    except ValueError:
+        return None
+    return store
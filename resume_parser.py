@@ -0,0 +1,193 @@
+"""Single-pass parser turning extracted resume text into sections, entries, date ranges and bullets"""
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Iterable, List
+
+HEADER_KIND = "header"
+OTHER_KIND = "other"
+# Sections whose lines are grouped into entries (a role, degree or project with dates and bullets)
+ENTRY_KINDS = frozenset({"experience", "education", "projects", "volunteering"})
+# Sections whose content is a list of short items rather than prose
+LIST_KINDS = frozenset({"skills", "languages", "certifications", "interests"})
+STRUCTURED_KINDS = ENTRY_KINDS | LIST_KINDS
+# Dropped first when a resume has to be shortened for a prompt
+LOW_VALUE_KINDS = ("references", "interests")
+
+HEADING_KINDS: Dict[str, str] = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary", "about me": "summary",
+    "objective": "summary", "career objective": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "career history": "experience",
+    "education": "education", "academic background": "education", "qualifications": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills", "key skills": "skills",
+    "core competencies": "skills", "competencies": "skills", "technologies": "skills",
+    "projects": "projects", "key projects": "projects", "selected projects": "projects",
+    "certifications": "certifications", "certification": "certifications", "licenses": "certifications",
+    "awards": "awards", "achievements": "awards", "honors": "awards",
+    "publications": "publications",
+    "languages": "languages",
+    "interests": "interests", "hobbies": "interests",
+    "volunteering": "volunteering", "volunteer experience": "volunteering",
+    "references": "references",
+}
+
+MAX_HEADING_CHARS = 40
+CAPS_HEADING_PATTERN = re.compile(r"[A-Z][A-Z &/'-]{3,39}:?")
+BULLET_PATTERN = re.compile(r"(?:[-*•▪◦·●‣–]|\d{1,2}[.)])\s+")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+"
+_DATE = rf"(?:{_MONTH}|\d{{1,2}}/)?(?:19|20)\d{{2}}"
+DATE_RANGE_PATTERN = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|present|current|now|today)",
+    re.IGNORECASE
+)
+YEAR_PATTERN = re.compile(r"(?:19|20)\d{2}")
+ITEM_SEPARATOR_PATTERN = re.compile(r"\s*[,;|•]\s*")
+
+
+@dataclass
+class DateRange:
+    """A start and end date as written, with their years; end_year is None for a current role"""
+    start: str
+    end: str
+    start_year: int
+    end_year: Optional[int]
+
+    @property
+    def current(self) -> bool:
+        return self.end_year is None
+
+    def years(self, today_year: Optional[int] = None) -> int:
+        return max(0, (self.end_year or today_year or time.gmtime().tm_year) - self.start_year)
+
+
+@dataclass
+class Entry:
+    """One role, degree or project: its heading lines, date range and bullet points"""
+    heading: str
+    details: List[str] = field(default_factory=list)
+    bullets: List[str] = field(default_factory=list)
+    dates: Optional[DateRange] = None
+
+
+@dataclass
+class ResumeSection:
+    """A titled block of the resume, with its lines and the entries or items parsed from them"""
+    title: str
+    kind: str
+    lines: List[str] = field(default_factory=list)
+    entries: List[Entry] = field(default_factory=list)
+    items: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+@dataclass
+class ParsedResume:
+    """The extractor output as a header plus typed sections"""
+    header: ResumeSection
+    sections: List[ResumeSection] = field(default_factory=list)
+
+    def sections_of(self, kind: str) -> List[ResumeSection]:
+        return [section for section in self.sections if section.kind == kind]
+
+    @property
+    def skills(self) -> List[str]:
+        return [item for section in self.sections_of("skills") for item in section.items]
+
+    @property
+    def date_ranges(self) -> List[DateRange]:
+        return [entry.dates for section in self.sections for entry in section.entries if entry.dates]
+
+    def text(self, kinds: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()) -> str:
+        """Rebuild the text of the header and the selected sections, headings included"""
+        kinds = set(kinds) if kinds is not None else None
+        exclude = set(exclude)
+        parts = [self.header.text] if self.header.lines else []
+        for section in self.sections:
+            if section.kind in exclude or (kinds is not None and section.kind not in kinds):
+                continue
+            parts.append(f"{section.title}\n{section.text}".strip())
+        return "\n\n".join(part for part in parts if part)
+
+
+def heading_kind(line: str, allow_unknown: bool = True) -> Optional[str]:
+    """Return the section kind a line introduces, or None when it is not a heading"""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    kind = HEADING_KINDS.get(line.rstrip(":").strip().lower())
+    if kind is not None:
+        return kind
+    if allow_unknown and CAPS_HEADING_PATTERN.fullmatch(line):
+        return OTHER_KIND
+    return None
+
+
+def parse_date_range(line: str) -> Optional[DateRange]:
+    """Find the first date range in a line"""
+    match = DATE_RANGE_PATTERN.search(line)
+    if match is None:
+        return None
+    start, end = match.group("start"), match.group("end")
+    end_year = YEAR_PATTERN.search(end)
+    return DateRange(start, end, int(YEAR_PATTERN.search(start).group()), int(end_year.group()) if end_year else None)
+
+
+def parse_resume(text: str) -> ParsedResume:
+    """Parse resume text in one pass over its lines"""
+    header = ResumeSection("Header", HEADER_KIND)
+    parsed = ParsedResume(header)
+    section = header
+    entry: Optional[Entry] = None
+    # A non-bullet line after a blank line or a bullet starts the next entry
+    entry_break = True
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if section.lines and section.lines[-1]:
+                section.lines.append("")
+            entry_break = True
+            continue
+
+        # An all-caps first line is the candidate's name, and inside entry and list sections such a line
+        # is more often an employer or a skill than a heading, so only known headings count there
+        allow_unknown = bool(parsed.sections or header.lines) and section.kind not in STRUCTURED_KINDS
+        kind = heading_kind(line, allow_unknown)
+        if kind is not None:
+            section = ResumeSection(line.rstrip(":").strip(), kind)
+            parsed.sections.append(section)
+            entry, entry_break = None, True
+            continue
+
+        section.lines.append(line)
+        bullet = BULLET_PATTERN.match(line)
+        content = line[bullet.end():] if bullet else line
+
+        if section.kind in LIST_KINDS:
+            section.items.extend(item for item in ITEM_SEPARATOR_PATTERN.split(content) if item)
+        elif section.kind in ENTRY_KINDS:
+            if bullet and entry is not None:
+                entry.bullets.append(content)
+                entry_break = True
+                continue
+            dates = parse_date_range(content)
+            if (entry is None or bullet or (entry_break and (entry.bullets or entry.dates))
+                    or (dates is not None and entry.dates is not None)):
+                entry = Entry(content, dates=dates)
+                section.entries.append(entry)
+            else:
+                entry.details.append(content)
+                if entry.dates is None:
+                    entry.dates = dates
+            entry_break = False
+
+    return parsed
+
+
+def relevant_text(text: str, exclude: Iterable[str] = LOW_VALUE_KINDS) -> str:
+    """Drop low-value sections such as references before text is condensed or sent to a prompt"""
+    return parse_resume(text).text(exclude=exclude)
@@ -0,0 +1,107 @@
+"""Section-level diffs between successive uploads of the same resume"""
+import hashlib
+from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from prompting import clean_extracted_text
+from resume_parser import parse_resume
+
+
+@dataclass
+class Section:
+    """One titled block of resume text and a digest of its whitespace-normalised content"""
+    title: str
+    text: str
+    digest: str
+
+
+@dataclass
+class SectionDiff:
+    """Which sections of the current upload changed relative to the previous one"""
+    unchanged: List[Section] = field(default_factory=list)
+    changed: List[Section] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Characters of the lines added, edited or deleted, and of the current text plus deleted lines
+    changed_chars: int = 0
+    total_chars: int = 0
+
+    @property
+    def changed_ratio(self) -> float:
+        """Share of the text, counted line by line, that is new, edited or deleted"""
+        return self.changed_chars / self.total_chars if self.total_chars else 1.0
+
+    @property
+    def is_unchanged(self) -> bool:
+        return not self.changed and not self.removed
+
+
+@dataclass
+class ResumeRevision:
+    """The sections of an analysed upload and the feedback it received"""
+    sections: List[Section]
+    suggestions: List[str]
+
+
+def _make_section(title: str, text: str) -> Section:
+    normalised = " ".join(text.split())
+    return Section(title, text, hashlib.sha256(normalised.encode('utf-8')).hexdigest())
+
+
+def split_sections(resume_text: str) -> List[Section]:
+    """Split cleaned resume text into the parser's sections; text before the first heading is the header"""
+    parsed = parse_resume(clean_extracted_text(resume_text))
+    sections = [_make_section(parsed.header.title, parsed.header.text)] if parsed.header.lines else []
+    seen: Dict[str, int] = {}
+    for section in parsed.sections:
+        title = section.title.title()
+        # Repeated headings stay distinct so each can be matched to its earlier version
+        seen[title] = seen.get(title, 0) + 1
+        if seen[title] > 1:
+            title = f"{title} ({seen[title]})"
+        sections.append(_make_section(title, section.text))
+    return sections
+
+
+def _lines(text: str) -> List[str]:
+    return [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+
+
+def _changed_line_chars(previous_text: str, current_text: str) -> Tuple[int, int]:
+    """Characters in current lines that are new or edited, and in previous lines that were deleted"""
+    previous_lines, current_lines = _lines(previous_text), _lines(current_text)
+    added = deleted = 0
+    matcher = SequenceMatcher(None, previous_lines, current_lines, autojunk=False)
+    for tag, previous_start, previous_end, current_start, current_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        new_chars = sum(len(line) for line in current_lines[current_start:current_end])
+        old_chars = sum(len(line) for line in previous_lines[previous_start:previous_end])
+        added += new_chars
+        # An edited line counts once at its new length; only text beyond that was deleted
+        deleted += max(0, old_chars - new_chars)
+    return added, deleted
+
+
+def diff_sections(previous: List[Section], current: List[Section]) -> SectionDiff:
+    """Match sections by title and compare their digests, then measure the edits line by line"""
+    previous_sections = {section.title: section for section in previous}
+    diff = SectionDiff()
+    for section in current:
+        diff.total_chars += sum(len(line) for line in _lines(section.text))
+        earlier = previous_sections.get(section.title)
+        if earlier is not None and earlier.digest == section.digest:
+            diff.unchanged.append(section)
+            continue
+        diff.changed.append(section)
+        added, deleted = _changed_line_chars(earlier.text if earlier is not None else "", section.text)
+        diff.changed_chars += added + deleted
+        diff.total_chars += deleted
+    current_titles = {section.title for section in current}
+    for section in previous:
+        if section.title not in current_titles:
+            diff.removed.append(section.title)
+            removed_chars = sum(len(line) for line in _lines(section.text))
+            diff.changed_chars += removed_chars
+            diff.total_chars += removed_chars
+    return diff
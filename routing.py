@@ -0,0 +1,285 @@
+"""Choose between local extraction and Azure Document Intelligence by inspecting each document"""
+import io
+import logging
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Optional, Dict, Any, Deque, List, Tuple
+
+from metrics import record_event, trace_stage
+
+LOCAL_EXTRACTOR = "local"
+DOCUMENT_INTELLIGENCE_EXTRACTOR = "document_intelligence"
+ROUTING_MODES = ("auto", LOCAL_EXTRACTOR, DOCUMENT_INTELLIGENCE_EXTRACTOR)
+# A local result is "avoidable" DI work when its text density was this close to what DI returned
+AVOIDABLE_DENSITY_RATIO = 0.8
+RECENT_DECISIONS = 50
+
+logger = logging.getLogger("resumeai")
+
+DOCX_TEXT_PATTERN = re.compile(rb"<w:t(?:\s[^>]*)?>([^<]*)</w:t>")
+DOCX_TABLE_PATTERN = re.compile(rb"<w:tbl>")
+DOCX_TEXT_BOX_PATTERN = re.compile(rb"<w:txbxContent>")
+DOCX_IMAGE_PATTERN = re.compile(rb"<pic:pic>")
+
+
+@dataclass
+class RoutingPolicy:
+    """Admin-tunable routing rules; mode "local" or "document_intelligence" bypasses inspection"""
+    mode: str = "auto"
+    min_chars_per_page: int = 200
+    max_image_page_ratio: float = 0.0
+    sample_pages: int = 3
+    docx_layout_to_document_intelligence: bool = True
+
+
+@dataclass
+class DocumentProfile:
+    """What a cheap inspection found in a PDF or DOCX file"""
+    kind: str
+    pages: int = 0
+    text_pages: int = 0
+    image_only_pages: int = 0
+    sampled_chars_per_page: float = 0.0
+    tables: int = 0
+    text_boxes: int = 0
+    images: int = 0
+    error: str = ""
+
+
+@dataclass
+class RoutingDecision:
+    """The extractor chosen for one document and why"""
+    extractor: str
+    reason: str
+    profile: DocumentProfile
+    policy_override: bool = False
+
+
+def load_routing_policy() -> RoutingPolicy:
+    """Read the routing policy from the RESUMEAI_EXTRACTION_ROUTING* environment variables
+
+    A bad value is logged and the default policy used, so a typo cannot stop the app from importing.
+    """
+    try:
+        mode = os.environ.get("RESUMEAI_EXTRACTION_ROUTING", "auto").lower()
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"RESUMEAI_EXTRACTION_ROUTING must be one of {', '.join(ROUTING_MODES)}, got {mode!r}")
+        return RoutingPolicy(
+            mode=mode,
+            min_chars_per_page=int(os.environ.get("RESUMEAI_ROUTING_MIN_CHARS_PER_PAGE", "200")),
+            max_image_page_ratio=float(os.environ.get("RESUMEAI_ROUTING_MAX_IMAGE_PAGE_RATIO", "0")),
+            sample_pages=int(os.environ.get("RESUMEAI_ROUTING_SAMPLE_PAGES", "3")),
+            docx_layout_to_document_intelligence=os.environ.get("RESUMEAI_ROUTING_DOCX_LAYOUT", "1") != "0",
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid extraction routing settings, using the default policy: {e}")
+        return RoutingPolicy()
+
+
+_policy = load_routing_policy()
+
+
+def get_routing_policy() -> RoutingPolicy:
+    """Return the process-wide routing policy"""
+    return _policy
+
+
+def set_routing_policy(policy: RoutingPolicy):
+    """Replace the process-wide routing policy, e.g. from a command-line override"""
+    global _policy
+    if policy.mode not in ROUTING_MODES:
+        raise ValueError(f"Routing mode must be one of {', '.join(ROUTING_MODES)}, got {policy.mode!r}")
+    _policy = policy
+
+
+def _resolve(obj):
+    return obj.get_object() if hasattr(obj, "get_object") else obj
+
+
+def _resource_content(resources, depth: int = 1) -> Tuple[bool, bool]:
+    """Return (has_fonts, has_images) for a resource dictionary, looking one level into form XObjects"""
+    resources = _resolve(resources) or {}
+    has_fonts = bool(_resolve(resources.get("/Font")))
+    has_images = False
+    for xobject in (_resolve(resources.get("/XObject")) or {}).values():
+        xobject = _resolve(xobject)
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            has_images = True
+        elif subtype == "/Form" and depth > 0 and "/Resources" in xobject:
+            form_fonts, form_images = _resource_content(xobject["/Resources"], depth - 1)
+            has_fonts = has_fonts or form_fonts
+            has_images = has_images or form_images
+    return has_fonts, has_images
+
+
+def inspect_pdf(file_content: bytes, sample_pages: int = 3) -> DocumentProfile:
+    """Count text-layer and image-only pages from page resources, extracting text from a few pages only"""
+    import PyPDF2
+
+    profile = DocumentProfile(kind="pdf")
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        if reader.is_encrypted:
+            profile.error = "encrypted"
+            return profile
+        profile.pages = len(reader.pages)
+        sampled_chars = 0
+        sampled = 0
+        for page in reader.pages:
+            has_fonts, has_images = _resource_content(page.get("/Resources"))
+            if has_fonts:
+                profile.text_pages += 1
+                if sampled < sample_pages:
+                    sampled_chars += len((page.extract_text() or "").strip())
+                    sampled += 1
+            elif has_images:
+                profile.image_only_pages += 1
+        profile.sampled_chars_per_page = sampled_chars / sampled if sampled else 0.0
+    except Exception as e:
+        profile.error = str(e) or type(e).__name__
+    return profile
+
+
+def inspect_docx(file_content: bytes) -> DocumentProfile:
+    """Count text, tables, text boxes and images straight from the document XML"""
+    profile = DocumentProfile(kind="docx", pages=1)
+    try:
+        with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+            document_xml = archive.read("word/document.xml")
+        text_chars = sum(len(match) for match in DOCX_TEXT_PATTERN.findall(document_xml))
+        profile.tables = len(DOCX_TABLE_PATTERN.findall(document_xml))
+        profile.text_boxes = len(DOCX_TEXT_BOX_PATTERN.findall(document_xml))
+        profile.images = len(DOCX_IMAGE_PATTERN.findall(document_xml))
+        profile.text_pages = 1 if text_chars else 0
+        profile.sampled_chars_per_page = float(text_chars)
+    except Exception as e:
+        profile.error = str(e) or type(e).__name__
+    return profile
+
+
+def choose_extractor(profile: DocumentProfile, policy: RoutingPolicy) -> Tuple[str, str]:
+    """Apply the routing rules to an inspected document"""
+    if profile.error:
+        return DOCUMENT_INTELLIGENCE_EXTRACTOR, f"could not inspect locally ({profile.error})"
+
+    if profile.kind == "docx":
+        if policy.docx_layout_to_document_intelligence and (profile.tables or profile.text_boxes):
+            return (
+                DOCUMENT_INTELLIGENCE_EXTRACTOR,
+                f"{profile.tables} tables and {profile.text_boxes} text boxes are skipped by python-docx",
+            )
+        if profile.images and profile.sampled_chars_per_page < policy.min_chars_per_page:
+            return DOCUMENT_INTELLIGENCE_EXTRACTOR, f"{profile.images} images and little text"
+        return LOCAL_EXTRACTOR, "plain paragraphs"
+
+    if profile.text_pages == 0:
+        return DOCUMENT_INTELLIGENCE_EXTRACTOR, "no text layer"
+    image_ratio = profile.image_only_pages / profile.pages if profile.pages else 0.0
+    if image_ratio > policy.max_image_page_ratio:
+        return (
+            DOCUMENT_INTELLIGENCE_EXTRACTOR,
+            f"{profile.image_only_pages} of {profile.pages} pages are image-only",
+        )
+    if profile.sampled_chars_per_page < policy.min_chars_per_page:
+        return (
+            DOCUMENT_INTELLIGENCE_EXTRACTOR,
+            f"text layer averages {profile.sampled_chars_per_page:.0f} chars per page",
+        )
+    return LOCAL_EXTRACTOR, f"text layer on {profile.text_pages} of {profile.pages} pages"
+
+
+def route_document(file_content: bytes, file_extension: str, policy: Optional[RoutingPolicy] = None) -> RoutingDecision:
+    """Decide whether a PDF or DOCX needs Document Intelligence or can be extracted locally"""
+    policy = policy or get_routing_policy()
+    if policy.mode != "auto":
+        decision = RoutingDecision(
+            policy.mode, f"routing policy is {policy.mode}", DocumentProfile(kind=file_extension), policy_override=True
+        )
+    else:
+        with trace_stage("extract.route", bytes=len(file_content)):
+            if file_extension == "pdf":
+                profile = inspect_pdf(file_content, policy.sample_pages)
+            else:
+                profile = inspect_docx(file_content)
+            extractor, reason = choose_extractor(profile, policy)
+        decision = RoutingDecision(extractor, reason, profile)
+    record_event(f"route_{decision.extractor}", "extract.route")
+    return decision
+
+
+class RoutingStats:
+    """Routing decisions and how often the extracted text proved them right"""
+
+    def __init__(self, recent: int = RECENT_DECISIONS):
+        self._lock = threading.Lock()
+        self.decisions: Dict[str, int] = {LOCAL_EXTRACTOR: 0, DOCUMENT_INTELLIGENCE_EXTRACTOR: 0}
+        self.checked = 0
+        self.misroutes = 0
+        self.avoidable = 0
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+
+    def record_outcome(
+        self,
+        decision: RoutingDecision,
+        extracted_text: str,
+        policy: Optional[RoutingPolicy] = None
+    ) -> bool:
+        """Log a decision with its result; returns False when a local extraction came back too thin"""
+        policy = policy or get_routing_policy()
+        profile = decision.profile
+        chars_per_page = len(extracted_text.strip()) / max(profile.pages, 1)
+        if decision.extractor == LOCAL_EXTRACTOR:
+            outcome = "ok" if chars_per_page >= policy.min_chars_per_page else "misroute"
+        elif profile.kind == "pdf" and profile.text_pages and not profile.error:
+            # The sampled text layer was nearly as dense as what Document Intelligence returned
+            avoidable = profile.sampled_chars_per_page >= AVOIDABLE_DENSITY_RATIO * chars_per_page
+            outcome = "avoidable" if avoidable else "ok"
+        else:
+            outcome = "unchecked"
+
+        with self._lock:
+            self.decisions[decision.extractor] = self.decisions.get(decision.extractor, 0) + 1
+            if outcome != "unchecked" and not decision.policy_override:
+                self.checked += 1
+                self.misroutes += outcome == "misroute"
+                self.avoidable += outcome == "avoidable"
+            # File names are left out: the buffer is process-wide and shared by every session
+            self._recent.append({
+                "extractor": decision.extractor,
+                "reason": decision.reason,
+                "outcome": outcome,
+                "chars_per_page": round(chars_per_page),
+                **{key: value for key, value in asdict(profile).items() if key != "kind"},
+            })
+        if outcome in ("misroute", "avoidable"):
+            record_event(outcome, "extract.route")
+        return outcome != "misroute"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "local": self.decisions.get(LOCAL_EXTRACTOR, 0),
+                "document_intelligence": self.decisions.get(DOCUMENT_INTELLIGENCE_EXTRACTOR, 0),
+                "checked": self.checked,
+                "misroutes": self.misroutes,
+                "avoidable": self.avoidable,
+                "accuracy": (self.checked - self.misroutes - self.avoidable) / self.checked if self.checked else 1.0,
+            }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """The latest decisions, newest first"""
+        with self._lock:
+            return list(reversed(self._recent))
+
+
+_routing_stats = RoutingStats()
+
+
+def get_routing_stats() -> RoutingStats:
+    """Return the process-wide routing statistics"""
+    return _routing_stats
@@ -0,0 +1,178 @@
+"""Typed, schema-validated results parsed from Azure OpenAI JSON replies"""
+import json
+import re
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List
+
+SUGGESTION_COUNT = 3
+
+FEEDBACK_SCHEMA_HINT = '{"suggestions": ["<suggestion 1>", "<suggestion 2>", "<suggestion 3>"]}'
+COMPARISON_SCHEMA_HINT = (
+    '{"score": <integer 0-100>, "explanation": "<2-3 sentences>", '
+    '"strengths": "<key strengths>", "improvements": "<areas to improve>"}'
+)
+COMBINED_SCHEMA_HINT = (
+    '{"score": <integer 0-100>, "explanation": "<2-3 sentences>", "strengths": "<key strengths>", '
+    '"improvements": "<areas to improve>", "suggestions": ["<suggestion 1>", "<suggestion 2>", "<suggestion 3>"]}'
+)
+
+CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+STRING_LITERAL_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+PARTIAL_SCORE_PATTERN = re.compile(r'"score"\s*:\s*(\d+)\s*[,}\s]')
+
+
+class ParseError(ValueError):
+    """A model reply did not match the expected schema"""
+
+
+@dataclass
+class FeedbackResult:
+    """Resume improvement suggestions"""
+    suggestions: List[str]
+
+
+@dataclass
+class JobComparison:
+    """Match score and analysis of a resume against one job description"""
+    score: int
+    explanation: str
+    strengths: str
+    improvements: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CombinedAnalysis:
+    """Feedback and job comparison returned by a single request"""
+    feedback: FeedbackResult
+    comparison: JobComparison
+
+
+def _load_object(text: str) -> Dict[str, Any]:
+    text = CODE_FENCE_PATTERN.sub("", (text or "").strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ParseError(f"reply is not valid JSON ({e.msg})")
+    if not isinstance(data, dict):
+        raise ParseError("reply is not a JSON object")
+    return data
+
+
+def _text_field(data: Dict[str, Any], field: str) -> str:
+    value = data.get(field)
+    if isinstance(value, list):
+        value = "; ".join(str(item).strip() for item in value)
+    if not isinstance(value, str) or not value.strip():
+        raise ParseError(f'"{field}" must be a non-empty string')
+    return value.strip()
+
+
+def _feedback_from(data: Dict[str, Any]) -> FeedbackResult:
+    suggestions = data.get("suggestions")
+    if not isinstance(suggestions, list):
+        raise ParseError('"suggestions" must be a list')
+    suggestions = [str(item).strip() for item in suggestions if str(item).strip()]
+    if len(suggestions) < SUGGESTION_COUNT:
+        raise ParseError(f'"suggestions" must contain {SUGGESTION_COUNT} non-empty items')
+    return FeedbackResult(suggestions=suggestions[:SUGGESTION_COUNT])
+
+
+def _comparison_from(data: Dict[str, Any]) -> JobComparison:
+    score = data.get("score")
+    if isinstance(score, str) and score.strip().split('/')[0].strip().isdigit():
+        score = int(score.strip().split('/')[0])
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        raise ParseError('"score" must be a number between 0 and 100')
+    return JobComparison(
+        score=int(round(score)),
+        explanation=_text_field(data, "explanation"),
+        strengths=_text_field(data, "strengths"),
+        improvements=_text_field(data, "improvements"),
+    )
+
+
+def parse_feedback_result(text: str) -> FeedbackResult:
+    return _feedback_from(_load_object(text))
+
+
+def parse_job_comparison(text: str) -> JobComparison:
+    return _comparison_from(_load_object(text))
+
+
+def parse_combined_result(text: str) -> CombinedAnalysis:
+    data = _load_object(text)
+    return CombinedAnalysis(feedback=_feedback_from(data), comparison=_comparison_from(data))
+
+
+def partial_suggestions(text: str) -> List[str]:
+    """Suggestions whose strings are already complete in a partially streamed JSON reply"""
+    start = text.find('"suggestions"')
+    if start < 0:
+        return []
+    bracket = text.find('[', start)
+    if bracket < 0:
+        return []
+    return [json.loads(literal) for literal in STRING_LITERAL_PATTERN.findall(text, bracket)][:SUGGESTION_COUNT]
+
+
+def partial_comparison(text: str) -> Dict[str, Any]:
+    """Comparison fields already complete in a partially streamed JSON reply"""
+    result: Dict[str, Any] = {}
+    match = PARTIAL_SCORE_PATTERN.search(text)
+    if match:
+        result["score"] = int(match.group(1))
+    for field in ("explanation", "strengths", "improvements"):
+        field_match = re.search(rf'"{field}"\s*:\s*("(?:[^"\\]|\\.)*")', text)
+        if field_match:
+            result[field] = json.loads(field_match.group(1))
+    return result
+
+
+def repair_messages(messages: list, reply: str, error: ParseError, schema_hint: str) -> list:
+    """Follow-up messages asking the model to fix a reply that failed validation"""
+    return messages + [
+        {"role": "assistant", "content": reply or ""},
+        {"role": "user", "content": (
+            f"Your reply could not be used: {error}. "
+            f"Reply again with only a JSON object of this form: {schema_hint}"
+        )},
+    ]
+
+
+class ParseStats:
+    """Counts of structured replies parsed, repaired and rejected"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parsed = 0
+        self.failures = 0
+        self.repaired = 0
+
+    def record(self, failed_first: bool, repaired: bool):
+        with self._lock:
+            self.parsed += 1
+            if failed_first:
+                self.failures += 1
+            if repaired:
+                self.repaired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "parsed": self.parsed,
+                "failures": self.failures,
+                "repaired": self.repaired,
+                "failure_rate": self.failures / self.parsed if self.parsed else 0.0,
+            }
+
+
+_parse_stats = ParseStats()
+
+
+def get_parse_stats() -> ParseStats:
+    """Return the process-wide structured output parse counters"""
+    return _parse_stats
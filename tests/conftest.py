@@ -0,0 +1,10 @@
+"""Shared pytest setup: import modules from the repository root and keep caches out of the working tree"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Cache locations are read at import time, so this must run before any ResumeAI module is imported
+os.environ.setdefault("RESUMEAI_CACHE_DIR", tempfile.mkdtemp(prefix="resumeai-tests-"))
@@ -0,0 +1,162 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import clients
+import results_store
+from revisions import ResumeRevision, split_sections
+from vector_index import get_resume_index, index_namespace
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+JOB_DESCRIPTION = "Python developer with Django and PostgreSQL"
+
+
+COMPARISON = {"score": 77, "explanation": "Good fit", "strengths": "Python", "improvements": "None"}
+FEEDBACK = {"suggestions": ["Quantify results", "Trim the summary", "Group the skills"]}
+
+
+class FakeOpenAIClient:
+    """Answers every chat completion with the same reply"""
+
+    def __init__(self, reply=COMPARISON):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps(self.reply)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=None
+        )
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESUMEAI_INDEX_DIR", str(tmp_path / "index"))
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    at.session_state.session_id = "apptest"
+    at.session_state.job_description = JOB_DESCRIPTION
+    at.session_state.azure_openai_endpoint = "https://example.openai.azure.com/"
+    at.session_state.azure_openai_key = "key"
+    at.session_state.azure_openai_deployment = "gpt"
+    at.session_state.bypass_response_cache = True
+    return at
+
+
+def click(at, label):
+    next(button for button in at.button if label in button.label).click().run()
+
+
+def test_compare_shortlist_runs_on_worker_threads(app, monkeypatch):
+    fake = FakeOpenAIClient()
+    monkeypatch.setattr(clients, "get_openai_client", lambda *args: fake)
+    get_resume_index(index_namespace("apptest")).add_resume(
+        "dev.pdf", "Python developer building Django apps on PostgreSQL"
+    )
+
+    app.run()
+    click(app, "Find Top Candidates")
+    assert [match["name"] for match in app.session_state.candidate_matches] == ["dev.pdf"]
+
+    click(app, "Compare Shortlist with AI")
+    assert not app.exception
+    assert not app.error
+    assert app.session_state.candidate_matches[0]["score"] == 77
+    assert fake.calls == 1
+
+
+def test_other_sessions_do_not_see_indexed_resumes(app):
+    get_resume_index(index_namespace("someone-else")).add_resume("other.pdf", "Python developer")
+
+    app.run()
+    assert not app.exception
+    assert not any("Find Top Candidates" in button.label for button in app.button)
+
+
+def test_job_description_alone_writes_no_index(app, tmp_path):
+    app.run()
+    assert not app.exception
+    assert not os.path.exists(tmp_path / "index" / index_namespace("apptest"))
+
+
+def test_process_wide_panels_are_hidden_from_visitors(app, monkeypatch):
+    monkeypatch.delenv("RESUMEAI_ADMIN_PANELS", raising=False)
+    app.run()
+    labels = [expander.label for expander in app.sidebar.expander]
+    assert not any("Stage Metrics" in label or "Extraction Routing" in label for label in labels)
+    assert not any("Screening Results" in expander.label for expander in app.expander)
+
+
+def test_screening_results_ignore_other_meta_files(app, monkeypatch, tmp_path):
+    monkeypatch.setenv("RESUMEAI_ADMIN_PANELS", "1")
+    monkeypatch.setattr(results_store, "RESULTS_ROOTS", (str(tmp_path),))
+    get_resume_index(index_namespace("apptest"))
+    app.session_state.results_store_dir = str(tmp_path / "index" / index_namespace("apptest"))
+    app.run()
+    assert not app.exception
+    assert any("No results store found" in info.value for info in app.info)
+
+    app.session_state.results_store_dir = "/etc"
+    app.run()
+    assert not app.exception
+    assert any("can only be opened" in warning.value for warning in app.warning)
+
+
+def test_revisions_are_only_reused_for_the_same_file(app, monkeypatch):
+    fake = FakeOpenAIClient(FEEDBACK)
+    monkeypatch.setattr(clients, "get_openai_client", lambda *args: fake)
+    resume = "Jane Doe\n\nEXPERIENCE\nEngineer, Contoso (2020 - 2024)\n- Built the billing API\n"
+    app.session_state.stream_results = False
+    app.session_state.bypass_response_cache = False
+    app.session_state.extracted_text = resume
+    app.session_state.resume_revisions = {"jane.pdf": ResumeRevision(split_sections(resume), ["Earlier advice"] * 3)}
+
+    app.session_state.resume_file = "jane.pdf"
+    app.session_state.feedback_pending = True
+    app.run()
+    assert fake.calls == 0
+    assert app.session_state.feedback_suggestions == ["Earlier advice"] * 3
+
+    app.session_state.resume_file = "john.pdf"
+    app.session_state.feedback_pending = True
+    app.run()
+    assert not app.exception
+    assert fake.calls == 1
+    assert app.session_state.feedback_suggestions == FEEDBACK["suggestions"]
+    assert set(app.session_state.resume_revisions) == {"jane.pdf", "john.pdf"}
+
+
+def test_bypassing_the_cache_skips_revision_reuse(app, monkeypatch):
+    fake = FakeOpenAIClient(FEEDBACK)
+    monkeypatch.setattr(clients, "get_openai_client", lambda *args: fake)
+    resume = "Jane Doe\n\nEXPERIENCE\nEngineer, Fabrikam (2019 - 2023)\n- Ran the data platform\n"
+    app.session_state.stream_results = False
+    app.session_state.extracted_text = resume
+    app.session_state.resume_revisions = {"jane.pdf": ResumeRevision(split_sections(resume), ["Earlier advice"] * 3)}
+    app.session_state.resume_file = "jane.pdf"
+    app.session_state.feedback_pending = True
+    app.run()
+    assert not app.exception
+    assert fake.calls == 1
+    assert app.session_state.feedback_suggestions == FEEDBACK["suggestions"]
+
+
+def test_combined_analysis_honours_the_minimum_prescore(app, monkeypatch):
+    fake = FakeOpenAIClient(FEEDBACK)
+    monkeypatch.setattr(clients, "get_openai_client", lambda *args: fake)
+    app.session_state.stream_results = False
+    app.session_state.extracted_text = "Pastry chef\n\nEXPERIENCE\n- Baked bread and croissants\n"
+    app.session_state.resume_file = "chef.pdf"
+    app.session_state.min_prescore = 90.0
+    app.session_state.combined_pending = True
+    app.run()
+    assert not app.exception
+    assert any("AI comparison was skipped" in warning.value for warning in app.warning)
+    assert fake.calls == 1
+    assert app.session_state.feedback_suggestions == FEEDBACK["suggestions"]
+    assert app.session_state.job_comparison is None
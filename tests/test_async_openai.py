@@ -0,0 +1,70 @@
+import asyncio
+
+import async_openai
+import batch_screening
+from batch_screening import ScreeningConfig
+
+
+def test_each_event_loop_gets_its_own_client_session():
+    async def session_and_client():
+        session = async_openai.get_async_session()
+        return session, async_openai.get_async_client("https://example.openai.azure.com/", "secret-key")
+
+    first_session, first_client = asyncio.run(session_and_client())
+    second_session, second_client = asyncio.run(session_and_client())
+    assert first_session is not second_session
+    assert first_client is not second_client
+
+
+def test_client_keys_do_not_hold_the_api_key():
+    async def client_keys():
+        async_openai.get_async_client("https://example.openai.azure.com/", "secret-key")
+        keys = list(async_openai.get_async_session()._clients)
+        await async_openai.close_async_session()
+        return keys
+
+    keys = asyncio.run(client_keys())
+    assert len(keys) == 1
+    assert "secret-key" not in keys[0]
+
+
+def test_closing_the_session_closes_its_clients():
+    async def run():
+        client = async_openai.get_async_client("https://example.openai.azure.com/", "key")
+        limiter = async_openai.get_rate_limiter("https://example.openai.azure.com/", "gpt")
+        await async_openai.close_async_session()
+        replacement = async_openai.get_async_client("https://example.openai.azure.com/", "key")
+        new_limiter = async_openai.get_rate_limiter("https://example.openai.azure.com/", "gpt")
+        await async_openai.close_async_session()
+        return client, replacement, limiter, new_limiter
+
+    client, replacement, limiter, new_limiter = asyncio.run(run())
+    assert client.is_closed()
+    assert replacement is not client
+    assert new_limiter is not limiter
+
+
+def test_async_comparison_failure_reason_is_written_to_the_row(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise TimeoutError("no response")
+
+    monkeypatch.setattr(async_openai, "request_job_comparison_async", fail)
+    record = {"file": "a.txt", "status": "ok", "score": None, "prescore": 50.0, "_text": "text"}
+    config = ScreeningConfig("https://example.openai.azure.com/", "key", "gpt")
+    record = asyncio.run(batch_screening.compare_record_async(record, "job", config))
+    assert record["status"] == "comparison_failed"
+    assert record["error"] == "TimeoutError: no response"
+
+
+def test_rate_limiter_spends_request_and_token_budgets():
+    async def run():
+        limiter = async_openai.RateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+        await limiter.acquire(400)
+        await limiter.acquire(400)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter._request_budget < 1
+    assert limiter._token_budget < 400
+    limiter.refund(400, 100)
+    assert limiter._token_budget >= 500
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import batch_screening
+from batch_screening import ScreeningConfig
+
+
+def make_config(**overrides) -> ScreeningConfig:
+    return ScreeningConfig("https://example.openai.azure.com/", "key", "gpt", **overrides)
+
+
+def test_comparison_failure_reason_is_written_to_the_row(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionError("endpoint unreachable")
+
+    monkeypatch.setattr(batch_screening, "request_job_comparison", fail)
+    (tmp_path / "resumes").mkdir()
+    (tmp_path / "resumes" / "jane.txt").write_text("Python developer with Django experience")
+    (tmp_path / "job.txt").write_text("Python developer")
+    output = tmp_path / "results.jsonl"
+
+    batch_screening.main([
+        str(tmp_path / "resumes"), "--job", str(tmp_path / "job.txt"), "--output", str(output),
+        "--openai-endpoint", "https://example.openai.azure.com/", "--openai-key", "key",
+        "--openai-deployment", "gpt",
+    ])
+
+    record = json.loads(output.read_text().splitlines()[0])
+    assert record["status"] == "comparison_failed"
+    assert record["error"] == "ConnectionError: endpoint unreachable"
+
+
+def test_successful_comparison_has_no_error(monkeypatch):
+    monkeypatch.setattr(batch_screening, "request_job_comparison", lambda *args, **kwargs: {"score": 80})
+    record = {"file": "a.txt", "status": "ok", "score": None, "prescore": 50.0, "_text": "text"}
+    record = batch_screening.compare_record(record, "job", make_config())
+    assert record["score"] == 80
+    assert "error" not in record
+    assert "_text" not in record
+
+
+def test_async_top_k_uses_the_worker_count(monkeypatch):
+    seen = {}
+
+    def prepare_resumes(files, job_description, config, max_workers=8):
+        seen["max_workers"] = max_workers
+        return iter([])
+
+    monkeypatch.setattr(batch_screening, "prepare_resumes", prepare_resumes)
+
+    async def run():
+        return [record async for record in batch_screening.screen_resumes_async(
+            iter([]), "job", make_config(top_k=5), concurrency=4, max_workers=3
+        )]
+
+    assert asyncio.run(run()) == []
+    assert seen["max_workers"] == 3
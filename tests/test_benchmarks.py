@@ -0,0 +1,17 @@
+from benchmarks.run import compare_with_baseline, summarize
+
+
+def test_failed_calls_are_left_out_of_the_percentiles():
+    summary = summarize([0.2, 0.2, 0.2], processed_bytes=3000, errors=5)
+    assert summary["calls"] == 8
+    assert summary["errors"] == 5
+    assert summary["p50_ms"] == summary["p99_ms"] == 200.0
+    assert summary["throughput_per_s"] == 5.0
+
+
+def test_new_errors_are_a_regression():
+    def results(errors):
+        return {"stages": {"feedback": {"peak_rss_mb": 100, "sizes": {"small": summarize([0.2], 100, errors)}}}}
+
+    assert compare_with_baseline(results(0), results(0), tolerance=0.2) == []
+    assert compare_with_baseline(results(2), results(0), tolerance=0.2) == ["feedback[small] errors: 0 -> 2"]
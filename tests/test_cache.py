@@ -0,0 +1,92 @@
+import cache
+from cache import DiskCache, LRUCache, TieredCache
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_disk_hit_is_promoted_with_remaining_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    disk.set("key", "value", ttl=60)
+    tiered = TieredCache(LRUCache(1024 * 1024), disk)
+
+    clock.now += 30
+    assert tiered.get("key") == "value"
+    assert tiered.memory.get("key") == "value"
+
+    clock.now += 31
+    assert disk.get("key") is None
+    assert tiered.memory.get("key") is None
+    assert tiered.get("key") is None
+
+
+def test_entry_without_ttl_is_promoted_without_expiry(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    disk.set("key", "value")
+    tiered = TieredCache(LRUCache(1024 * 1024), disk)
+    assert tiered.get("key") == "value"
+    assert disk.get_entry("key") == ("value", None)
+
+
+def test_lru_oversized_value_drops_previous_value():
+    lru = LRUCache(10)
+    lru.set("key", "old")
+    lru.set("key", "x" * 11)
+    assert lru.get("key") is None
+    assert lru.stats()["bytes"] == 0
+
+
+def test_disk_oversized_value_drops_previous_value(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), 10)
+    disk.set("key", "old")
+    disk.set("key", "x" * 11)
+    assert disk.get("key") is None
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(6)
+    lru.set("a", "aaa")
+    lru.set("b", "bbb")
+    lru.get("a")
+    lru.set("c", "ccc")
+    assert lru.get("a") == "aaa"
+    assert lru.get("b") is None
+    assert lru.stats()["evictions"] == 1
+
+
+def test_disk_reads_do_not_write(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    disk.set("key", "value")
+    changes = disk._conn.total_changes
+    for _ in range(5):
+        assert disk.get("key") == "value"
+    assert disk._conn.total_changes == changes
+
+
+def test_disk_reads_still_order_eviction(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"), 10)
+    disk.set("a", "aaaa")
+    clock.now += 1
+    disk.set("b", "bbbb")
+    clock.now += 1
+    assert disk.get("a") == "aaaa"
+    clock.now += 1
+    disk.set("c", "cccc")
+    assert disk.get("a") == "aaaa"
+    assert disk.get("b") is None
+
+
+def test_response_cache_key_ignores_whitespace():
+    first = cache.response_cache_key("gpt", [{"role": "user", "content": "a  b\n c"}], 0.3, 100)
+    second = cache.response_cache_key("gpt", [{"role": "user", "content": "a b c"}], 0.3, 100)
+    assert first == second
+    assert first != cache.response_cache_key("gpt", [{"role": "user", "content": "a b c"}], 0.4, 100)
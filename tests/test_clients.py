@@ -0,0 +1,63 @@
+from clients import ClientRegistry
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_client():
+    client = FakeClient()
+    return client, client.close
+
+
+def test_clients_are_reused_by_key():
+    registry = ClientRegistry()
+    first = registry.get(("openai", "endpoint", "key"), make_client)
+    assert registry.get(("openai", "endpoint", "key"), make_client) is first
+    assert registry.get(("openai", "other", "key"), make_client) is not first
+    assert registry.stats()["reused"] == 1
+
+
+def test_idle_clients_are_closed():
+    registry = ClientRegistry(idle_seconds=0)
+    client = registry.get(("openai", "endpoint"), make_client)
+    registry.get(("document_intelligence", "endpoint"), make_client)
+    assert client.closed
+    assert registry.stats()["evicted"] == 1
+
+
+def test_client_in_use_is_not_evicted():
+    registry = ClientRegistry(idle_seconds=0)
+    client = registry.get(("openai", "endpoint"), make_client)
+    with registry.in_use(client):
+        registry.get(("document_intelligence", "endpoint"), make_client)
+        assert not client.closed
+    registry.get(("document_intelligence", "other"), make_client)
+    assert client.closed
+
+
+def test_latencies_are_kept_per_client_kind():
+    registry = ClientRegistry()
+    openai_client = registry.get(("openai", "endpoint"), make_client)
+    document_client = registry.get(("document_intelligence", "endpoint"), make_client)
+    for seconds in (0.5, 0.1, 0.1):
+        registry.record_latency(openai_client, seconds)
+    for seconds in (3.0, 2.0, 2.0):
+        registry.record_latency(document_client, seconds)
+
+    kinds = registry.stats()["kinds"]
+    assert kinds["openai"]["cold_p50"] == 0.5
+    assert kinds["openai"]["warm_p50"] == 0.1
+    assert abs(kinds["openai"]["saved_p50"] - 0.4) < 1e-9
+    assert kinds["document_intelligence"]["saved_p50"] == 1.0
+
+
+def test_no_saving_is_reported_without_warm_samples():
+    registry = ClientRegistry()
+    client = registry.get(("openai", "endpoint"), make_client)
+    registry.record_latency(client, 1.0)
+    assert registry.stats()["kinds"]["openai"]["saved_p50"] == 0.0
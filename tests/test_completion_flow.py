@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from cache import get_response_cache, response_cache_key
+from completion_flow import (
+    JSON_RESPONSE_FORMAT,
+    condense_flow,
+    run_flow,
+    run_flow_async,
+    structured_flow,
+)
+from prompting import RESUME_TOKEN_BUDGET
+from schemas import FEEDBACK_SCHEMA_HINT, ParseError, parse_feedback_result, parse_job_comparison
+
+VALID_FEEDBACK = json.dumps({"suggestions": ["Add metrics", "Shorten the summary", "List tools"]})
+MESSAGES = [{"role": "user", "content": "Review this resume"}]
+
+
+class FakeCompletions:
+    """Answers flow requests from a list of replies, recording each request"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    async def complete_async(self, request):
+        return self(request)
+
+
+def feedback_flow(use_cache: bool = True):
+    return structured_flow("gpt", MESSAGES, parse_feedback_result, FEEDBACK_SCHEMA_HINT, 500, 0.3, use_cache)
+
+
+def test_valid_reply_needs_one_request():
+    completions = FakeCompletions(VALID_FEEDBACK)
+    result = run_flow(feedback_flow(), completions)
+    assert result.suggestions[0] == "Add metrics"
+    assert len(completions.requests) == 1
+    assert completions.requests[0].response_format == JSON_RESPONSE_FORMAT
+
+
+def test_malformed_reply_is_repaired_once_and_evicted_from_the_cache():
+    key = response_cache_key("gpt", MESSAGES, 0.3, 500, JSON_RESPONSE_FORMAT)
+    get_response_cache().set(key, "not json", 10, 0.1)
+    completions = FakeCompletions("not json", VALID_FEEDBACK)
+
+    result = run_flow(feedback_flow(), completions)
+
+    assert len(result.suggestions) == 3
+    repair = completions.requests[1]
+    assert repair.use_cache is False
+    assert "not json" in repair.messages[-2]["content"]
+    assert get_response_cache().get(key) is None
+
+
+def test_reply_still_malformed_after_repair_raises():
+    completions = FakeCompletions('{"suggestions": []}', '{"suggestions": ["only one"]}')
+    with pytest.raises(ParseError):
+        run_flow(feedback_flow(), completions)
+
+
+def test_async_driver_runs_the_same_flow():
+    completions = FakeCompletions('{"score": "high"}', json.dumps({
+        "score": 72, "explanation": "Good fit.", "strengths": "Python", "improvements": "Cloud",
+    }))
+    flow = structured_flow("gpt", MESSAGES, parse_job_comparison, "", 500, 0.2)
+    result = asyncio.run(run_flow_async(flow, completions.complete_async))
+    assert result.score == 72
+    assert len(completions.requests) == 2
+
+
+def test_short_resume_is_not_condensed():
+    completions = FakeCompletions()
+    assert run_flow(condense_flow("Jane Doe\nPython developer"), completions) == "Jane Doe\nPython developer"
+    assert completions.requests == []
+
+
+def test_long_resume_is_condensed_in_one_batch():
+    resume = "\n".join(f"Built service number {index} with Python and Kubernetes" for index in range(RESUME_TOKEN_BUDGET))
+    completions = FakeCompletions(*["summary"] * 1000)
+    condensed = run_flow(condense_flow(resume), completions)
+    assert len(completions.requests) > 1
+    assert condensed == "\n\n".join(["summary"] * len(completions.requests))
+
+
+def test_completion_error_propagates_from_both_drivers():
+    with pytest.raises(ConnectionError):
+        run_flow(feedback_flow(), FakeCompletions(ConnectionError("down")))
+    with pytest.raises(ConnectionError):
+        asyncio.run(run_flow_async(feedback_flow(), FakeCompletions(ConnectionError("down")).complete_async))
@@ -0,0 +1,36 @@
+import time
+
+import jobs
+from jobs import JobQueue
+
+
+def wait_for(queue, job_id):
+    deadline = time.time() + 5
+    while not queue.get(job_id).done and time.time() < deadline:
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+def test_finished_jobs_record_when_they_finished():
+    queue = JobQueue(max_workers=1)
+    job = wait_for(queue, queue.submit("ok", lambda: "text"))
+    assert (job.status, job.result) == ("done", "text")
+    assert job.finished is not None
+
+    job = wait_for(queue, queue.submit("broken", lambda: 1 / 0))
+    assert job.status == "failed"
+    assert job.finished is not None
+
+
+def test_pruning_skips_jobs_still_finishing():
+    queue = JobQueue(max_workers=1)
+    job_id = queue.submit("ok", lambda: "text")
+    wait_for(queue, job_id)
+    # A job whose status was set by another thread just before its finish time
+    queue.get(job_id).finished = None
+    queue.submit("next", lambda: "text")
+    assert queue.get(job_id) is not None
+
+    queue.get(job_id).finished = time.time() - jobs.JOB_RETENTION_SECONDS - 1
+    queue.submit("later", lambda: "text")
+    assert queue.get(job_id) is None
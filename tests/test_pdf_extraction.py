@@ -0,0 +1,30 @@
+import io
+
+import PyPDF2
+
+from benchmarks.corpus import generate_resume_text, write_pdf
+from pdf_extraction import extract_pages_parallel, resolve_page_range, shutdown_pool, split_pages
+
+
+def test_split_pages_covers_range_in_order():
+    spans = split_pages(range(2, 12), 3)
+    assert [list(span) for span in spans] == [[2, 3, 4, 5], [6, 7, 8], [9, 10, 11]]
+    assert split_pages(range(2), 8) == [range(0, 1), range(1, 2)]
+
+
+def test_resolve_page_range_clamps_to_document():
+    assert resolve_page_range(5) == range(5)
+    assert resolve_page_range(5, (0, 9)) == range(0, 5)
+    assert resolve_page_range(5, (2, 3)) == range(1, 3)
+
+
+def test_parallel_matches_serial_extraction():
+    data = write_pdf(generate_resume_text(6))
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    serial = [page.extract_text() or "" for page in reader.pages]
+    try:
+        assert extract_pages_parallel(data, range(len(serial)), max_workers=2) == serial
+        # The second document reuses the warm pool
+        assert extract_pages_parallel(data, range(1, 3), max_workers=2) == serial[1:3]
+    finally:
+        shutdown_pool()
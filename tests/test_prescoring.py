@@ -0,0 +1,54 @@
+import pytest
+
+from prescoring import extract_skills, prescore, prescore_many, select_candidates, tokenize
+
+
+@pytest.mark.parametrize("text", [
+    "I went to Go to the rest of R&D",
+    "Ready to go the extra mile and rest on weekends",
+    "Excel at spring cleaning, swift delivery and node placement",
+])
+def test_everyday_words_are_not_skills(text):
+    assert extract_skills(tokenize(text)) == set()
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Backend services in Golang", "go"),
+    ("Five years of Go programming", "go"),
+    ("Designed REST APIs for billing", "rest"),
+    ("Built RESTful services", "rest"),
+    ("Statistics in R programming and RStudio", "r"),
+    ("Microservices with Spring Boot", "spring"),
+    ("Reporting with Microsoft Excel", "excel"),
+    ("iOS apps in SwiftUI", "swift"),
+    ("APIs on Node.js", "node.js"),
+    ("APIs on NodeJS", "node.js"),
+])
+def test_ambiguous_skills_match_in_context(text, skill):
+    assert skill in extract_skills(tokenize(text))
+
+
+def test_false_positive_resume_gets_no_skill_credit():
+    result = prescore("I went to Go to the rest of R&D", "Requires Golang, REST APIs, R programming and Python")
+    assert result.matched_skills == []
+    assert result.skill_coverage == 0.0
+    assert result.score < 20
+
+
+def test_matching_resume_covers_context_skills():
+    result = prescore(
+        "Built REST APIs in Golang and Spring Boot; analysis in R programming",
+        "Requires Golang, REST APIs, Spring Boot and R programming"
+    )
+    assert set(result.matched_skills) >= {"go", "rest", "spring", "r"}
+    assert result.skill_coverage == 1.0
+
+
+def test_prescore_many_ranks_relevant_resume_first():
+    job = "Python developer with Django, PostgreSQL and Docker"
+    scores = prescore_many([
+        "Chef with ten years in restaurant kitchens",
+        "Python developer building Django apps on PostgreSQL, deployed with Docker",
+    ], job)
+    assert select_candidates([s.score for s in scores]) == [1, 0]
+    assert select_candidates([s.score for s in scores], threshold=50) == [1]
@@ -0,0 +1,101 @@
+import math
+
+import pytest
+
+import results_store
+from results_store import ResultsStore, get_results_store
+
+
+def write(directory, records):
+    with ResultsStore(str(directory), writable=True) as store:
+        for record in records:
+            store.append(record)
+
+
+RECORDS = [
+    {"file": "alice.pdf", "status": "ok", "score": 82, "prescore": 61.5, "explanation": "Strong Python"},
+    {"file": "bob.docx", "status": "below_prescore", "score": None, "prescore": 12.0},
+    {"file": "carol.pdf", "status": "ok", "score": 82, "prescore": 70.0},
+    {"file": "dave.txt", "status": "comparison_failed", "score": None, "prescore": 55.0, "error": "Timeout: slow"},
+]
+
+
+def test_rows_round_trip_through_a_reader(tmp_path):
+    write(tmp_path, RECORDS)
+    store = ResultsStore(str(tmp_path))
+    assert len(store) == 4
+    assert store.get(0) == {
+        "row": 0, "status": "ok", "score": 82, "prescore": 61.5, "file": "alice.pdf",
+        "explanation": "Strong Python", "strengths": "", "improvements": "", "error": "",
+    }
+    assert store.get(1)["score"] is None
+    assert store.get(3)["error"] == "Timeout: slow"
+
+
+def test_ranking_puts_missing_scores_last_and_breaks_ties_by_prescore(tmp_path):
+    write(tmp_path, RECORDS)
+    store = ResultsStore(str(tmp_path))
+    assert store.ranked().tolist() == [2, 0, 3, 1]
+    assert store.sort(store.select(), by="prescore", descending=False).tolist() == [1, 3, 0, 2]
+    with pytest.raises(ValueError):
+        store.sort(store.select(), by="file")
+
+
+def test_filters_combine(tmp_path):
+    write(tmp_path, RECORDS)
+    store = ResultsStore(str(tmp_path))
+    assert store.select(statuses=["ok"]).tolist() == [0, 2]
+    assert store.select(min_score=80, name_contains="CAROL").tolist() == [2]
+    assert store.select(statuses=["unknown"]).tolist() == []
+
+
+def test_store_grows_past_its_initial_capacity(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store, "INITIAL_CAPACITY", 4)
+    write(tmp_path, [{"file": f"{n}.pdf", "score": n} for n in range(10)])
+    store = ResultsStore(str(tmp_path))
+    assert len(store) == 10
+    assert store.get(9)["file"] == "9.pdf"
+    assert [row["score"] for row in store.page(store.ranked(), page=1, page_size=3)] == [6, 5, 4]
+
+
+def test_shared_reader_picks_up_new_rows(tmp_path):
+    assert get_results_store(str(tmp_path)) is None
+    writer = ResultsStore(str(tmp_path), writable=True)
+    writer.append(RECORDS[0])
+    writer.flush()
+    assert len(get_results_store(str(tmp_path))) == 1
+
+    writer.append(RECORDS[1])
+    writer.close()
+    reader = get_results_store(str(tmp_path))
+    assert len(reader) == 2
+    assert math.isnan(float(reader.column("score")[1]))
+
+
+def test_readers_refuse_to_write(tmp_path):
+    write(tmp_path, RECORDS[:1])
+    with pytest.raises(ValueError):
+        ResultsStore(str(tmp_path)).append(RECORDS[1])
+
+
+def test_other_meta_files_are_not_results_stores(tmp_path):
+    (tmp_path / "meta.json").write_text('{"dimension": 512, "embedder": "hashing"}')
+    assert get_results_store(str(tmp_path)) is None
+    (tmp_path / "meta.json").write_text("not json")
+    assert get_results_store(str(tmp_path)) is None
+
+
+def test_only_directories_under_the_results_roots_resolve(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store, "RESULTS_ROOTS", (str(tmp_path / "results"),))
+    assert results_store.resolve_results_dir(str(tmp_path / "results" / "run-1"))
+    assert results_store.resolve_results_dir(str(tmp_path / "results" / ".." / "index")) is None
+    assert results_store.resolve_results_dir("/etc") is None
+
+
+def test_shared_readers_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store, "MAX_OPEN_READERS", 2)
+    monkeypatch.setattr(results_store, "_readers", results_store.OrderedDict())
+    for name in ("a", "b", "c"):
+        write(tmp_path / name, RECORDS[:1])
+        get_results_store(str(tmp_path / name))
+    assert list(results_store._readers) == [str(tmp_path / "b"), str(tmp_path / "c")]
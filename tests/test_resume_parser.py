@@ -0,0 +1,76 @@
+from resume_parser import heading_kind, parse_date_range, parse_resume, relevant_text
+
+RESUME = """JANE DOE
+Backend Engineer | jane@example.com
+
+Professional Summary
+Backend engineer building payment systems.
+
+WORK EXPERIENCE
+Senior Engineer, Contoso
+Jan 2020 - Present
+- Built the settlement service in Go
+- Led a team of five engineers
+
+Engineer, Fabrikam (2016 - 2019)
+Seattle, WA
+• Maintained the billing API
+
+Education:
+BSc Computer Science, University of Somewhere (2012 - 2016)
+
+Technical Skills
+Python, Go; PostgreSQL | Kafka
+• Kubernetes
+
+References
+Available on request
+"""
+
+
+def test_sections_are_typed_and_the_name_stays_in_the_header():
+    parsed = parse_resume(RESUME)
+    assert parsed.header.text == "JANE DOE\nBackend Engineer | jane@example.com"
+    assert [(section.title, section.kind) for section in parsed.sections] == [
+        ("Professional Summary", "summary"),
+        ("WORK EXPERIENCE", "experience"),
+        ("Education", "education"),
+        ("Technical Skills", "skills"),
+        ("References", "references"),
+    ]
+
+
+def test_experience_entries_carry_dates_details_and_bullets():
+    experience = parse_resume(RESUME).sections_of("experience")[0]
+    current, earlier = experience.entries
+    assert current.heading == "Senior Engineer, Contoso"
+    assert current.dates.current and current.dates.start_year == 2020
+    assert current.bullets == ["Built the settlement service in Go", "Led a team of five engineers"]
+    assert earlier.dates.years() == 3
+    assert earlier.details == ["Seattle, WA"]
+    assert earlier.bullets == ["Maintained the billing API"]
+
+
+def test_skills_are_split_into_items():
+    assert parse_resume(RESUME).skills == ["Python", "Go", "PostgreSQL", "Kafka", "Kubernetes"]
+
+
+def test_caps_employer_inside_experience_is_not_a_heading():
+    parsed = parse_resume("Jane Doe\n\nEXPERIENCE\nACME CORPORATION\nEngineer (2019 - 2021)\n- Shipped things\n")
+    assert [section.kind for section in parsed.sections] == ["experience"]
+    assert parsed.sections[0].entries[0].heading == "ACME CORPORATION"
+
+
+def test_relevant_text_drops_references():
+    text = relevant_text(RESUME)
+    assert "Available on request" not in text
+    assert "Technical Skills\nPython, Go; PostgreSQL | Kafka" in text
+
+
+def test_heading_and_date_helpers():
+    assert heading_kind("Employment History:") == "experience"
+    assert heading_kind("VOLUNTEER WORK") == "other"
+    assert heading_kind("VOLUNTEER WORK", allow_unknown=False) is None
+    dates = parse_date_range("Analyst, Northwind (Sept. 2015 - 03/2018)")
+    assert (dates.start_year, dates.end_year) == (2015, 2018)
+    assert parse_date_range("Founded in 2015") is None
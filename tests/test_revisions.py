@@ -0,0 +1,65 @@
+from revisions import diff_sections, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building payment systems.
+
+EXPERIENCE
+Senior Engineer, Contoso (2020 - 2024)
+- Built the settlement service in Go, processing 2M payments a day
+- Cut reconciliation time from hours to minutes with streaming jobs
+- Led a team of five engineers through a database migration
+Engineer, Fabrikam (2016 - 2020)
+- Maintained the billing API and its PostgreSQL schema
+- Added contract tests that caught regressions before release
+
+EDUCATION
+BSc Computer Science, University of Somewhere (2012 - 2016)
+
+SKILLS
+Go, Python, PostgreSQL, Kafka, Kubernetes
+"""
+
+
+def test_identical_upload_is_unchanged():
+    diff = diff_sections(split_sections(RESUME), split_sections(RESUME))
+    assert diff.is_unchanged
+    assert diff.changed_ratio == 0.0
+
+
+def test_whitespace_changes_do_not_count():
+    edited = RESUME.replace("Backend engineer with", "Backend   engineer with")
+    assert diff_sections(split_sections(RESUME), split_sections(edited)).is_unchanged
+
+
+def test_editing_one_bullet_counts_only_that_line():
+    edited = RESUME.replace("Led a team of five engineers", "Led a team of seven engineers")
+    diff = diff_sections(split_sections(RESUME), split_sections(edited))
+    assert [section.title for section in diff.changed] == ["Experience"]
+    assert 0 < diff.changed_ratio < 0.15
+
+
+def test_rewritten_resume_exceeds_the_partial_threshold():
+    rewritten = "\n".join(
+        line if not line.startswith("- ") else f"- Rewrote item {number} completely"
+        for number, line in enumerate(RESUME.splitlines())
+    ).replace("Backend engineer", "Product manager")
+    diff = diff_sections(split_sections(RESUME), split_sections(rewritten))
+    assert diff.changed_ratio > 0.5
+
+
+def test_removed_sections_are_reported_and_counted():
+    trimmed = RESUME.split("EDUCATION")[0]
+    diff = diff_sections(split_sections(RESUME), split_sections(trimmed))
+    assert diff.removed == ["Education", "Skills"]
+    assert diff.changed == []
+    assert 0 < diff.changed_ratio < 0.5
+
+
+def test_new_section_counts_in_full():
+    extended = RESUME + "\nCERTIFICATIONS\nAWS Certified Solutions Architect\n"
+    diff = diff_sections(split_sections(RESUME), split_sections(extended))
+    assert [section.title for section in diff.changed] == ["Certifications"]
+    assert diff.changed_chars == len("AWS Certified Solutions Architect")
@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+import app
+from benchmarks.corpus import generate_resume_text, write_docx, write_pdf
+from routing import (
+    DOCUMENT_INTELLIGENCE_EXTRACTOR,
+    LOCAL_EXTRACTOR,
+    RoutingPolicy,
+    RoutingStats,
+    get_routing_policy,
+    load_routing_policy,
+    route_document,
+    set_routing_policy,
+)
+
+
+@pytest.fixture
+def routing_policy():
+    original = get_routing_policy()
+    yield set_routing_policy
+    set_routing_policy(original)
+
+
+def test_born_digital_pdf_is_extracted_locally():
+    decision = route_document(write_pdf(generate_resume_text(2)), "pdf", RoutingPolicy())
+    assert decision.extractor == LOCAL_EXTRACTOR
+    assert decision.profile.text_pages == decision.profile.pages
+
+
+def test_unreadable_pdf_goes_to_document_intelligence():
+    decision = route_document(b"%PDF-1.4 not really", "pdf", RoutingPolicy())
+    assert decision.extractor == DOCUMENT_INTELLIGENCE_EXTRACTOR
+    assert decision.reason.startswith("could not inspect locally")
+
+
+def test_plain_docx_is_extracted_locally():
+    decision = route_document(write_docx(generate_resume_text(1)), "docx", RoutingPolicy())
+    assert decision.extractor == LOCAL_EXTRACTOR
+
+
+def test_thin_local_text_is_a_misroute_and_recent_decisions_hold_no_file_names():
+    stats = RoutingStats()
+    decision = route_document(write_pdf(generate_resume_text(2)), "pdf", RoutingPolicy())
+    assert stats.record_outcome(decision, "x", RoutingPolicy()) is False
+    assert stats.stats()["misroutes"] == 1
+    assert "file" not in stats.recent()[0]
+
+
+@pytest.mark.parametrize("name, value", [
+    ("RESUMEAI_EXTRACTION_ROUTING", "ocr-everything"),
+    ("RESUMEAI_ROUTING_MIN_CHARS_PER_PAGE", "lots"),
+])
+def test_invalid_policy_falls_back_to_default(monkeypatch, caplog, name, value):
+    monkeypatch.setenv(name, value)
+    with caplog.at_level(logging.WARNING, logger="resumeai"):
+        assert load_routing_policy() == RoutingPolicy()
+    assert "default policy" in caplog.text
+
+
+def test_forced_local_policy_falls_back_when_local_text_is_empty(routing_policy, monkeypatch):
+    routing_policy(RoutingPolicy(mode=LOCAL_EXTRACTOR))
+    monkeypatch.setattr(app, "extract_text_locally", lambda content, extension: "")
+    monkeypatch.setattr(
+        app, "extract_text_with_document_intelligence", lambda content, filename, endpoint, key: "OCR text"
+    )
+    content = write_pdf(generate_resume_text(1, seed=1801))
+    assert app.extract_resume_text(content, "scan.pdf", "https://di.example", "key") == "OCR text"
+
+
+def test_forced_local_policy_keeps_thin_local_text(routing_policy, monkeypatch):
+    routing_policy(RoutingPolicy(mode=LOCAL_EXTRACTOR))
+    monkeypatch.setattr(app, "extract_text_locally", lambda content, extension: "Jane Doe")
+    content = write_pdf(generate_resume_text(1, seed=1802))
+    assert app.extract_resume_text(content, "thin.pdf", "https://di.example", "key") == "Jane Doe"
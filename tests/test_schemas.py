@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from schemas import (
+    COMPARISON_SCHEMA_HINT,
+    ParseError,
+    ParseStats,
+    parse_combined_result,
+    parse_feedback_result,
+    parse_job_comparison,
+    partial_comparison,
+    partial_suggestions,
+    repair_messages,
+)
+
+COMPARISON = {"score": 72, "explanation": "Solid match", "strengths": "Python", "improvements": "Kafka"}
+
+
+def test_fenced_reply_with_extra_suggestions_is_accepted():
+    reply = '```json\n{"suggestions": ["One", " Two ", "", "Three", "Four"]}\n```'
+    assert parse_feedback_result(reply).suggestions == ["One", "Two", "Three"]
+
+
+def test_comparison_fields_are_normalised():
+    reply = json.dumps({**COMPARISON, "score": "85/100", "strengths": ["Python", "Go"]})
+    comparison = parse_job_comparison(reply)
+    assert comparison.score == 85
+    assert comparison.strengths == "Python; Go"
+
+
+@pytest.mark.parametrize("reply, message", [
+    ("Score: 80", "not valid JSON"),
+    ("[1, 2]", "not a JSON object"),
+    (json.dumps({**COMPARISON, "score": 140}), '"score" must be a number'),
+    (json.dumps({**COMPARISON, "score": True}), '"score" must be a number'),
+    (json.dumps({**COMPARISON, "explanation": " "}), '"explanation" must be a non-empty string'),
+])
+def test_invalid_comparisons_raise_parse_error(reply, message):
+    with pytest.raises(ParseError, match=message):
+        parse_job_comparison(reply)
+
+
+def test_combined_reply_needs_both_parts():
+    reply = json.dumps({**COMPARISON, "suggestions": ["One", "Two", "Three"]})
+    combined = parse_combined_result(reply)
+    assert combined.comparison.score == 72
+    assert len(combined.feedback.suggestions) == 3
+    with pytest.raises(ParseError, match='"suggestions"'):
+        parse_combined_result(json.dumps(COMPARISON))
+
+
+def test_repair_messages_quote_the_rejected_reply_and_the_error():
+    messages = [{"role": "user", "content": "Compare"}]
+    error = ParseError('"score" must be a number between 0 and 100')
+    repaired = repair_messages(messages, "Score: 80", error, COMPARISON_SCHEMA_HINT)
+    assert repaired[:1] == messages
+    assert repaired[1] == {"role": "assistant", "content": "Score: 80"}
+    assert str(error) in repaired[2]["content"]
+    assert COMPARISON_SCHEMA_HINT in repaired[2]["content"]
+
+
+def test_partial_replies_expose_only_complete_fields():
+    partial = '{"score": 64, "explanation": "Good overlap", "strengths": "Pyth'
+    assert partial_comparison(partial) == {"score": 64, "explanation": "Good overlap"}
+    assert partial_suggestions('{"suggestions": ["Add metrics", "Shor') == ["Add metrics"]
+
+
+def test_parse_stats_failure_rate():
+    stats = ParseStats()
+    stats.record(failed_first=False, repaired=False)
+    stats.record(failed_first=True, repaired=True)
+    stats.record(failed_first=True, repaired=False)
+    assert stats.stats() == {"parsed": 3, "failures": 2, "repaired": 1, "failure_rate": 2 / 3}
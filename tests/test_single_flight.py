@@ -0,0 +1,132 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import app
+from cache import SingleFlight, WaitTimeout, get_single_flight, response_cache_key
+
+
+def run_in_thread(fn):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "reply"
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do("key", slow))
+    while not flight.stats()["in_flight"]:
+        time.sleep(0.001)
+    follower, follower_outcome = run_in_thread(lambda: flight.do("key", slow, timeout=5))
+    while not flight.stats()["waiting"]:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert leader_outcome["value"] == ("reply", False)
+    assert follower_outcome["value"] == ("reply", True)
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight()
+    call, leader = flight.join("key")
+    assert leader
+    follower, outcome = run_in_thread(lambda: flight.do("key", lambda: "unused", timeout=5))
+    while not flight.stats()["waiting"]:
+        time.sleep(0.001)
+    flight.complete("key", call, error=RuntimeError("rate limited"))
+    follower.join()
+    assert str(outcome["error"]) == "rate limited"
+
+
+def test_follower_makes_its_own_call_when_the_leader_is_stuck():
+    flight = SingleFlight()
+    stuck, _ = flight.join("key")
+
+    assert flight.do("key", lambda: "own reply", timeout=0.05) == ("own reply", False)
+    stats = flight.stats()
+    assert stats["expired"] == 1
+    assert stats["waiting"] == 0
+
+    # The stuck leader can still finish later without disturbing anyone
+    flight.complete("key", stuck, "late reply")
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_call_wait_raises_wait_timeout():
+    flight = SingleFlight()
+    call, _ = flight.join("key")
+    flight.join("key")
+    with pytest.raises(WaitTimeout):
+        flight.wait(call, 0.01)
+
+
+def test_later_callers_start_a_new_call():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+    assert flight.stats()["leaders"] == 2
+
+
+class FakeClient:
+    """Streams or returns a fixed reply"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **kwargs):
+        ns = SimpleNamespace
+        if stream:
+            return iter([ns(choices=[ns(delta=ns(content=part))]) for part in self.reply.split(" ")])
+        return ns(choices=[ns(message=ns(content=self.reply))], usage=None)
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_completions_fall_back_when_the_shared_reply_takes_too_long(monkeypatch, streamed):
+    monkeypatch.setattr(app, "REQUEST_TIMEOUT_SECONDS", 0.05)
+    messages = [{"role": "user", "content": f"stuck leader test {streamed}"}]
+    key = response_cache_key("gpt", messages, 0.0, 10, None)
+    stuck, _ = get_single_flight().join(key)
+    client = FakeClient("own reply")
+    try:
+        if streamed:
+            reply = " ".join(app.stream_chat_completion(client, "gpt", messages, 10, 0.0))
+        else:
+            reply = app.chat_completion(client, "gpt", messages, 10, 0.0)
+    finally:
+        get_single_flight().complete(key, stuck, "late")
+    assert reply == "own reply"
+
+
+def test_extractions_fall_back_when_the_shared_one_takes_too_long(monkeypatch):
+    monkeypatch.setattr(app, "REQUEST_TIMEOUT_SECONDS", 0.05)
+    content = b"stuck extraction leader test"
+    key = app.extraction_cache_key("pypdf2", app.EXTRACTOR_VERSIONS["pypdf2"], content)
+    stuck, _ = get_single_flight().join(key)
+    try:
+        text = app.cached_extraction("pypdf2", content, lambda file_content: "own text")
+    finally:
+        get_single_flight().complete(key, stuck, "late")
+    assert text == "own text"
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+import vector_index
+from vector_index import ResumeIndex, get_resume_index, index_namespace, purge_session_indexes
+
+
+def test_search_ranks_the_closest_resume_first(tmp_path):
+    resume_index = ResumeIndex(str(tmp_path))
+    resume_index.add_resume("dev.pdf", "Python developer building Django apps on PostgreSQL")
+    resume_index.add_resume("chef.pdf", "Head chef running restaurant kitchens")
+
+    matches = resume_index.search("Python Django developer", top_k=2)
+    assert [match["name"] for match in matches] == ["dev.pdf", "chef.pdf"]
+    assert resume_index.get_text(matches[0]["id"]).startswith("Python developer")
+
+
+def test_index_survives_reopening(tmp_path):
+    resume_id = ResumeIndex(str(tmp_path)).add_resume("dev.pdf", "Python developer")
+    reopened = ResumeIndex(str(tmp_path))
+    assert len(reopened) == 1
+    assert reopened.search("Python")[0]["id"] == resume_id
+
+
+def test_concurrent_adds_of_the_same_resume_store_it_once(tmp_path):
+    resume_index = ResumeIndex(str(tmp_path))
+    embed = resume_index.embedder.embed
+    calls = []
+
+    def slow_embed(texts):
+        calls.append(texts)
+        time.sleep(0.01)
+        return embed(texts)
+
+    resume_index.embedder.embed = slow_embed
+    threads = [
+        threading.Thread(target=resume_index.add_resume, args=(f"copy-{n}.pdf", "Same resume text"))
+        for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(resume_index) == 1
+    assert len(calls) == 1
+
+
+def test_sessions_get_separate_indexes_unless_a_tenant_is_set(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESUMEAI_INDEX_DIR", str(tmp_path))
+    get_resume_index(index_namespace("a")).add_resume("a.pdf", "Python developer")
+    assert len(get_resume_index(index_namespace("b"))) == 0
+
+    monkeypatch.setattr(vector_index, "INDEX_TENANT", "acme/recruiting")
+    assert index_namespace("a") == index_namespace("b") == "acme_recruiting"
+
+
+def test_missing_indexes_are_only_created_on_request(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESUMEAI_INDEX_DIR", str(tmp_path))
+    assert get_resume_index(index_namespace("reader"), create=False) is None
+    assert not os.path.exists(tmp_path / index_namespace("reader"))
+
+    get_resume_index(index_namespace("writer")).add_resume("w.pdf", "Python developer")
+    assert len(get_resume_index(index_namespace("writer"), create=False)) == 1
+
+
+def test_expired_session_indexes_are_purged(tmp_path):
+    ResumeIndex(str(tmp_path / "session-old")).add_resume("old.pdf", "Old resume")
+    ResumeIndex(str(tmp_path / "session-new")).add_resume("new.pdf", "New resume")
+    ResumeIndex(str(tmp_path / "acme")).add_resume("team.pdf", "Team resume")
+    stale = time.time() - 48 * 3600
+    os.utime(tmp_path / "session-old" / "ids.jsonl", (stale, stale))
+    os.utime(tmp_path / "acme" / "ids.jsonl", (stale, stale))
+
+    assert purge_session_indexes(str(tmp_path), retention_hours=24) == 1
+    assert sorted(os.listdir(tmp_path)) == ["acme", "session-new"]
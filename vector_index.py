@@ -0,0 +1,271 @@
+"""Persistent vector index of extracted resumes for job-to-candidate retrieval"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from cache import DEFAULT_CACHE_DIR
+from prescoring import tokenize
+
+DEFAULT_INDEX_DIR = os.path.join(DEFAULT_CACHE_DIR, "resume_index")
+# Opted-in resumes from every session share the tenant's index when one is set; otherwise each session has its own
+INDEX_TENANT = os.environ.get("RESUMEAI_INDEX_TENANT", "")
+SESSION_INDEX_RETENTION_HOURS = float(os.environ.get("RESUMEAI_INDEX_RETENTION_HOURS", "24"))
+SESSION_PREFIX = "session-"
+HASHING_DIMENSION = int(os.environ.get("RESUMEAI_EMBEDDING_DIMENSION", "512"))
+INITIAL_CAPACITY = 1024
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of unigrams and bigrams, L2-normalised"""
+
+    def __init__(self, dimension: int = HASHING_DIMENSION):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for feature in self._features(text):
+                # A stable hash keeps vectors comparable across processes and restarts
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                column = digest % self.dimension
+                sign = 1.0 if digest >> 63 else -1.0
+                counts[column] = counts.get(column, 0.0) + sign
+            for column, value in counts.items():
+                vectors[row, column] = np.sign(value) * np.log1p(abs(value))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class AzureOpenAIEmbedder:
+    """Embedder backed by an Azure OpenAI embeddings deployment"""
+
+    def __init__(self, endpoint: str, api_key: str, deployment_name: str, dimension: int):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.deployment_name = deployment_name
+        self.dimension = dimension
+        self.name = f"azure-{deployment_name}-{dimension}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        from app import OPENAI_API_VERSION
+        from clients import get_client_registry, get_openai_client
+
+        # Looked up per call rather than held, since the registry closes clients left idle
+        client = get_openai_client(self.endpoint, self.api_key, OPENAI_API_VERSION)
+        with get_client_registry().in_use(client):
+            response = client.embeddings.create(model=self.deployment_name, input=texts)
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """Brute-force cosine index over a memory-mapped float32 matrix with an append-only id sidecar"""
+
+    def __init__(self, directory: str, dimension: int, embedder_name: str):
+        self.directory = directory
+        self.dimension = dimension
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._sidecar_path = os.path.join(directory, "ids.jsonl")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta["dimension"] != dimension or meta["embedder"] != embedder_name:
+                raise ValueError(
+                    f"Index at {directory} was built with {meta['embedder']}; rebuild it to use {embedder_name}"
+                )
+        else:
+            with open(self._meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"dimension": dimension, "embedder": embedder_name}, f)
+
+        # Each sidecar line records the item stored at a row; later lines replace earlier ones
+        self.items: List[Dict[str, Any]] = []
+        if os.path.exists(self._sidecar_path):
+            with open(self._sidecar_path, encoding='utf-8') as f:
+                for line in f:
+                    item = json.loads(line)
+                    position = item.pop("position")
+                    if position == len(self.items):
+                        self.items.append(item)
+                    else:
+                        self.items[position] = item
+        self._positions = {item["id"]: position for position, item in enumerate(self.items)}
+
+        capacity = max(INITIAL_CAPACITY, len(self.items))
+        if os.path.exists(self._vectors_path):
+            capacity = max(capacity, os.path.getsize(self._vectors_path) // (4 * dimension))
+        self._open(capacity)
+
+    def _open(self, capacity: int):
+        size = capacity * self.dimension * 4
+        with open(self._vectors_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._capacity = capacity
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimension))
+
+    def _append_sidecar(self, position: int, item: Dict[str, Any]):
+        with open(self._sidecar_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"position": position, **item}) + "\n")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def add(self, item_id: str, vector: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
+        """Insert or replace the vector stored for item_id"""
+        with self._lock:
+            position = self._positions.get(item_id)
+            if position is None:
+                position = len(self.items)
+                if position >= self._capacity:
+                    self._vectors.flush()
+                    del self._vectors
+                    self._open(self._capacity * 2)
+                self.items.append({})
+                self._positions[item_id] = position
+            item = {"id": item_id, **(metadata or {})}
+            self.items[position] = item
+            # Write the vector before the sidecar so a crash never leaves an id without its row
+            self._vectors[position] = vector
+            self._vectors.flush()
+            self._append_sidecar(position, item)
+
+    def search(self, query: np.ndarray, top_k: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """Return the top_k (item, cosine similarity) pairs, best first"""
+        with self._lock:
+            count = len(self.items)
+            if count == 0:
+                return []
+            scores = np.asarray(self._vectors[:count] @ query.astype(np.float32))
+            top_k = min(top_k, count)
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best])]
+            return [(self.items[index], float(scores[index])) for index in best]
+
+
+class ResumeIndex:
+    """Embeds resumes into a VectorIndex and keeps their text for shortlisted comparisons"""
+
+    def __init__(self, directory: str = DEFAULT_INDEX_DIR, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+        self.directory = directory
+        self.index = VectorIndex(directory, self.embedder.dimension, self.embedder.name)
+        self._texts_dir = os.path.join(directory, "texts")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resume_id(resume_text: str) -> str:
+        return hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+
+    def _text_path(self, resume_id: str) -> str:
+        return os.path.join(self._texts_dir, resume_id[:2], f"{resume_id}.txt")
+
+    def add_resume(self, name: str, resume_text: str) -> str:
+        """Index a resume (re-adding the same text is a no-op) and return its id"""
+        resume_id = self.resume_id(resume_text)
+        # Checked and written under one lock so concurrent writers cannot both store the same resume
+        with self._lock:
+            if resume_id in self.index:
+                return resume_id
+            path = self._text_path(resume_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(resume_text)
+            self.index.add(resume_id, self.embedder.embed([resume_text])[0], {"name": name})
+        return resume_id
+
+    def get_text(self, resume_id: str) -> str:
+        with open(self._text_path(resume_id), encoding='utf-8') as f:
+            return f.read()
+
+    def search(self, job_description: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Return the top_k candidates for a job description as {id, name, similarity} dicts"""
+        query = self.embedder.embed([job_description])[0]
+        return [
+            {"id": item["id"], "name": item.get("name", ""), "similarity": round(score, 4)}
+            for item, score in self.index.search(query, top_k)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+_resume_indexes: Dict[str, ResumeIndex] = {}
+_resume_index_lock = threading.Lock()
+
+
+def index_namespace(session_id: Optional[str] = None) -> str:
+    """Directory name of the index a caller may read and write: the tenant's, or else the session's own"""
+    if INDEX_TENANT:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", INDEX_TENANT)
+    if session_id:
+        return f"{SESSION_PREFIX}{session_id}"
+    return "default"
+
+
+def purge_session_indexes(base_dir: str, retention_hours: float = SESSION_INDEX_RETENTION_HOURS) -> int:
+    """Delete session indexes untouched for longer than the retention period and return how many went"""
+    if not os.path.isdir(base_dir):
+        return 0
+    cutoff = time.time() - retention_hours * 3600
+    removed = 0
+    for name in os.listdir(base_dir):
+        directory = os.path.join(base_dir, name)
+        if not name.startswith(SESSION_PREFIX) or not os.path.isdir(directory):
+            continue
+        # The sidecar is appended to on every add, so its mtime is the session's last write
+        sidecar = os.path.join(directory, "ids.jsonl")
+        last_write = os.path.getmtime(sidecar if os.path.exists(sidecar) else directory)
+        if last_write < cutoff:
+            _resume_indexes.pop(directory, None)
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def get_resume_index(namespace: Optional[str] = None, create: bool = True) -> Optional[ResumeIndex]:
+    """Return the resume index for a namespace, using Azure embeddings when a deployment is configured
+
+    With create=False an index that does not exist on disk yet is not created, and None is returned instead.
+    """
+    namespace = namespace or index_namespace()
+    base_dir = os.environ.get("RESUMEAI_INDEX_DIR", DEFAULT_INDEX_DIR)
+    directory = os.path.join(base_dir, namespace)
+    with _resume_index_lock:
+        resume_index = _resume_indexes.get(directory)
+        if resume_index is None:
+            if not create and not os.path.exists(os.path.join(directory, "meta.json")):
+                return None
+            purge_session_indexes(base_dir)
+            embedder = None
+            deployment = os.environ.get("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+            if deployment:
+                embedder = AzureOpenAIEmbedder(
+                    os.environ["AZURE_OPENAI_ENDPOINT"],
+                    os.environ["AZURE_OPENAI_API_KEY"],
+                    deployment,
+                    int(os.environ.get("AZURE_OPENAI_EMBEDDING_DIMENSION", "1536"))
+                )
+            resume_index = ResumeIndex(directory, embedder)
+            _resume_indexes[directory] = resume_index
+        return resume_index
@@ -0,0 +1,150 @@
+"""Worker service that runs extraction jobs for one or more Streamlit front ends
+
+Usage:
+    python worker.py --port 8765 --processes 4
+    RESUMEAI_WORKER_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import hmac
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, Callable, List
+
+import app
+from jobs import Job, JobQueue, decode_value
+from metrics import start_metrics_server
+
+MAX_REQUEST_BYTES = int(os.environ.get("RESUMEAI_WORKER_MAX_REQUEST_MB", "64")) * 1024 * 1024
+
+# Only these functions can be run by name. Analysis stays in the front end, which streams it into the page
+TASKS: Dict[str, Callable] = {
+    "extract_resume_text": app.extract_resume_text,
+}
+
+
+class WorkerService:
+    """Process pool for CPU-bound extraction"""
+
+    def __init__(self, processes: int):
+        self.queue = JobQueue(processes, "processes")
+
+    def submit(self, task: str, description: str, args: List[Any], kwargs: Dict[str, Any]) -> str:
+        return self.queue.submit(description, TASKS[task], *args, **kwargs)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.queue.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.queue.stats()
+
+
+class _WorkerHandler(BaseHTTPRequestHandler):
+    @property
+    def service(self) -> WorkerService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        # Constant-time comparison, since the token guards Azure credentials sent with each job
+        if hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            return True
+        self.send_json(401, {"error": "Missing or invalid worker token"})
+        return False
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/healthz":
+            self.send_json(200, {"status": "ok"})
+            return
+        if not self.authorized():
+            return
+        if path == "/stats":
+            self.send_json(200, self.service.stats())
+        elif path.startswith("/jobs/"):
+            job = self.service.get(path[len("/jobs/"):])
+            if job is None:
+                self.send_json(404, {"error": "Unknown job"})
+            else:
+                self.send_json(200, job.to_dict())
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        if self.path.split("?")[0] != "/jobs":
+            self.send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {"error": f"Request larger than {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            task = request["task"]
+            if task not in TASKS:
+                self.send_json(400, {"error": f"Unknown task {task!r}"})
+                return
+            job_id = self.service.submit(
+                task,
+                request.get("description", task),
+                decode_value(request.get("args", [])),
+                decode_value(request.get("kwargs", {}))
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": f"Invalid job request: {str(e)}"})
+            return
+        self.send_json(202, {"id": job_id})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("RESUMEAI_WORKER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("RESUMEAI_WORKER_PORT", "8765")))
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="Extraction processes; PDF and DOCX parsing scales across these cores")
+    args = parser.parse_args(argv)
+
+    token = os.environ.get("RESUMEAI_WORKER_TOKEN", "")
+    if not token and args.host not in ("127.0.0.1", "localhost"):
+        print("Warning: RESUMEAI_WORKER_TOKEN is not set; anyone who can reach this port can submit jobs",
+              file=sys.stderr)
+
+    server = ThreadingHTTPServer((args.host, args.port), _WorkerHandler)
+    server.daemon_threads = True
+    server.service = WorkerService(args.processes)
+    server.token = token
+
+    metrics_url = start_metrics_server()
+    if metrics_url:
+        print(f"Serving metrics at {metrics_url}", file=sys.stderr)
+    print(
+        f"Worker listening on http://{args.host}:{args.port} ({args.processes} extraction processes)",
+        file=sys.stderr
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())